@@ -0,0 +1,42 @@
+"""
+Benchmarks the tab dialog clicks. Run it directly to count the GUI calls per click.
+
+    python benchmarks/bench_dialogs.py
+"""
+
+import harness
+
+import xbmcheadless
+import xbmcext
+
+CLICKS = 100
+
+
+def selecttab(size):
+    windows = []
+    xbmcheadless.script(windows.append, ('focus', xbmcext.SelectTabDialog.DIALOG_CONTENT))
+    xbmcext.Dialog().selecttab('Filter', xbmcext.TabOptions({'Year': [str(year) for year in range(size)]}))
+    return windows[0]
+
+
+@harness.benchmark('selecttab.click', size=[100, 1000, 10000])
+def click(size):
+    dialog = selecttab(size)
+    return lambda: dialog.onClick(dialog.DIALOG_SUBCONTENT)
+
+
+def main():
+    for size in (100, 1000, 10000):
+        xbmcheadless.reset()
+        dialog = selecttab(size)
+        del xbmcheadless.calls[:]
+
+        for index in range(CLICKS):
+            dialog.getControl(dialog.DIALOG_SUBCONTENT).selectItem(index * 7 % size)
+            dialog.onClick(dialog.DIALOG_SUBCONTENT)
+
+        print('selecttab size={:<6} calls/click={:.1f}'.format(size, len(xbmcheadless.calls) / float(CLICKS) - 1))
+
+
+if __name__ == '__main__':
+    main()
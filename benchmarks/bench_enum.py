@@ -0,0 +1,41 @@
+"""
+Benchmarks the vendored enum backport, which Kodi's Python 2 builds use, against the standard library enum: looking up a
+member by value, as SortMethod(value) does, and reading the name and value of a member.
+"""
+
+import enum
+import os
+import types
+
+import harness
+
+VENDORED_PATH = os.path.join(harness.root, 'xbmcext', 'enum', '__init__.py')
+
+
+def load(implementation):
+    if implementation == 'stdlib':
+        return enum
+
+    module = types.ModuleType('vendored_enum')
+
+    with open(VENDORED_PATH) as io:
+        exec(compile(io.read(), VENDORED_PATH, 'exec'), module.__dict__)
+
+    return module
+
+
+def sortMethod(implementation):
+    module = load(implementation)
+    return module.IntEnum('SortMethod', [('METHOD{}'.format(index), index) for index in range(45)])
+
+
+@harness.benchmark('enum.lookup', implementation=['stdlib', 'vendored'])
+def lookup(implementation):
+    SortMethod = sortMethod(implementation)
+    return lambda: [SortMethod(value) for value in range(45)]
+
+
+@harness.benchmark('enum.attributes', implementation=['stdlib', 'vendored'])
+def attributes(implementation):
+    members = list(sortMethod(implementation))
+    return lambda: [(member.name, member.value) for member in members]
@@ -0,0 +1,67 @@
+"""
+Benchmarks the fan-out of requests against a local server that answers every request after a fixed latency. Run it
+directly to print the wall time of a batch by the number of workers.
+
+    python benchmarks/bench_http.py
+"""
+
+import threading
+import time
+
+import harness
+
+import six
+import xbmcext.http
+
+LATENCY = 0.02
+REQUESTS = 20
+
+
+class Handler(six.moves.BaseHTTPServer.BaseHTTPRequestHandler):
+    disable_nagle_algorithm = True
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        body = b'{}'
+        self.send_response(200)
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(six.moves.socketserver.ThreadingMixIn, six.moves.BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+def serve():
+    server = Server(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return ['http://127.0.0.1:{}/season/{}'.format(server.server_address[1], index) for index in range(REQUESTS)]
+
+
+@harness.benchmark('http.getAll', workers=[1, 4, 16])
+def getAll(workers):
+    urls = serve()
+    session = xbmcext.http.Session()
+    return lambda: session.getAll(urls, workers=workers, perHost=workers)
+
+
+def main():
+    urls = serve()
+    session = xbmcext.http.Session()
+
+    for workers in (1, 2, 4, 8, 16):
+        start = time.time()
+        session.getAll(urls, workers=workers, perHost=workers)
+        print('http.getAll requests={} latency={:.0f}ms workers={:<3} wall={:.0f}ms'.format(REQUESTS, LATENCY * 1000, workers, (time.time() - start) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmarks the Plugin request lifecycle: URL parsing, route registration, dispatch, URL building and list items.
+"""
+
+import harness
+
+import xbmcext
+
+ROUTES = 100
+
+
+def plugin(url='plugin://plugin.video.example/', routes=ROUTES):
+    plugin = xbmcext.Plugin(1, url)
+
+    for index in range(routes):
+        plugin.route('/section{}/{{id:int}}'.format(index))(lambda id: None)
+
+    return plugin
+
+
+@harness.benchmark('plugin.init', query=[0, 10])
+def init(query):
+    url = 'plugin://plugin.video.example/title/tt5180504?' + '&'.join('key{}={}'.format(index, index) for index in range(query))
+    return lambda: xbmcext.Plugin(1, url)
+
+
+@harness.benchmark('plugin.route', routes=[10, 100, 1000])
+def route(routes):
+    return lambda: plugin(routes=routes)
+
+
+@harness.benchmark('plugin.call', position=['first', 'middle', 'last', 'miss'])
+def call(position):
+    index = {'first': 0, 'middle': ROUTES // 2, 'last': ROUTES - 1, 'miss': ROUTES}[position]
+    instance = plugin('plugin://plugin.video.example/section{}/2023'.format(index))
+
+    def function():
+        try:
+            instance()
+        except xbmcext.NotFoundException:
+            pass
+
+    return function
+
+
+@harness.benchmark('plugin.getUrlFor', endpoint=['path', 'function'])
+def getUrlFor(endpoint):
+    instance = plugin()
+    path = '/section{}/2023'.format(ROUTES - 1) if endpoint == 'path' else instance.routes[-1].function
+    return lambda: instance.getUrlFor(path, id=2023, page=2)
+
+
+@harness.benchmark('plugin.getSerializedUrlFor')
+def getSerializedUrlFor():
+    instance = plugin()
+    return lambda: instance.getSerializedUrlFor('/search', query='Stranger Things', page=2, filters={'genre': [18, 28]})
+
+
+@harness.benchmark('listitem.init', art=[False, True])
+def listItem(art):
+    kwargs = {'iconImage': 'icon.png', 'thumbnailImage': 'thumb.png', 'posterImage': 'poster.png'} if art else {}
+    return lambda: xbmcext.ListItem('Stranger Things', 'TV Series', path='plugin://plugin.video.example/title/tt4574334', **kwargs)
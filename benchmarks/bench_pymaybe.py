@@ -0,0 +1,33 @@
+"""
+Benchmarks looking up nested fields of parsed JSON through chained Maybe wrappers, through compiled paths and through
+maybe_extract.
+"""
+
+import harness
+
+from xbmcext.pymaybe import compile_path, maybe, maybe_extract
+
+ITEM = {'title': {'id': 'tt5180504', 'images': [{'url': 'poster.jpg', 'size': {'width': 1000, 'height': 1500}}]}}
+
+
+@harness.benchmark('pymaybe.lookup', mode=['chained', 'path', 'compiled'], found=[True, False])
+def lookup(mode, found):
+    item = ITEM if found else {'title': {'id': 'tt5180504', 'images': []}}
+
+    if mode == 'chained':
+        return lambda: maybe(item)['title']['images'][0]['size']['width'].or_else(0)
+    elif mode == 'path':
+        return lambda: maybe(item).path('title.images[0].size.width').or_else(0)
+
+    path = compile_path('title.images[0].size.width')
+    return lambda: maybe(item).path(path).or_else(0)
+
+
+@harness.benchmark('pymaybe.extract', mode=['chained', 'extract'])
+def extract(mode):
+    records = [{'info': {'year': 2000 + index % 25, 'plot': 'Plot {}'.format(index)}} if index % 10 else {'info': {}} for index in range(1000)]
+
+    if mode == 'chained':
+        return lambda: [{'year': maybe(record)['info']['year'].or_else(None), 'plot': maybe(record)['info']['plot'].or_else(None)} for record in records]
+
+    return lambda: maybe_extract(records, {'year': 'info.year', 'plot': 'info.plot'})
@@ -0,0 +1,21 @@
+"""
+Benchmarks the ResourceManager load and save round trip.
+"""
+
+import harness
+
+import xbmcext
+
+
+@harness.benchmark('resourcemanager.roundtrip', size=[10, 1000, 100000])
+def roundtrip(size):
+    resources = xbmcext.ResourceManager()
+    resources.update(('tt{:07d}'.format(index), {'title': 'Title {}'.format(index), 'year': 2000 + index % 25}) for index in range(size))
+    resources.save()
+
+    def function():
+        resources = xbmcext.ResourceManager()
+        resources['tt0000000'] = {'title': 'Title', 'year': 2000}
+        resources.save()
+
+    return function
@@ -0,0 +1,76 @@
+"""
+A minimal benchmark harness. Benchmarks register a factory that does the setup and returns the function to time. The
+headless Kodi stand-in is put in front of sys.path so that xbmcext can be imported without Kodi.
+"""
+
+import itertools
+import os
+import sys
+import timeit
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(root, 'xbmcext', 'headless'), root]
+
+import xbmcheadless
+
+benchmarks = []
+
+
+def benchmark(name, **params):
+    """
+    Registers a benchmark factory once for every combination of the parameter values.
+
+    :param name: The name of the benchmark.
+    :type name: str
+    :param params: The parameter values passed to the factory by name.
+    :type params: list
+    :return: A decorator to the factory.
+    :rtype: typing.Callable
+    """
+
+    def decorator(factory):
+        names = sorted(params)
+
+        for values in itertools.product(*(params[key] for key in names)):
+            kwargs = dict(zip(names, values))
+            label = '{}[{}]'.format(name, ','.join('{}={}'.format(key, kwargs[key]) for key in names)) if names else name
+            benchmarks.append((label, factory, kwargs))
+
+        return factory
+
+    return decorator
+
+
+def run(pattern='', repeat=5, seconds=0.2):
+    """
+    Runs the registered benchmarks whose names contain the pattern.
+
+    :param pattern: The pattern to select benchmarks by name.
+    :type pattern: str
+    :param repeat: The number of timed rounds.
+    :type repeat: int
+    :param seconds: The minimum duration of a round, used to choose the number of calls per round.
+    :type seconds: float
+    :return: The best and median seconds per call, and the calls per round, by benchmark name.
+    :rtype: dict[str, dict[str, float]]
+    """
+    results = {}
+
+    for label, factory, kwargs in benchmarks:
+        if pattern not in label:
+            continue
+
+        xbmcheadless.reset()
+        xbmcheadless.recording = False
+        function = factory(**kwargs)
+        timer = timeit.Timer(function)
+        number = 1
+
+        while timer.timeit(number) < seconds and number < 10 ** 7:
+            number *= 10
+
+        times = sorted(time / number for time in timer.repeat(repeat, number))
+        results[label] = {'min': times[0], 'median': times[len(times) // 2], 'number': number}
+        sys.stderr.write('{:<60} {:>12.2f}us\n'.format(label, times[0] * 1e6))
+
+    return results
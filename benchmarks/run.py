@@ -0,0 +1,56 @@
+"""
+Runs the benchmarks and writes the results as JSON so that runs can be compared.
+
+    python benchmarks/run.py --output after.json [--compare before.json] [--threshold 1.2] [pattern]
+
+With --compare, benchmarks that got slower than the threshold ratio are reported and the exit status is 1.
+"""
+
+import argparse
+import glob
+import importlib
+import json
+import os
+import platform
+import sys
+
+import harness
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs the xbmcext benchmarks.')
+    parser.add_argument('pattern', nargs='?', default='', help='only run benchmarks whose names contain the pattern')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--output', help='file to write the JSON results to')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed rounds')
+    parser.add_argument('--threshold', type=float, default=1.2, help='slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_*.py'))):
+        importlib.import_module(os.path.splitext(os.path.basename(path))[0])
+
+    results = {'python': platform.python_version(), 'results': harness.run(args.pattern, args.repeat)}
+
+    if args.output:
+        with open(args.output, 'w') as io:
+            json.dump(results, io, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as io:
+            baseline = json.load(io)['results']
+
+        regressions = 0
+
+        for name, result in sorted(results['results'].items()):
+            if name in baseline:
+                ratio = result['min'] / baseline[name]['min']
+                regressions += ratio > args.threshold
+                print('{:<60} {:>8.2f}x{}'.format(name, ratio, '  REGRESSION' if ratio > args.threshold else ''))
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import os
+import pickle
+import sys
+import types
+import unittest
+
+VENDORED_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'xbmcext', 'enum', '__init__.py')
+
+# xbmcext imports the standard library enum on Python 3, so the backport is loaded under a name of its own.
+enum = sys.modules['vendored_enum'] = types.ModuleType('vendored_enum')
+
+with open(VENDORED_PATH) as io:
+    exec(compile(io.read(), VENDORED_PATH, 'exec'), enum.__dict__)
+
+
+class Color(enum.Enum):
+    _order_ = 'red crimson name value'
+    red = 1
+    crimson = 1
+    name = 2
+    value = 3
+
+
+class SortMethod(enum.IntEnum):
+    LABEL = 1
+    DATE = 3
+
+
+class EnumTest(unittest.TestCase):
+    def test_lookup(self):
+        self.assertIs(Color(1), Color.red)
+        self.assertIs(Color(Color.red), Color.red)
+        self.assertIs(Color.crimson, Color.red)
+        self.assertIs(SortMethod(3.0), SortMethod.DATE)
+        self.assertIs(SortMethod(SortMethod.DATE), SortMethod.DATE)
+        self.assertRaises(ValueError, Color, 4)
+        self.assertRaises(ValueError, Color, [1])
+        self.assertIs(pickle.loads(pickle.dumps(SortMethod.LABEL)), SortMethod.LABEL)
+
+    def test_attributes(self):
+        self.assertEqual((Color.red.name, Color.red.value), ('red', 1))
+        self.assertEqual((Color(1).name, Color.crimson.name), ('red', 'red'))
+        self.assertEqual((Color.name.name, Color.value.value), ('name', 3))
+        self.assertEqual((SortMethod.DATE.name, SortMethod.DATE.value, SortMethod.DATE + 1), ('DATE', 3, 4))
+        self.assertRaises(AttributeError, setattr, Color.red, 'name', 'blue')
+        self.assertRaises(AttributeError, delattr, SortMethod.DATE, 'value')
@@ -0,0 +1,251 @@
+import gzip
+import io
+import os
+import sys
+import threading
+import time
+import unittest
+import zlib
+
+import six
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'xbmcext', 'headless'))
+
+import xbmcheadless
+import xbmcext.http
+
+
+class Handler(six.moves.BaseHTTPServer.BaseHTTPRequestHandler):
+    disable_nagle_algorithm = True
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.client_address[1], self.headers.get('If-None-Match'), self.headers.get('If-Modified-Since')))
+        headers = {'Content-Type': 'application/json; charset=utf-8'}
+        status = 200
+        body = '{{"path": "{}", "version": {}}}'.format(self.path, self.server.version).encode('utf-8')
+
+        if self.path == '/max-age':
+            headers['Cache-Control'] = 'max-age=60'
+        elif self.path == '/etag':
+            headers['Cache-Control'] = 'no-cache'
+            headers['ETag'] = '"v{}"'.format(self.server.version)
+
+            if self.headers.get('If-None-Match') == headers['ETag']:
+                status, body = 304, b''
+        elif self.path == '/last-modified':
+            headers['Cache-Control'] = 'max-age=0'
+            headers['Last-Modified'] = 'Mon, 02 Jan 2023 00:00:00 GMT'
+
+            if self.headers.get('If-Modified-Since') == headers['Last-Modified']:
+                status, body = 304, b''
+        elif self.path == '/stale-while-revalidate':
+            headers['Cache-Control'] = 'max-age=0, stale-while-revalidate=60'
+            headers['ETag'] = '"v{}"'.format(self.server.version)
+        elif self.path == '/vary':
+            headers['Cache-Control'] = 'max-age=60'
+            headers['Vary'] = 'Accept-Language'
+            body = '{{"language": "{}"}}'.format(self.headers.get('Accept-Language')).encode('utf-8')
+        elif self.path == '/no-store':
+            headers['Cache-Control'] = 'no-store, max-age=60'
+        elif self.path == '/gzip':
+            headers['Cache-Control'] = 'max-age=60'
+            headers['Content-Encoding'] = 'gzip'
+            buffer = io.BytesIO()
+
+            with gzip.GzipFile(fileobj=buffer, mode='wb') as file:
+                file.write(body)
+
+            body = buffer.getvalue()
+        elif self.path.startswith('/latency'):
+            time.sleep(0.05)
+        elif self.path == '/deflate':
+            headers['Content-Encoding'] = 'deflate'
+            compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+            body = compressor.compress(body) + compressor.flush()
+        elif self.path == '/redirect':
+            status = 301
+            headers['Location'] = '/max-age'
+        elif self.path == '/drop':
+            self.close_connection = True
+
+        self.send_response(status)
+
+        for name, value in headers.items():
+            self.send_header(name, value)
+
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(six.moves.socketserver.ThreadingMixIn, six.moves.BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class FanOutTest(unittest.TestCase):
+    def setUp(self):
+        xbmcheadless.reset()
+        self.lock = threading.Lock()
+        self.running = {}
+        self.peaks = {}
+
+    def job(self, host, value, seconds=0.02):
+        def function():
+            with self.lock:
+                self.running[host] = self.running.get(host, 0) + 1
+                self.peaks[host] = max(self.peaks.get(host, 0), self.running[host])
+
+            time.sleep(seconds)
+
+            with self.lock:
+                self.running[host] -= 1
+
+            if isinstance(value, Exception):
+                raise value
+
+            return value
+
+        return 'http://{}/'.format(host), function
+
+    def test_order(self):
+        jobs = [self.job('a.example.com' if index % 2 else 'b.example.com', index, 0.01 * (index % 3)) for index in range(12)]
+        self.assertEqual(xbmcext.http.fanOut(jobs, workers=6, perHost=2), list(range(12)))
+        self.assertEqual(self.peaks, {'a.example.com': 2, 'b.example.com': 2})
+
+    def test_exception(self):
+        error = ValueError('Not Found')
+        self.assertEqual(xbmcext.http.fanOut([self.job('a.example.com', 1), self.job('a.example.com', error)]), [1, error])
+
+    def test_workers(self):
+        self.assertRaises(ValueError, xbmcext.http.fanOut, [self.job('a.example.com', 1)], workers=0)
+        self.assertRaises(ValueError, xbmcext.http.fanOut, [self.job('a.example.com', 1)], perHost=0)
+
+    def test_deadline(self):
+        results = xbmcext.http.fanOut([self.job('a.example.com', index, 0.2) for index in range(3)], workers=1, timeout=0.1)
+        self.assertTrue(all(isinstance(result, xbmcext.http.DeadlineException) for result in results))
+
+    def test_abort(self):
+        xbmcheadless.abort.set()
+        results = xbmcext.http.fanOut([self.job('a.example.com', 1, 0.2)])
+        self.assertIsInstance(results[0], xbmcext.http.DeadlineException)
+
+
+class SessionTest(unittest.TestCase):
+    def setUp(self):
+        xbmcheadless.reset()
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.server.requests = []
+        self.server.version = 1
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,))
+        self.thread.start()
+        self.url = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        self.session = self.createSession()
+
+    def tearDown(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def createSession(self, **kwargs):
+        session = xbmcext.http.Session(**kwargs)
+        self.addCleanup(session.close)
+        return session
+
+    def test_max_age(self):
+        self.assertEqual(self.session.get(self.url + '/max-age').json(), {'path': '/max-age', 'version': 1})
+        self.server.version = 2
+        response = self.createSession().get(self.url + '/max-age')
+        self.assertEqual((response.cached, response.json()['version']), (True, 1))
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_etag(self):
+        self.session.get(self.url + '/etag')
+        response = self.session.get(self.url + '/etag')
+        self.assertEqual((response.status, response.cached, response.json()['version']), (200, False, 1))
+        self.server.version = 2
+        self.assertEqual(self.session.get(self.url + '/etag').json()['version'], 2)
+        self.assertEqual([request[2] for request in self.server.requests], [None, '"v1"', '"v1"'])
+
+    def test_last_modified(self):
+        self.session.get(self.url + '/last-modified')
+        self.assertEqual(self.session.get(self.url + '/last-modified').json()['version'], 1)
+        self.assertEqual([request[3] for request in self.server.requests], [None, 'Mon, 02 Jan 2023 00:00:00 GMT'])
+
+    def test_stale_while_revalidate(self):
+        self.session.get(self.url + '/stale-while-revalidate')
+        self.server.version = 2
+        response = self.session.get(self.url + '/stale-while-revalidate')
+        self.assertEqual((response.stale, response.json()['version']), (True, 1))
+        self.session.close()
+        self.assertEqual(self.server.requests[-1][2], '"v1"')
+        self.assertEqual(self.createSession(staleWhileRevalidate=0).get(self.url + '/stale-while-revalidate').json()['version'], 2)
+
+    def test_no_store(self):
+        self.session.get(self.url + '/no-store')
+        self.session.get(self.url + '/no-store')
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertFalse(os.path.exists(self.session.cache.path) and os.listdir(self.session.cache.path))
+
+    def test_vary(self):
+        self.assertEqual(self.session.get(self.url + '/vary', {'Accept-Language': 'de'}).json(), {'language': 'de'})
+        self.assertEqual(self.session.get(self.url + '/vary', {'Accept-Language': 'fr'}).json(), {'language': 'fr'})
+        response = self.session.get(self.url + '/vary', {'Accept-Language': 'de'})
+        self.assertEqual((response.cached, response.json()), (True, {'language': 'de'}))
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_uncacheable(self):
+        self.session.get(self.url + '/plain')
+        self.session.get(self.url + '/plain')
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertIsNone(self.session.cache.get(self.url + '/plain'))
+
+    def test_keep_alive(self):
+        session = self.createSession(cache=False)
+
+        for index in range(3):
+            session.get(self.url + '/max-age')
+
+        session.close()
+        self.assertEqual(len(set(request[1] for request in self.server.requests)), 1)
+
+    def test_gzip(self):
+        response = self.session.get(self.url + '/gzip')
+        self.assertEqual(response.text(), '{"path": "/gzip", "version": 1}')
+        self.assertNotIn('content-encoding', response.headers)
+
+    def test_deflate(self):
+        self.assertEqual(self.session.get(self.url + '/deflate').json(), {'path': '/deflate', 'version': 1})
+
+    def test_retry(self):
+        session = self.createSession(cache=False)
+        session.request('GET', self.url + '/drop')
+        self.assertEqual(session.request('GET', self.url + '/max-age').status, 200)
+        session.request('GET', self.url + '/drop')
+        self.assertRaises((six.moves.http_client.HTTPException, EnvironmentError), session.request, 'POST', self.url + '/max-age', b'{}')
+        self.assertEqual([request[0] for request in self.server.requests], ['/drop', '/max-age', '/drop'])
+
+    def test_redirect(self):
+        response = self.session.get(self.url + '/redirect')
+        self.assertEqual((response.url, response.json()['path']), (self.url + '/max-age', '/max-age'))
+
+    def test_get_all(self):
+        urls = [self.url + '/latency/{}'.format(index) for index in range(8)]
+        start = time.time()
+        responses = self.session.getAll(urls, workers=8, perHost=8)
+        self.assertLess(time.time() - start, 0.05 * 8)
+        self.assertEqual([response.json()['path'] for response in responses], ['/latency/{}'.format(index) for index in range(8)])
+
+    def test_window_cache(self):
+        session = self.createSession(cache=xbmcext.WindowCache('http'))
+        session.get(self.url + '/max-age')
+        response = self.createSession(cache=xbmcext.WindowCache('http')).get(self.url + '/max-age')
+        self.assertEqual((response.cached, response.json()['version']), (True, 1))
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertFalse(os.path.exists(self.session.cache.path))
@@ -0,0 +1,49 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'xbmcext', 'headless'))
+
+import xbmcheadless
+import xbmcext.jsonrpc
+
+
+class ClientTest(unittest.TestCase):
+    def setUp(self):
+        xbmcheadless.reset()
+        self.commands = []
+        xbmcheadless.jsonrpc = self.answer
+
+    def answer(self, command):
+        self.commands.append(command)
+        responses = []
+
+        for request in json.loads(command):
+            if request['method'] == 'VideoLibrary.GetMovieDetails':
+                responses.append({'id': request['id'], 'jsonrpc': '2.0', 'result': {'moviedetails': {'movieid': request['params']['movieid'], 'playcount': request['params']['movieid'] % 3}}})
+            else:
+                responses.append({'id': request['id'], 'jsonrpc': '2.0', 'error': {'code': -32601, 'message': 'Method not found.'}})
+
+        return json.dumps(responses[::-1] if len(responses) == 2 else responses)
+
+    def test_batch(self):
+        client = xbmcext.jsonrpc.Client()
+        results = client.batch(('VideoLibrary.GetMovieDetails', {'movieid': movieId, 'properties': ['playcount']}) for movieId in range(500))
+        self.assertEqual(len(self.commands), 1)
+        self.assertEqual([result['moviedetails']['playcount'] for result in results], [movieId % 3 for movieId in range(500)])
+
+        results = client.batch([('JSONRPC.Unknown', None), ('VideoLibrary.GetMovieDetails', {'movieid': 4})])
+        self.assertIsInstance(results[0], xbmcext.jsonrpc.JSONRPCException)
+        self.assertEqual(results[0].code, -32601)
+        self.assertEqual(results[1], {'moviedetails': {'movieid': 4, 'playcount': 1}})
+
+    def test_call(self):
+        client = xbmcext.jsonrpc.Client()
+        self.assertEqual(client.call('VideoLibrary.GetMovieDetails', {'movieid': 7}, cache=True), {'moviedetails': {'movieid': 7, 'playcount': 1}})
+        self.assertEqual(client.call('VideoLibrary.GetMovieDetails', {'movieid': 7}, cache=True), {'moviedetails': {'movieid': 7, 'playcount': 1}})
+        self.assertEqual(len(self.commands), 1)
+
+        client.batch([('VideoLibrary.GetMovieDetails', {'movieid': 7}), ('VideoLibrary.GetMovieDetails', {'movieid': 8}), ('VideoLibrary.GetMovieDetails', {'movieid': 8})], cache=True)
+        self.assertEqual([request['params'] for request in json.loads(self.commands[-1])], [{'movieid': 8}])
+        self.assertRaises(xbmcext.jsonrpc.JSONRPCException, client.call, 'JSONRPC.Unknown')
@@ -0,0 +1,79 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import six
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'xbmcext', 'headless'))
+
+import xbmcext.profile
+
+ADDON_XML = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<addon id="plugin.video.example" name="Example" version="1.0.0" provider-name="example">
+    <extension point="xbmc.python.pluginsource" library="main.py">
+        <provides>video</provides>
+    </extension>
+</addon>
+'''
+
+MAIN_PY = '''import xbmcext
+
+plugin = xbmcext.Plugin()
+
+
+@plugin.route('/title/{id}')
+def title(id, page):
+    plugin.endOfDirectory()
+
+
+plugin()
+'''
+
+
+class ProfileTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addonPath = os.path.join(self.root, 'plugin.video.example')
+        os.mkdir(self.addonPath)
+
+        with open(os.path.join(self.addonPath, 'addon.xml'), 'w') as io:
+            io.write(ADDON_XML)
+
+        with open(os.path.join(self.addonPath, 'main.py'), 'w') as io:
+            io.write(MAIN_PY)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_getEntryPoint(self):
+        self.assertEqual(xbmcext.profile.getEntryPoint(self.addonPath), os.path.join(self.addonPath, 'main.py'))
+        os.remove(os.path.join(self.addonPath, 'addon.xml'))
+        self.assertEqual(xbmcext.profile.getEntryPoint(self.addonPath), os.path.join(self.addonPath, 'default.py'))
+
+    def test_parseImportTimes(self):
+        stderr = '\n'.join(['import time: self [us] | cumulative | imported package',
+                            'import time:       100 |        100 | argparse',
+                            xbmcext.profile.MARKER,
+                            'import time:        30 |         30 |   six',
+                            'import time:       200 |        230 | xbmcext',
+                            'Traceback (most recent call last):'])
+        self.assertEqual(xbmcext.profile.parseImportTimes(stderr), ([('six', 1, 30, 30), ('xbmcext', 0, 200, 230)], ['Traceback (most recent call last):']))
+
+    def test_main(self):
+        output = os.path.join(self.root, 'profile')
+        stdout = sys.stdout
+        sys.stdout = six.StringIO()
+
+        try:
+            self.assertEqual(xbmcext.profile.main(['plugin://plugin.video.example/title/tt5180504?page=2', '--addon', self.addonPath, '--output', output]), 0)
+            report = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+
+        self.assertEqual([line.split()[0] for line in report.splitlines() if not line.startswith(' ')][-6:], ['Run', 'Dispatch', 'Handler', 'Kodi', 'Profile', 'Stacks'])
+        self.assertIn(os.path.join(output, 'profile.prof'), report)
+        self.assertTrue(os.path.getsize(os.path.join(output, 'profile.prof')))
+        self.assertTrue(os.path.getsize(os.path.join(output, 'profile.collapsed')))
+        self.assertFalse(os.path.exists(os.path.join(output, 'child.json')))
@@ -0,0 +1,47 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'xbmcext', 'headless'))
+
+from xbmcext.pymaybe import _PATHS_SIZE, Nothing, Path, Something, compile_path, maybe, maybe_extract
+
+
+class MaybeTest(unittest.TestCase):
+    def test_nothing(self):
+        self.assertIs(Nothing(), maybe(None))
+        self.assertIs(maybe(None).title['id'].lower(), Nothing())
+        self.assertRaises(AttributeError, setattr, Something('tt5180504'), 'id', 'tt5180504')
+
+    def test_path(self):
+        class Title(object):
+            def __init__(self, id):
+                self.id = id
+
+        item = maybe({'title': Title('tt5180504'), 'images': [{'url': 'poster.jpg'}], 'size.width': 1000})
+        self.assertEqual(item.path('title.id').get(), 'tt5180504')
+        self.assertEqual(item.path('images[0].url').get(), 'poster.jpg')
+        self.assertEqual(item.path('images[-1]["url"]').get(), 'poster.jpg')
+        self.assertEqual(item.path("['size.width']").get(), 1000)
+        self.assertIs(item.path('images[1].url'), Nothing())
+        self.assertIs(item.path('title.name.first'), Nothing())
+        self.assertIs(maybe(None).path('title.id'), Nothing())
+        self.assertEqual(item.path(Path('title.id')).or_else(''), 'tt5180504')
+
+        for path in ('.title', 'title..id', 'images[0]url', 'images[first]'):
+            self.assertRaises(ValueError, Path, path)
+
+    def test_compile_path(self):
+        path = compile_path('title.id')
+        self.assertIs(compile_path('title.id'), path)
+
+        for index in range(_PATHS_SIZE):
+            compile_path('images[{}].url'.format(index))
+
+        self.assertIsNot(compile_path('title.id'), path)
+
+    def test_maybe_extract(self):
+        records = [{'info': {'year': 2016, 'plot': 'A boy vanishes.'}}, maybe({'info': {'year': 2017}}), None, maybe(None)]
+        self.assertEqual(maybe_extract(records, {'year': 'info.year', 'plot': Path('info.plot')}, default=''),
+                         [{'year': 2016, 'plot': 'A boy vanishes.'}, {'year': 2017, 'plot': ''}, {'year': '', 'plot': ''}, {'year': '', 'plot': ''}])
+        self.assertEqual(maybe_extract(iter(records), {'year': 'info.year'}, columns=True), {'year': [2016, 2017, None, None]})
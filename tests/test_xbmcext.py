@@ -1,9 +1,145 @@
+import base64
+import collections
+import functools
+import json
+import os
+import pickle
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
 
 import parameterized
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'xbmcext', 'headless'))
+
+import xbmcgui
+import xbmcheadless
+import xbmcext
+
+RESOURCE_WRITER = '''import sys
+sys.path[:0] = [sys.argv[1], sys.argv[2]]
+import xbmcheadless
+xbmcheadless.reset(addonPath=sys.argv[3])
 import xbmcext
 
+for index in range(20):
+    resources = xbmcext.ResourceManager()
+    resources['{}-{}'.format(sys.argv[4], index)] = index
+    resources.pop('shared', None)
+    resources.save()
+'''
+
+
+def createPlugin(routes, handle=None, url=None, **kwargs):
+    plugin = xbmcext.Plugin(handle, url, **kwargs)
+    routes(plugin)
+    return plugin
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        xbmcheadless.reset()
+        self.path = os.path.join(xbmcext.getAddonProfilePath(), 'cache')
+
+    def test_disk_cache(self):
+        cache = xbmcext.DiskCache(self.path)
+        cache.set('/title/tt5180504', {'title': 'Stranger Things'})
+        cache.set('/title/tt4574334', 'Dark', ttl=-1)
+        self.assertEqual(xbmcext.DiskCache(self.path).get('/title/tt5180504'), {'title': 'Stranger Things'})
+        self.assertIsNone(cache.get('/title/tt4574334'))
+        cache.delete('/title/tt5180504')
+        self.assertEqual(cache.get('/title/tt5180504', 'missing'), 'missing')
+        self.assertEqual(os.listdir(self.path), [])
+
+    def test_window_cache(self):
+        cache = xbmcext.WindowCache(budget=100, fallback=xbmcext.DiskCache(self.path))
+        cache.USE_RESOLUTION = 0
+        cache.set('c', 'z' * 20, ttl=-1)
+        cache.set('a', 'x' * 20)
+        cache.set('b', 'y' * 20)
+        self.assertIsNone(cache.get('c'))
+        self.assertEqual(cache.get('a'), 'x' * 20)
+        self.assertFalse(os.path.exists(self.path))
+
+        cache.set('d', 'w' * 20)
+        self.assertEqual(os.listdir(self.path), [xbmcext.DiskCache(self.path)._getPath(cache._getName('b'))[len(self.path) + 1:]])
+        self.assertEqual([cache.get(key) for key in 'abd'], ['x' * 20, 'y' * 20, 'w' * 20])
+
+        cache.set('e', 'v' * 200)
+        self.assertEqual(cache.get('e'), 'v' * 200)
+        self.assertEqual(len(os.listdir(self.path)), 2)
+
+        xbmcheadless.properties[10000].clear()
+        self.assertEqual(cache.get('e'), 'v' * 200)
+
+        cache.clear()
+        self.assertFalse(xbmcheadless.properties[10000])
+        self.assertEqual(os.listdir(self.path), [])
+
+    def test_window_cache_threads(self):
+        cache = xbmcext.WindowCache()
+
+        def work(thread):
+            for index in range(20):
+                cache.set('{}-{}'.format(thread, index), index)
+
+        threads = [threading.Thread(target=work, args=(thread,)) for thread in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(cache._readIndex()), 160)
+        self.assertEqual(len(xbmcheadless.properties[10000]), 161)
+        self.assertEqual(cache.get('7-19'), 19)
+
+        index = xbmcheadless.properties[10000]['plugin.video.example.cache']
+        self.assertEqual(cache.get('7-18'), 18)
+        self.assertIs(xbmcheadless.properties[10000]['plugin.video.example.cache'], index)
+
+    def test_window_cache_lock(self):
+        cache = xbmcext.WindowCache()
+        xbmcgui.Window(10000).setProperty('plugin.video.example.cache.lock', 'other {}'.format(time.time() + 0.1))
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertFalse(xbmcgui.Window(10000).getProperty('plugin.video.example.cache.lock'))
+
+
+class DialogTest(unittest.TestCase):
+    def setUp(self):
+        xbmcheadless.reset()
+
+    def test_multiselecttab(self):
+        options = xbmcext.TabOptions(collections.OrderedDict([(('Genre', 'genre'), [('Action', 28), ('Comedy', 35), ('Drama', 18)]), ('Year', ['2022', '2023'])]))
+        xbmcheadless.script(('focus', 1110), ('select', 1120, 2), ('click', 1120), ('select', 1120, 0), ('click', 1120),
+                            ('select', 1110, 1), ('action', xbmcgui.ACTION_MOVE_DOWN), ('select', 1120, 1), ('click', 1120), ('click', 1131))
+        self.assertEqual(xbmcext.Dialog().multiselecttab('Filter', options), {'genre': [18, 28], 'Year': ['2023']})
+
+        xbmcheadless.script(('focus', 1110), ('select', 1120, 1), ('click', 1120), ('action', xbmcgui.ACTION_NAV_BACK))
+        self.assertIsNone(xbmcext.Dialog().multiselecttab('Filter', options))
+
+    def test_multiselecttabsearch(self):
+        options = collections.OrderedDict([('Genre', ['Action', 'Adventure', 'Comedy', 'Romantic Comedy']), ('Year', ['2022', '2023'])])
+        windows = []
+        xbmcheadless.script(windows.append, ('focus', 1110), ('focus', 1140), ('text', 1140, 'comedy'), lambda window: window.onSearchTextChanged(),
+                            ('select', 1120, 1), ('click', 1120), ('text', 1140, ''), lambda window: window.onSearchTextChanged(), ('click', 1131))
+        self.assertEqual(xbmcext.Dialog().multiselecttabsearch('Search', options, filterOptions=True), ('', {'Genre': ['Romantic Comedy'], 'Year': []}))
+        self.assertEqual([item.getLabel() for item in windows[0].getControl(1120).items], ['Action', 'Adventure', 'Comedy', '[COLOR orange]Romantic Comedy[/COLOR]'])
+
+    def test_selecttab(self):
+        options = collections.OrderedDict([('Genre', ['Action', 'Comedy', 'Drama']), ('Year', ['2022', '2023'])])
+        xbmcheadless.script(('focus', 1110), ('select', 1120, 1), ('click', 1120), ('select', 1120, 2), ('click', 1120),
+                            ('select', 1110, 1), ('action', xbmcgui.ACTION_MOVE_DOWN), ('select', 1120, 0), ('click', 1120), ('click', 1131))
+        self.assertEqual(xbmcext.Dialog().selecttab('Filter', options, preselect={'Genre': 'Action'}), {'Genre': 'Drama', 'Year': '2022'})
+        self.assertEqual(xbmcheadless.count('ListItem.setLabel'), 5)
+
 
 class PluginTest(unittest.TestCase):
     @parameterized.parameterized.expand([
@@ -64,3 +200,556 @@ class PluginTest(unittest.TestCase):
             self.assertEqual(listId, 53181649)
 
         plugin.redirect('/video/vi4275684633', listId=53181649)
+
+    def test_converter(self):
+        plugin = xbmcext.Plugin(0, 'plugin://plugin.video.example/event/2023-01-31')
+        plugin.converter('date', regex=r'\d{4}-\d{2}-\d{2}', to_python=lambda value: tuple(map(int, value.split('-'))),
+                         to_url=lambda value: '{:04d}-{:02d}-{:02d}'.format(*value))
+        calls = []
+
+        @plugin.route('/event/{id:int}')
+        def event(id):
+            calls.append(('event', id))
+
+        @plugin.route('/event/{date:date}')
+        def events(date):
+            calls.append(('events', date))
+
+        plugin()
+        self.assertEqual(calls, [('events', (2023, 1, 31))])
+        self.assertEqual(plugin.getUrlFor(event, id=2023), 'plugin://plugin.video.example/event/2023')
+        self.assertEqual(plugin.getUrlFor(events, date=(2023, 1, 31)), 'plugin://plugin.video.example/event/2023-01-31')
+        self.assertEqual(plugin.getSerializedUrlFor(event, id=2023, page=2), 'plugin://plugin.video.example/event/2023?page=2')
+        self.assertRaises(xbmcext.NotFoundException, plugin.getUrlFor, events)
+
+        def dispatch(url):
+            plugin = xbmcext.Plugin(0, url)
+
+            @plugin.route('/rating/{value:float}')
+            def rating(value):
+                calls.append(('rating', value))
+
+            @plugin.route('/search/{query}')
+            def search(query):
+                calls.append(('search', query))
+
+            plugin()
+            return plugin, rating, search
+
+        plugin, rating, search = dispatch('plugin://plugin.video.example/rating/1.5')
+
+        for url in (plugin.getUrlFor(rating, value=1e20), plugin.getUrlFor(rating, value=-2.5e-07), plugin.getUrlFor(search, query='Stranger Things')):
+            dispatch(url)
+
+        self.assertEqual(calls[1:], [('rating', 1.5), ('rating', 1e20), ('rating', -2.5e-07), ('search', 'Stranger Things')])
+
+    def test_redirect_function(self):
+        plugin = xbmcext.Plugin(0, 'plugin://plugin.video.example/login')
+        calls = []
+
+        @plugin.route('/login')
+        def login():
+            calls.append('login')
+            plugin.redirect('/')
+
+        @plugin.route('/')
+        def home():
+            calls.append('home')
+            plugin.redirect(video, videoId='vi4275684633', listId=53181649)
+
+        @plugin.route('/video/{videoId}')
+        def video(videoId, listId):
+            calls.append('video')
+            self.assertEqual(plugin.getFullPath(), '/video/vi4275684633?listId=53181649')
+
+        plugin()
+        self.assertEqual(calls, ['login', 'home', 'video'])
+
+        plugin.redirects = 0
+        self.assertRaises(xbmcext.NotFoundException, plugin.redirect, video, videoId='vi4275684633')
+        self.assertRaises(xbmcext.NotFoundException, plugin.redirect, lambda: None)
+        self.assertEqual(calls, ['login', 'home', 'video'])
+
+    def test_redirect_loop(self):
+        plugin = xbmcext.Plugin(0, 'plugin://plugin.video.example/')
+
+        @plugin.route('/')
+        def home():
+            plugin.redirect(home)
+
+        self.assertRaises(xbmcext.RedirectLoopException, plugin)
+
+    def test_not_found(self):
+        plugin = xbmcext.Plugin(0, 'plugin://plugin.video.example/titles/tt5180504')
+
+        @plugin.route('/')
+        def home():
+            pass
+
+        @plugin.route('/title/{id}')
+        def title(id, page):
+            pass
+
+        with self.assertRaises(xbmcext.NotFoundException) as context:
+            plugin()
+
+        self.assertEqual(plugin._getRoutes('/title/tt5180504')[0].path, '/title/{id}')
+        self.assertEqual([route.path for route in context.exception.candidates], ['/title/{id}'])
+        self.assertEqual(context.exception.reasons, [])
+        self.assertEqual(str(context.exception), 'A route could not be found for "/titles/tt5180504". Closest routes: "/title/{id}".')
+
+        with self.assertRaises(xbmcext.NotFoundException) as context:
+            plugin.redirect('/title/tt5180504', season=1)
+
+        self.assertEqual([route.path for route in context.exception.candidates], ['/title/{id}'])
+        self.assertEqual(context.exception.reasons, ['"/title/{id}" matched but is missing page and does not accept season.'])
+
+    @parameterized.parameterized.expand([
+        ['plugin://plugin.video.example/pressroom/bio', 'bio'],
+        ['plugin://plugin.video.example/pressroom/2023', 'year'],
+        ['plugin://plugin.video.example/pressroom/vi3337078041', 'video'],
+        ['plugin://plugin.video.example/pressroom/news', 'pressroom']
+    ])
+    def test_specificity(self, url, expected):
+        plugin = xbmcext.Plugin(0, url, order=xbmcext.RouteOrder.SPECIFICITY)
+        calls = []
+
+        @plugin.route('/{section}/{page}')
+        def section(section, page):
+            calls.append('section')
+
+        @plugin.route('/pressroom/{}')
+        def pressroom():
+            calls.append('pressroom')
+
+        @plugin.route(r'/pressroom/{:re("vi\d{10}")}')
+        def video():
+            calls.append('video')
+
+        @plugin.route('/pressroom/{year:int}')
+        def year(year):
+            calls.append('year')
+
+        @plugin.route('/pressroom/bio')
+        def bio():
+            calls.append('bio')
+
+        plugin()
+        self.assertEqual(calls, [expected])
+        self.assertEqual([route.path for route in plugin._getRoutes('/pressroom/news')],
+                         ['/pressroom/bio', '/pressroom/{year:int}', r'/pressroom/{:re("vi\d{10}")}', '/pressroom/{}', '/{section}/{page}'])
+
+        @plugin.route('/pressroom/news')
+        def news():
+            calls.append('news')
+
+        self.assertEqual([route.path for route in plugin._getRoutes('/pressroom/news')][:2], ['/pressroom/bio', '/pressroom/news'])
+
+    def test_hits(self):
+        xbmcheadless.reset()
+
+        def routes(plugin):
+            @plugin.route('/video/search')
+            def search():
+                pass
+
+            @plugin.route('/video/search')
+            def search(q):
+                pass
+
+        plugin = functools.partial(createPlugin, routes, 0, order=xbmcext.RouteOrder.HITS)
+
+        self.assertEqual([route.key for route in plugin('plugin://plugin.video.example/')._getRoutes('/video/search')], ['/video/search()', '/video/search(q)'])
+
+        for query in ('Stranger', 'Things', 'Dark'):
+            plugin('plugin://plugin.video.example/video/search?q="{}"'.format(query))()
+
+        plugin('plugin://plugin.video.example/video/search')()
+        self.assertEqual([route.key for route in plugin('plugin://plugin.video.example/')._getRoutes('/video/search')], ['/video/search(q)', '/video/search()'])
+        self.assertEqual(plugin('plugin://plugin.video.example/').getRouteStats(), [('/video/search(q)', 3), ('/video/search()', 1)])
+
+    def test_hits_compaction(self):
+        xbmcheadless.reset()
+        instance = xbmcext.Plugin(0, 'plugin://plugin.video.example/', order=xbmcext.RouteOrder.HITS)
+        instance.HITS_COMPACTION = 4
+
+        @instance.route('/')
+        def home():
+            pass
+
+        for index in range(10):
+            instance()
+
+        with open(os.path.join(xbmcext.getAddonProfilePath(), xbmcext.Plugin.HITS_FILE)) as io:
+            self.assertLessEqual(len(io.readlines()), 4)
+
+        self.assertEqual(instance.getRouteStats(), [('/()', 10)])
+
+    def test_paginate(self):
+        xbmcheadless.reset()
+        built = []
+        pages = {None: (['a', 'b'], 'token-2'), 'token-2': (['c'], None)}
+
+        def routes(plugin):
+            def build(entry):
+                built.append(entry)
+                return plugin.getSerializedUrlFor('/title/{}'.format(entry)), xbmcext.ListItem(str(entry)), True
+
+            @plugin.route('/titles')
+            def titles(genre):
+                plugin.paginate(range(1000), build, pageSize=20)
+                plugin.endOfDirectory()
+
+            @plugin.route('/popular')
+            def popular():
+                plugin.paginate(iter(range(45)), build, pageSize=20)
+
+            @plugin.route('/search')
+            def search():
+                plugin.paginate(lambda position, pageSize: pages[position], build)
+
+            @plugin.route('/feed')
+            def feed(cursor):
+                built.append(cursor)
+
+        plugin = functools.partial(createPlugin, routes)
+
+        plugin(1, 'plugin://plugin.video.example/titles?genre="drama"')()
+        self.assertEqual(built, list(range(20)))
+        self.assertEqual(xbmcheadless.directory(1)['properties'], {'TotalEntries': '1000'})
+        self.assertEqual([call.args[2] for call in xbmcheadless.calls if call.name == 'xbmcplugin.addDirectoryItems'], [1000])
+        url, item, isFolder = xbmcheadless.directory(1)['items'][-1]
+        self.assertEqual((len(xbmcheadless.directory(1)['items']), item.getLabel(), item.getProperty('SpecialSort')), (21, 'Next page', 'bottom'))
+
+        del built[:]
+        plugin(2, url)()
+        self.assertEqual(built, list(range(20, 40)))
+        self.assertIn('genre', xbmcheadless.directory(2)['items'][-1][0])
+
+        del built[:]
+        plugin(3, 'plugin://plugin.video.example/popular')()
+        plugin(4, xbmcheadless.directory(3)['items'][-1][0])()
+        plugin(5, xbmcheadless.directory(4)['items'][-1][0])()
+        self.assertEqual(built, list(range(45)))
+        self.assertEqual(len(xbmcheadless.directory(5)['items']), 5)
+
+        del built[:]
+        plugin(6, 'plugin://plugin.video.example/search')()
+        plugin(7, xbmcheadless.directory(6)['items'][-1][0])()
+        self.assertEqual(built, ['a', 'b', 'c'])
+        self.assertEqual(len(xbmcheadless.directory(7)['items']), 1)
+
+        del built[:]
+        plugin(8, 'plugin://plugin.video.example/titles?genre="drama"&xbmcext.cursor="garbage"')()
+        plugin(9, 'plugin://plugin.video.example/titles?genre="drama"&xbmcext.cursor="{}"'.format(base64.urlsafe_b64encode(b'"20"').decode('ascii')))()
+        plugin(10, 'plugin://plugin.video.example/feed?cursor="abc"')()
+        self.assertEqual(built, list(range(20)) + list(range(20)) + ['abc'])
+
+    def test_paginate_sorted(self):
+        xbmcheadless.reset()
+        records = [{'label': label, 'year': year} for label, year in (('The Zoo', 2001), ('Episode 10', 1999), ('episode 9', 2001), ('Alien', None))]
+        version = [1]
+        self.assertEqual([record['label'] for record in xbmcext.SortMethod.LABEL_IGNORE_THE.sort(records)], ['Alien', 'episode 9', 'Episode 10', 'The Zoo'])
+        self.assertEqual([record['label'] for record in xbmcext.SortMethod.VIDEO_YEAR.sort(records, reverse=True)], ['The Zoo', 'episode 9', 'Episode 10', 'Alien'])
+        self.assertEqual(xbmcext.SortMethod.UNSORTED.sort(records), records)
+        self.assertEqual([record['year'] for record in xbmcext.SortMethod.VIDEO_YEAR.sort([{'year': 2001}, {'year': '1999'}, {'year': 'unknown'}, {'year': 2000.5}])],
+                         ['1999', 2000.5, 2001, 'unknown'])
+
+        def routes(plugin):
+            @plugin.route('/titles')
+            def titles():
+                plugin.paginate(records, lambda record: ('', xbmcext.ListItem(record['label']), False), pageSize=3, sortMethod=xbmcext.SortMethod.LABEL_IGNORE_THE,
+                                version=version[0])
+
+        plugin = functools.partial(createPlugin, routes)
+
+        plugin(1, 'plugin://plugin.video.example/titles')()
+        self.assertTrue(xbmcgui.Window(10000).getProperty('plugin.video.example.sort'))
+        plugin(2, xbmcheadless.directory(1)['items'][-1][0])()
+        self.assertEqual([item.getLabel() for url, item, isFolder in xbmcheadless.directory(1)['items'] + xbmcheadless.directory(2)['items']],
+                         ['Alien', 'episode 9', 'Episode 10', 'Next page', 'The Zoo'])
+
+        records[:] = [{'label': label} for label in ('w', 'x', 'y', 'z')]
+        version[0] = 2
+        plugin(3, xbmcheadless.directory(1)['items'][-1][0])()
+        self.assertEqual([item.getLabel() for url, item, isFolder in xbmcheadless.directory(3)['items']], ['z'])
+        plugin(4, 'plugin://plugin.video.example/titles')()
+        self.assertEqual([item.getLabel() for url, item, isFolder in xbmcheadless.directory(4)['items']], ['w', 'x', 'y', 'Next page'])
+
+    def test_prefetch(self):
+        xbmcheadless.reset()
+        calls = []
+
+        def routes(plugin):
+            @plugin.route('/title/{id}')
+            def title(id):
+                calls.append(('title', id))
+                plugin.addDirectoryItems([(plugin.getSerializedUrlFor(season, id=id, season=number), xbmcext.ListItem('Season {}'.format(number)), True)
+                                          for number in (1, 2)])
+                plugin.endOfDirectory()
+                plugin.prefetch([plugin.getUrlFor(title, id=id, note='plain'), plugin.getSerializedUrlFor(season, id=id, season=1)])
+
+            @plugin.route('/title/{id}/season/{season:int}')
+            def season(id, season):
+                calls.append(('season', id, season))
+                item = xbmcext.ListItem('Episode 1', posterImage='poster.png')
+                item.getVideoInfoTag().setTitle('Chapter One')
+                plugin.setContent('episodes')
+                plugin.addDirectoryItems([(plugin.getSerializedUrlFor('/play', id='tt5180504'), item, False)])
+                plugin.addSortMethods(xbmcext.SortMethod.EPISODE)
+                plugin.endOfDirectory()
+
+            @plugin.route('/wait/{seconds:float}')
+            def wait(seconds):
+                calls.append(('wait', seconds))
+                time.sleep(seconds)
+                plugin.endOfDirectory()
+
+            @plugin.route('/impatient')
+            def impatient():
+                plugin.endOfDirectory()
+                plugin.prefetch([plugin.getUrlFor(wait, seconds=0.2)], budget=0.05)
+
+        plugin = functools.partial(createPlugin, routes, order=xbmcext.RouteOrder.HITS)
+
+        instance = plugin(0, 'plugin://plugin.video.example/title/tt4574334/season/2')
+        instance()
+        self.assertIsNone(instance.prefetchCache)
+
+        del calls[:]
+        instance = plugin(1, 'plugin://plugin.video.example/title/tt4574334')
+        instance()
+        instance.prefetcher.join()
+        self.assertTrue(instance.prefetcher.daemon)
+        self.assertEqual(instance.path, '/title/tt4574334')
+        self.assertEqual(calls, [('title', 'tt4574334'), ('season', 'tt4574334', 1)])
+        self.assertEqual(len(xbmcheadless.directory(1)['items']), 2)
+        self.assertEqual(instance.getRouteStats(), [('/title/{id}(id)', 1), ('/title/{id}/season/{season:int}(id, season)', 1)])
+
+        del calls[:]
+        plugin(2, 'plugin://plugin.video.example/title/tt4574334/season/1')()
+        self.assertEqual(calls, [])
+        self.assertEqual(xbmcheadless.directory(2)['content'], 'episodes')
+        self.assertEqual(xbmcheadless.directory(2)['sortMethods'], [xbmcext.SortMethod.EPISODE])
+        self.assertTrue(xbmcheadless.directory(2)['ended'])
+        url, item, isFolder = xbmcheadless.directory(2)['items'][0]
+        self.assertEqual((item.getLabel(), item.getArt('poster'), item.getVideoInfoTag().getTitle()), ('Episode 1', 'poster.png', 'Chapter One'))
+
+        plugin(3, 'plugin://plugin.video.example/title/tt4574334/season/1')()
+        self.assertEqual(calls, [('season', 'tt4574334', 1)])
+
+        del calls[:]
+        instance = plugin(4, 'plugin://plugin.video.example/impatient')
+        instance()
+        instance.prefetcher.join()
+        plugin(5, 'plugin://plugin.video.example/wait/0.2')()
+        self.assertEqual(calls, [('wait', 0.2), ('wait', 0.2)])
+
+    def test_serve(self):
+        xbmcheadless.reset()
+        calls = []
+
+        def routes(name, plugin):
+            @plugin.route('/title/{id}')
+            def title(id):
+                calls.append((name, id))
+                plugin.setContent('tvshows')
+                plugin.addDirectoryItems([(plugin.getSerializedUrlFor('/title/{}/season/1'.format(id)), xbmcext.ListItem('Season 1'), True)])
+                plugin.endOfDirectory()
+                plugin.prefetch([plugin.getSerializedUrlFor(season, id=id, season=number) for number in (1, 2, 3)])
+
+            @plugin.route('/title/{id}/season/{season:int}')
+            def season(id, season):
+                time.sleep(0.2)
+                plugin.endOfDirectory()
+
+            @plugin.route('/fail')
+            def fail():
+                calls.append((name, 'fail'))
+                raise ValueError('Failed')
+
+            if name == 'front':
+                @plugin.route('/local')
+                def local():
+                    calls.append((name, 'local'))
+
+        service = threading.Thread(target=createPlugin(functools.partial(routes, 'service')).serve)
+        service.start()
+
+        while not xbmcgui.Window(10000).getProperty('plugin.video.example.service'):
+            time.sleep(0.01)
+
+        try:
+            createPlugin(functools.partial(routes, 'front'), 7, 'plugin://plugin.video.example/title/tt4574334')()
+            self.assertEqual(calls, [('service', 'tt4574334')])
+            self.assertEqual(xbmcheadless.directory(7)['content'], 'tvshows')
+            self.assertEqual([item.getLabel() for url, item, isFolder in xbmcheadless.directory(7)['items']], ['Season 1'])
+            self.assertTrue(xbmcheadless.directory(7)['ended'])
+
+            createPlugin(functools.partial(routes, 'front'), 8, 'plugin://plugin.video.example/title/tt5180504')()
+            self.assertEqual(calls, [('service', 'tt4574334'), ('service', 'tt5180504')])
+            self.assertTrue(xbmcheadless.directory(8)['ended'])
+
+            self.assertRaises(xbmcext.ServiceException, createPlugin(functools.partial(routes, 'front'), 9, 'plugin://plugin.video.example/fail'))
+            self.assertEqual(calls[2:], [('service', 'fail')])
+            createPlugin(functools.partial(routes, 'front'), 10, 'plugin://plugin.video.example/local')()
+        finally:
+            xbmcheadless.abort.set()
+            service.join()
+
+        self.assertFalse(xbmcgui.Window(10000).getProperty('plugin.video.example.service'))
+        self.assertFalse(xbmcgui.Window(10000).getProperty('plugin.video.example.handoff'))
+        instance = createPlugin(functools.partial(routes, 'front'), 11, 'plugin://plugin.video.example/title/tt4574334')
+        instance()
+        instance.prefetcher.join()
+        self.assertEqual(calls, [('service', 'tt4574334'), ('service', 'tt5180504'), ('service', 'fail'), ('front', 'local'), ('front', 'tt4574334')])
+
+    def test_serve_stopped(self):
+        xbmcheadless.reset()
+        calls = []
+        window = xbmcgui.Window(10000)
+        window.setProperty('plugin.video.example.handoff', 'true')
+        window.setProperty('plugin.video.example.service', '{"address": ["127.0.0.1", 9], "family": "inet", "token": "token"}')
+        plugin = xbmcext.Plugin(1, 'plugin://plugin.video.example/')
+
+        @plugin.route('/')
+        def home():
+            calls.append('home')
+
+        plugin()
+        plugin()
+        self.assertEqual(calls, ['home', 'home'])
+        self.assertFalse(window.getProperty('plugin.video.example.service'))
+
+
+    def test_serve_unsigned(self):
+        xbmcheadless.reset()
+        calls = []
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        self.addCleanup(server.close)
+
+        def respond():
+            connection, address = server.accept()
+            xbmcext.Plugin._receive(connection)
+            xbmcext.Plugin._send(connection, b'\0' * 32 + pickle.dumps({'calls': [('setContent', ('movies',))]}))
+            connection.close()
+
+        responder = threading.Thread(target=respond)
+        responder.start()
+        window = xbmcgui.Window(10000)
+        window.setProperty('plugin.video.example.handoff', 'true')
+        window.setProperty('plugin.video.example.service', json.dumps({'address': server.getsockname(), 'family': 'inet', 'token': 'token'}))
+        plugin = xbmcext.Plugin(1, 'plugin://plugin.video.example/')
+
+        @plugin.route('/')
+        def home():
+            calls.append('home')
+
+        plugin()
+        responder.join()
+        self.assertEqual(calls, ['home'])
+        self.assertIsNone(xbmcheadless.directory(1)['content'])
+
+
+class ResourceManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.addonPath = tempfile.mkdtemp()
+        xbmcheadless.reset(addonPath=self.addonPath)
+
+    def tearDown(self):
+        shutil.rmtree(self.addonPath)
+
+    def test_merge(self):
+        first = xbmcext.ResourceManager()
+        second = xbmcext.ResourceManager()
+        first['tt5180504'] = 'Stranger Things'
+        first['tt4574334'] = 'Dark'
+        first.save()
+        second['tt0903747'] = 'Breaking Bad'
+        second.update(tt0944947='Game of Thrones')
+        second.save()
+        self.assertEqual(second, {'tt5180504': 'Stranger Things', 'tt4574334': 'Dark', 'tt0903747': 'Breaking Bad', 'tt0944947': 'Game of Thrones'})
+
+        del first['tt4574334']
+        self.assertEqual(xbmcext.ResourceManager(), second)
+        first.save()
+        self.assertEqual(xbmcext.ResourceManager(), {'tt5180504': 'Stranger Things', 'tt0903747': 'Breaking Bad', 'tt0944947': 'Game of Thrones'})
+
+    def test_nested(self):
+        resources = xbmcext.ResourceManager()
+        resources['history'] = ['tt5180504']
+        resources['favourites'] = {}
+        resources.save()
+
+        with xbmcext.ResourceManager() as resources:
+            resources['history'].append('tt4574334')
+            resources.markChanged('history')
+            resources.setdefault('favourites', {})['tt0903747'] = True
+            resources.markChanged('favourites')
+        self.assertEqual(xbmcext.ResourceManager(), {'history': ['tt5180504', 'tt4574334'], 'favourites': {'tt0903747': True}})
+
+    def test_processes(self):
+        resources = xbmcext.ResourceManager()
+        resources['shared'] = True
+        resources.save()
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        processes = [subprocess.Popen([sys.executable, '-c', RESOURCE_WRITER, os.path.join(root, 'xbmcext', 'headless'), root, self.addonPath, str(writer)])
+                     for writer in range(6)]
+        self.assertEqual([process.wait() for process in processes], [0] * 6)
+        self.assertEqual(xbmcext.ResourceManager(), dict(('{}-{}'.format(writer, index), index) for writer in range(6) for index in range(20)))
+
+
+class StringTableTest(unittest.TestCase):
+    def setUp(self):
+        self.addonPath = tempfile.mkdtemp()
+        xbmcheadless.reset(addonPath=self.addonPath)
+        xbmcext._strings = None
+        self.write('en_gb', '# Kodi Media Center language file\nmsgid ""\nmsgstr ""\n"Language: en_GB\\n"\n\n'
+                            'msgctxt "#30000"\nmsgid "Movies"\nmsgstr ""\n\nmsgctxt "#30001"\nmsgid ""\n"Search "\n"\\"{}\\""\nmsgstr ""\n\n'
+                            'msgctxt "#30002"\nmsgid "Watched"\nmsgstr ""\n')
+        self.write('de_de', 'msgctxt "#30000"\nmsgid "Movies"\nmsgstr "Filme"\n\nmsgctxt "#30002"\nmsgid "Watched"\nmsgstr ""\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.addonPath)
+
+    def write(self, language, content):
+        directory = os.path.join(self.addonPath, 'resources', 'language', 'resource.language.' + language)
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        with open(os.path.join(directory, 'strings.po'), 'wb') as io:
+            io.write(content.encode('utf-8'))
+
+        os.utime(os.path.join(directory, 'strings.po'), (1600000000, 1600000000))
+
+    def test_lookup(self):
+        xbmcheadless.language = 'de'
+        xbmcheadless.strings[32000] = 'Kodi'
+        self.assertEqual([xbmcext.getLocalizedString(id) for id in (30000, 30001, 30002, 32000)], ['Filme', 'Search "{}"', 'Watched', 'Kodi'])
+        self.assertEqual(xbmcext.StringTable('en').get(30000), 'Movies')
+        xbmcheadless.language = 'en'
+        self.assertEqual(xbmcext.getLocalizedString(30000), 'Movies')
+        self.assertEqual(len(os.listdir(os.path.join(xbmcext.getAddonProfilePath(), 'strings'))), 2)
+
+        path = os.path.join(self.addonPath, 'resources', 'language', 'resource.language.de_de', 'strings.po')
+        mtime = os.path.getmtime(path)
+        xbmcext.StringTable._memo.clear()
+        self.write('de_de', 'msgctxt "#30000"\nmsgid "Movies"\nmsgstr "Spielfilme"\n')
+        os.utime(path, (mtime, mtime))
+        self.assertEqual(xbmcext.StringTable('de')[30000], 'Filme')
+        os.utime(path, (mtime + 10, mtime + 10))
+        self.assertEqual(xbmcext.StringTable('de')[30000], 'Spielfilme')
+
+    def test_region(self):
+        self.write('en_au', 'msgctxt "#30000"\nmsgid "Movies"\nmsgstr "Flicks"\n')
+        self.write('pt_br', 'msgctxt "#30000"\nmsgid "Movies"\nmsgstr "Filmes (Brasil)"\n')
+        self.write('pt_pt', 'msgctxt "#30000"\nmsgid "Movies"\nmsgstr "Filmes"\n')
+        xbmcheadless.language = 'pt-br'
+        self.assertEqual(xbmcext.StringTable()[30000], 'Filmes (Brasil)')
+        self.assertEqual(xbmcext.StringTable('pt')[30000], 'Filmes')
+        self.assertEqual(xbmcext.StringTable('pt-ao')[30000], 'Filmes')
+        self.assertEqual(xbmcext.StringTable('en')[30000], 'Movies')
+        self.assertEqual(xbmcext.StringTable('en-au')[30000], 'Flicks')
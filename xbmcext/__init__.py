@@ -22,13 +22,35 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import base64
+import collections
+import contextlib
+import difflib
 import enum
+import hashlib
+import hmac
 import inspect
+import itertools
 import json
 import os
 import pickle
 import re
+import socket
+import struct
 import sys
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
 
 import six
 import xbmc
@@ -42,108 +64,143 @@ if sys.version_info.major == 2:
     xbmcvfs.translatePath = xbmc.translatePath
 
 
+class Converter(object):
+    def __init__(self, regex='[^/]+', to_python=str, to_url=str):
+        """
+        A converter translates a path segment to a Python value and back.
+
+        :param regex: The regular expression that a path segment must match, before it is percent-decoded.
+        :type regex: str
+        :param to_python: Converts the matched path segment, percent-decoded, to a Python value.
+        :type to_python: typing.Callable
+        :param to_url: Converts a Python value to a path segment, which is percent-encoded afterwards. It must only
+            return segments that match the regular expression.
+        :type to_url: typing.Callable
+        """
+        self.regex = regex
+        self.to_python = to_python
+        self.to_url = to_url
+
+
+class _MultiSelectTab(object):
+    """
+    The list items of a multi-select tab, built lazily and added to the list control one page at a time.
+    """
+
+    PAGE_SIZE = 250
+
+    def __init__(self, options, key):
+        self.key = key
+        self.labels = options.items[key]
+        self.listItems = [None] * len(self.labels)
+        self.options = options
+        self.rows = range(len(self.labels))
+        self.selectedItems = collections.OrderedDict()
+        self.size = 0
+
+    def addItems(self, control):
+        size = min(self.size + self.PAGE_SIZE, len(self.rows))
+        listItems = []
+
+        for index in self.rows[self.size:size]:
+            if self.listItems[index] is None:
+                label = self.labels[index]
+                self.listItems[index] = xbmcgui.ListItem('[COLOR orange]{}[/COLOR]'.format(label) if label in self.selectedItems else label)
+
+            listItems.append(self.listItems[index])
+
+        control.addItems(listItems)
+        self.size = size
+
+    def clear(self):
+        for label, index in self.selectedItems.items():
+            if self.listItems[index] is not None:
+                self.listItems[index].setLabel(label)
+
+        self.selectedItems.clear()
+
+    def filter(self, control, text):
+        rows = self.search(text)
+
+        if rows != self.rows:
+            self.rows = rows
+            self.reset(control)
+
+    def reset(self, control):
+        control.reset()
+        self.size = 0
+        self.addItems(control)
+
+    def search(self, text):
+        return self.options.search(self.key, text) if text else range(len(self.labels))
+
+    def scroll(self, control):
+        if self.size < len(self.rows) and control.getSelectedPosition() >= self.size - self.PAGE_SIZE // 5:
+            self.addItems(control)
+
+    def toggle(self, row):
+        index = self.rows[row]
+        label = self.labels[index]
+
+        if label in self.selectedItems:
+            self.listItems[index].setLabel(label)
+            del self.selectedItems[label]
+        else:
+            self.listItems[index].setLabel('[COLOR orange]{}[/COLOR]'.format(label))
+            self.selectedItems[label] = index
+
+
+class _SearchIndex(object):
+    """
+    A case-insensitive substring index of labels, keyed by every substring of up to three characters.
+    """
+
+    GRAM_SIZE = 3
+
+    def __init__(self, labels):
+        self.grams = {}
+        self.labels = [label.lower() for label in labels]
+
+        for index, label in enumerate(self.labels):
+            for size in range(1, self.GRAM_SIZE + 1):
+                for start in range(len(label) - size + 1):
+                    self.grams.setdefault(label[start:start + size], set()).add(index)
+
+    def search(self, text):
+        text = text.lower()
+
+        if len(text) <= self.GRAM_SIZE:
+            return sorted(self.grams.get(text, ()))
+
+        candidates = sorted((self.grams.get(text[start:start + self.GRAM_SIZE], set()) for start in range(len(text) - self.GRAM_SIZE + 1)), key=len)
+        return sorted(index for index in candidates[0].intersection(*candidates[1:]) if text in self.labels[index])
+
+
 class Dialog(xbmcgui.Dialog):
     """
     The graphical control element dialog box (also called dialogue box or just dialog) is a small window that communicates information to the user and prompts
     them for a response.
     """
 
-    def multiselecttabsearch(self, heading, options):
+    def multiselecttabsearch(self, heading, options, filterOptions=False):
         """
         Show a multi-select tab search dialog.
 
         :param heading: Dialog heading.
         :type heading: str
         :param options: Options to choose from.
-        :type options: dict[str | tuple[str], list[str | tuple[str]]]
+        :type options: dict[str | tuple[str], list[str | tuple[str]]] | TabOptions
+        :param filterOptions: True if the options should be filtered by the search text as it is typed; otherwise False.
+        :type filterOptions: bool
         :return: Returns the search text and selected items, or None if cancelled.
         :rtype: tuple[str | None, dict[str, list[str]] | None]
         """
-        DIALOG_TITLE = 1100
-        DIALOG_CONTENT = 1110
-        DIALOG_SUBCONTENT = 1120
-        DIALOG_OK_BUTTON = 1131
-        DIALOG_CLEAR_BUTTON = 1132
-        DIALOG_INPUT = 1140
-
-        keys = {}
-        values = {}
-
-        for key, option in options.items():
-            if isinstance(key, tuple):
-                key, id = key
-                keys[key] = id
-            else:
-                keys[key] = key
-
-            values[key] = dict(value if isinstance(value, tuple) else (value, value) for value in option)
-
-        items = {key: list(values[key].keys()) for key in keys}
-        selectedItems = {key: [] for key in items.keys()}
-
-        class MultiSelectTabSearchDialog(xbmcgui.WindowXMLDialog):
-            def __init__(self, xmlFilename, scriptPath, defaultSkin='Default', defaultRes='720p'):
-                super(MultiSelectTabSearchDialog, self).__init__(xmlFilename, scriptPath, defaultSkin, defaultRes)
-                self.searchText = None
-                self.selectedLabel = None
-
-            def onInit(self):
-                self.getControl(DIALOG_TITLE).setLabel(heading)
-                self.getControl(DIALOG_CONTENT).addItems(list(items.keys()))
-                self.setFocusId(DIALOG_INPUT)
-
-            def onAction(self, action):
-                if action.getId() in (xbmcgui.ACTION_PREVIOUS_MENU, xbmcgui.ACTION_STOP, xbmcgui.ACTION_NAV_BACK):
-                    selectedItems.clear()
-                    self.close()
-                elif action.getId() in (xbmcgui.ACTION_MOUSE_MOVE, xbmcgui.ACTION_MOVE_UP, xbmcgui.ACTION_MOVE_DOWN):
-                    self.onSelectedItemChanged(self.getFocusId())
-
-            def onClick(self, controlId):
-                if controlId == DIALOG_SUBCONTENT:
-                    control = self.getControl(DIALOG_SUBCONTENT)
-                    selectedItemLabel = items[self.selectedLabel][control.getSelectedPosition()]
-
-                    if selectedItemLabel in selectedItems[self.selectedLabel]:
-                        control.getSelectedItem().setLabel(selectedItemLabel)
-                        selectedItems[self.selectedLabel].remove(selectedItemLabel)
-                    else:
-                        control.getSelectedItem().setLabel('[COLOR orange]{}[/COLOR]'.format(selectedItemLabel))
-                        selectedItems[self.selectedLabel].append(selectedItemLabel)
-                elif controlId == DIALOG_OK_BUTTON:
-                    self.searchText = self.getControl(DIALOG_INPUT).getText()
-                    self.close()
-                elif controlId == DIALOG_CLEAR_BUTTON:
-                    for item in selectedItems.values():
-                        item.clear()
-
-                    control = self.getControl(DIALOG_SUBCONTENT)
-                    selectedList = items[self.selectedLabel]
-
-                    for index in range(len(selectedList)):
-                        control.getListItem(index).setLabel(selectedList[index])
-
-                    self.getControl(DIALOG_INPUT).setText('')
-
-            def onFocus(self, controlId):
-                self.onSelectedItemChanged(controlId)
-
-            def onSelectedItemChanged(self, controlId):
-                if controlId == DIALOG_CONTENT:
-                    selectedLabel = self.getControl(DIALOG_CONTENT).getSelectedItem().getLabel()
-
-                    if self.selectedLabel != selectedLabel:
-                        self.selectedLabel = selectedLabel
-                        control = self.getControl(DIALOG_SUBCONTENT)
-                        control.reset()
-                        control.addItems(['[COLOR orange]{}[/COLOR]'.format(item) if item in selectedItems[self.selectedLabel] else item
-                                          for item in items[self.selectedLabel]])
-
         dialog = MultiSelectTabSearchDialog('MultiSelectTabSearchDialog.xml', os.path.dirname(os.path.dirname(__file__)), defaultRes='1080i')
+        dialog.setOptions(heading, options if isinstance(options, TabOptions) else TabOptions(options), filterOptions)
         dialog.doModal()
-        searchText = dialog.searchText
+        result = dialog.searchText, dialog.getSelectedItems()
         del dialog
-        return searchText, {keys[key]: [values[key][value] for value in item] for key, item in selectedItems.items()} if selectedItems else None
+        return result
 
     def multiselecttab(self, heading, options):
         """
@@ -152,89 +209,16 @@ class Dialog(xbmcgui.Dialog):
         :param heading: Dialog heading.
         :type heading: str
         :param options: Options to choose from.
-        :type options: dict[str | tuple[str], list[str | tuple[str]]]
+        :type options: dict[str | tuple[str], list[str | tuple[str]]] | TabOptions
         :return: Returns the selected items, or None if cancelled.
         :rtype: dict[str, list[str]] | None
         """
-        DIALOG_TITLE = 1100
-        DIALOG_CONTENT = 1110
-        DIALOG_SUBCONTENT = 1120
-        DIALOG_OK_BUTTON = 1131
-        DIALOG_CLEAR_BUTTON = 1132
-
-        keys = {}
-        values = {}
-
-        for key, option in options.items():
-            if isinstance(key, tuple):
-                key, id = key
-                keys[key] = id
-            else:
-                keys[key] = key
-
-            values[key] = dict(value if isinstance(value, tuple) else (value, value) for value in option)
-
-        items = {key: list(values[key].keys()) for key in keys}
-        selectedItems = {key: [] for key in items.keys()}
-
-        class MultiSelectTabDialog(xbmcgui.WindowXMLDialog):
-            def __init__(self, xmlFilename, scriptPath, defaultSkin='Default', defaultRes='720p'):
-                super(MultiSelectTabDialog, self).__init__(xmlFilename, scriptPath, defaultSkin, defaultRes)
-                self.selectedLabel = None
-
-            def onInit(self):
-                self.getControl(DIALOG_TITLE).setLabel(heading)
-                self.getControl(DIALOG_CONTENT).addItems(list(items.keys()))
-                self.setFocusId(DIALOG_CONTENT)
-
-            def onAction(self, action):
-                if action.getId() in (xbmcgui.ACTION_PREVIOUS_MENU, xbmcgui.ACTION_STOP, xbmcgui.ACTION_NAV_BACK):
-                    selectedItems.clear()
-                    self.close()
-                elif action.getId() in (xbmcgui.ACTION_MOUSE_MOVE, xbmcgui.ACTION_MOVE_UP, xbmcgui.ACTION_MOVE_DOWN):
-                    self.onSelectedItemChanged(self.getFocusId())
-
-            def onClick(self, controlId):
-                if controlId == DIALOG_SUBCONTENT:
-                    control = self.getControl(DIALOG_SUBCONTENT)
-                    selectedItemLabel = items[self.selectedLabel][control.getSelectedPosition()]
-
-                    if selectedItemLabel in selectedItems[self.selectedLabel]:
-                        control.getSelectedItem().setLabel(selectedItemLabel)
-                        selectedItems[self.selectedLabel].remove(selectedItemLabel)
-                    else:
-                        control.getSelectedItem().setLabel('[COLOR orange]{}[/COLOR]'.format(selectedItemLabel))
-                        selectedItems[self.selectedLabel].append(selectedItemLabel)
-                elif controlId == DIALOG_OK_BUTTON:
-                    self.close()
-                elif controlId == DIALOG_CLEAR_BUTTON:
-                    for item in selectedItems.values():
-                        item.clear()
-
-                    control = self.getControl(DIALOG_SUBCONTENT)
-                    selectedList = items[self.selectedLabel]
-
-                    for index in range(len(selectedList)):
-                        control.getListItem(index).setLabel(selectedList[index])
-
-            def onFocus(self, controlId):
-                self.onSelectedItemChanged(controlId)
-
-            def onSelectedItemChanged(self, controlId):
-                if controlId == DIALOG_CONTENT:
-                    selectedLabel = self.getControl(DIALOG_CONTENT).getSelectedItem().getLabel()
-
-                    if self.selectedLabel != selectedLabel:
-                        self.selectedLabel = selectedLabel
-                        control = self.getControl(DIALOG_SUBCONTENT)
-                        control.reset()
-                        control.addItems(['[COLOR orange]{}[/COLOR]'.format(item) if item in selectedItems[self.selectedLabel] else item
-                                          for item in items[self.selectedLabel]])
-
         dialog = MultiSelectTabDialog('MultiSelectTabDialog.xml', os.path.dirname(os.path.dirname(__file__)), defaultRes='1080i')
+        dialog.setOptions(heading, options if isinstance(options, TabOptions) else TabOptions(options))
         dialog.doModal()
+        result = dialog.getSelectedItems()
         del dialog
-        return {keys[key]: [values[key][value] for value in item] for key, item in selectedItems.items()} if selectedItems else None
+        return result
 
     def selecttab(self, heading, options, preselect=None):
         """
@@ -243,98 +227,149 @@ class Dialog(xbmcgui.Dialog):
         :param heading: Dialog heading.
         :type heading: str
         :param options: Options to choose from.
-        :type options: dict[str | tuple[str], list[str | tuple[str]]]
+        :type options: dict[str | tuple[str], list[str | tuple[str]]] | TabOptions
         :param preselect: Items to preselect in list.
         :type preselect: dict[str, str] | None
         :return: Returns the selected items, or None if cancelled.
         :rtype: dict[str, str] | None
         """
-        DIALOG_TITLE = 1100
-        DIALOG_CONTENT = 1110
-        DIALOG_SUBCONTENT = 1120
-        DIALOG_OK_BUTTON = 1131
-        DIALOG_CLEAR_BUTTON = 1132
+        dialog = SelectTabDialog('MultiSelectTabDialog.xml', os.path.dirname(os.path.dirname(__file__)), defaultRes='1080i')
+        dialog.setOptions(heading, options if isinstance(options, TabOptions) else TabOptions(options), {} if preselect is None else preselect)
+        dialog.doModal()
+        result = dialog.getSelectedItems()
+        del dialog
+        return result
+
+
+class DiskCache(object):
+    def __init__(self, path):
+        """
+        A cache that pickles every value to its own file in a directory.
 
-        if preselect is None:
-            preselect = {}
+        :param path: The directory of the cache.
+        :type path: str
+        """
+        self.path = path
 
-        keys = {}
-        values = {}
+    def _getPath(self, key):
+        return os.path.join(self.path, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pickle')
 
-        for key, option in options.items():
-            if isinstance(key, tuple):
-                key, id = key
-                keys[key] = id
-            else:
-                keys[key] = key
-
-            values[key] = dict(value if isinstance(value, tuple) else (value, value) for value in option)
-
-        items = {key: list(values[key].keys()) for key in keys}
-        selectedItems = dict(preselect)
-
-        class SelectTabDialog(xbmcgui.WindowXMLDialog):
-            def __init__(self, xmlFilename, scriptPath, defaultSkin='Default', defaultRes='720p'):
-                super(SelectTabDialog, self).__init__(xmlFilename, scriptPath, defaultSkin, defaultRes)
-                self.selectedLabel = None
-
-            def onInit(self):
-                self.getControl(DIALOG_TITLE).setLabel(heading)
-                self.getControl(DIALOG_CONTENT).addItems(list(items.keys()))
-                self.getControl(DIALOG_OK_BUTTON).setEnabled(len(selectedItems) == len(items))
-                self.setFocusId(DIALOG_CONTENT)
-
-            def onAction(self, action):
-                if action.getId() in (xbmcgui.ACTION_PREVIOUS_MENU, xbmcgui.ACTION_STOP, xbmcgui.ACTION_NAV_BACK):
-                    selectedItems.clear()
-                    self.close()
-                elif action.getId() in (xbmcgui.ACTION_MOUSE_MOVE, xbmcgui.ACTION_MOVE_UP, xbmcgui.ACTION_MOVE_DOWN):
-                    self.onSelectedItemChanged(self.getFocusId())
-
-            def onClick(self, controlId):
-                if controlId == DIALOG_SUBCONTENT:
-                    self.onListItemClick(self.getControl(DIALOG_SUBCONTENT).getSelectedPosition())
-                elif controlId == DIALOG_OK_BUTTON:
-                    self.close()
-                elif controlId == DIALOG_CLEAR_BUTTON:
-                    selectedItems.clear()
-                    selectedItems.update(preselect)
-                    selectedItemIndex = items[self.selectedLabel].index(selectedItems[self.selectedLabel]) if self.selectedLabel in selectedItems else -1
-                    self.onListItemClick(selectedItemIndex)
-
-            def onFocus(self, controlId):
-                self.onSelectedItemChanged(controlId)
-
-            def onListItemClick(self, selectedItemIndex):
-                control = self.getControl(DIALOG_SUBCONTENT)
-                selectedList = items[self.selectedLabel]
-
-                for index in range(len(selectedList)):
-                    label = selectedList[index]
-
-                    if index == selectedItemIndex:
-                        control.getListItem(index).setLabel('[COLOR orange]{}[/COLOR]'.format(label))
-                        selectedItems[self.selectedLabel] = label
-                    else:
-                        control.getListItem(index).setLabel(label)
+    def clear(self):
+        """
+        Removes every value.
+        """
+        if os.path.isdir(self.path):
+            for name in os.listdir(self.path):
+                if name.endswith('.pickle'):
+                    os.remove(os.path.join(self.path, name))
 
-                self.getControl(DIALOG_OK_BUTTON).setEnabled(len(selectedItems) == len(items))
+    def delete(self, key):
+        """
+        Removes a value.
+
+        :param key: The key of the value.
+        :type key: str
+        """
+        try:
+            os.remove(self._getPath(key))
+        except OSError:
+            pass
 
-            def onSelectedItemChanged(self, controlId):
-                if controlId == DIALOG_CONTENT:
-                    selectedLabel = self.getControl(DIALOG_CONTENT).getSelectedItem().getLabel()
+    def get(self, key, default=None):
+        """
+        Returns a value that has not expired.
+
+        :param key: The key of the value.
+        :type key: str
+        :param default: The value returned when the key is missing or has expired.
+        :type default: Any
+        :return: The value.
+        :rtype: Any
+        """
+        try:
+            with open(self._getPath(key), 'rb') as io:
+                expires, value = pickle.load(io)
+        except (EnvironmentError, EOFError, ValueError, pickle.UnpicklingError):
+            return default
 
-                    if self.selectedLabel != selectedLabel:
-                        self.selectedLabel = selectedLabel
-                        control = self.getControl(DIALOG_SUBCONTENT)
-                        control.reset()
-                        control.addItems(['[COLOR orange]{}[/COLOR]'.format(item) if item == selectedItems[self.selectedLabel] else item
-                                          for item in items[self.selectedLabel]])
+        if expires is not None and expires < time.time():
+            self.delete(key)
+            return default
 
-        dialog = SelectTabDialog('MultiSelectTabDialog.xml', os.path.dirname(os.path.dirname(__file__)), defaultRes='1080i')
-        dialog.doModal()
-        del dialog
-        return {keys[key]: values[key][value] for key, value in selectedItems.items()} if selectedItems else None
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Stores a value. The file is written to a temporary file first and renamed, so that concurrent plugin
+        invocations never read a partial value.
+
+        :param key: The key of the value.
+        :type key: str
+        :param value: The value, which must be picklable.
+        :type value: Any
+        :param ttl: The number of seconds the value is kept, or None to keep it until it is removed.
+        :type ttl: float | None
+        """
+        try:
+            os.makedirs(self.path)
+        except OSError:
+            if not os.path.isdir(self.path):
+                raise
+
+        descriptor, path = tempfile.mkstemp(dir=self.path)
+
+        with os.fdopen(descriptor, 'wb') as io:
+            pickle.dump((None if ttl is None else time.time() + ttl, value), io, pickle.HIGHEST_PROTOCOL)
+
+        getattr(os, 'replace', os.rename)(path, self._getPath(key))
+
+
+class _ListItemRecorder(object):
+    """
+    Stands in for a ListItem, or for one of its info tags, while a plugin captures a prefetched listing. It records the
+    method calls so that the listing can be pickled and the list item rebuilt when the listing is served.
+    """
+
+    INFO_TAGS = ('getMusicInfoTag', 'getVideoInfoTag')
+
+    def __init__(self, cls=None, args=()):
+        self.args = args
+        self.calls = []
+        self.cls = cls
+
+    def __getattr__(self, name):
+        if name.startswith('__') or name in ('args', 'calls', 'cls'):
+            raise AttributeError(name)
+
+        if name.startswith('get') and name not in self.INFO_TAGS or name.startswith('is'):
+            raise AttributeError('{} cannot be read while a listing is captured.'.format(name))
+
+        def method(*args, **kwargs):
+            recorder = _ListItemRecorder() if name in self.INFO_TAGS else None
+            self.calls.append((name, args, kwargs, recorder))
+            return recorder
+
+        return method
+
+    def build(self, target=None):
+        """
+        Replays the recorded calls.
+
+        :param target: The object to replay the calls on. Defaults to a new list item.
+        :type target: ListItem | None
+        :return: The list item.
+        :rtype: ListItem
+        """
+        if target is None:
+            target = self.cls(*self.args)
+
+        for name, args, kwargs, recorder in self.calls:
+            result = getattr(target, name)(*args, **kwargs)
+
+            if recorder is not None:
+                recorder.build(result)
+
+        return target
 
 
 class ListItem(xbmcgui.ListItem):
@@ -357,6 +392,9 @@ class ListItem(xbmcgui.ListItem):
         :param offscreen: If GUI based locks should be avoided. Most of the time listitems are created offscreen and added later to a container for display (e.g. plugins) or they are not even displayed (e.g. python scrapers). In such cases, there is no need to lock the GUI when creating the items (increasing your addon performance).
         :type offscreen: bool
         """
+        if getattr(_capture, 'calls', None) is not None:
+            return _ListItemRecorder(cls, (label, label2, iconImage, thumbnailImage, posterImage, path, offscreen))
+
         if sys.version_info > (2, 25, 0):
             return super(ListItem, cls).__new__(cls, label, label2, path=path, offscreen=offscreen)
         else:
@@ -440,14 +478,252 @@ class Log(object):
         xbmc.log(str(msg), xbmc.LOGWARNING)
 
 
+class MultiSelectTabDialog(xbmcgui.WindowXMLDialog):
+    """
+    The dialog behind Dialog.multiselecttab.
+    """
+
+    DIALOG_TITLE = 1100
+    DIALOG_CONTENT = 1110
+    DIALOG_SUBCONTENT = 1120
+    DIALOG_OK_BUTTON = 1131
+    DIALOG_CLEAR_BUTTON = 1132
+
+    def __init__(self, xmlFilename, scriptPath, defaultSkin='Default', defaultRes='720p'):
+        super(MultiSelectTabDialog, self).__init__(xmlFilename, scriptPath, defaultSkin, defaultRes)
+        self.heading = ''
+        self.options = None
+        self.selectedLabel = None
+        self.tabs = {}
+
+    def getSelectedItems(self):
+        return {self.options.keys[key]: [self.options.values[key][value] for value in tab.selectedItems]
+                for key, tab in self.tabs.items()} if self.tabs else None
+
+    def onAction(self, action):
+        if action.getId() in (xbmcgui.ACTION_PREVIOUS_MENU, xbmcgui.ACTION_STOP, xbmcgui.ACTION_NAV_BACK):
+            self.tabs.clear()
+            self.close()
+        elif action.getId() in (xbmcgui.ACTION_MOUSE_MOVE, xbmcgui.ACTION_MOVE_UP, xbmcgui.ACTION_MOVE_DOWN, xbmcgui.ACTION_PAGE_DOWN,
+                                xbmcgui.ACTION_MOUSE_WHEEL_DOWN):
+            self.onSelectedItemChanged(self.getFocusId())
+
+    def onClick(self, controlId):
+        if controlId == self.DIALOG_SUBCONTENT:
+            self.tabs[self.selectedLabel].toggle(self.getControl(self.DIALOG_SUBCONTENT).getSelectedPosition())
+        elif controlId == self.DIALOG_OK_BUTTON:
+            self.close()
+        elif controlId == self.DIALOG_CLEAR_BUTTON:
+            for tab in self.tabs.values():
+                tab.clear()
+
+    def onFocus(self, controlId):
+        self.onSelectedItemChanged(controlId)
+
+    def onInit(self):
+        self.getControl(self.DIALOG_TITLE).setLabel(self.heading)
+        self.getControl(self.DIALOG_CONTENT).addItems(list(self.options.labels))
+        self.setFocusId(self.DIALOG_CONTENT)
+
+    def onSelectedItemChanged(self, controlId):
+        if controlId == self.DIALOG_CONTENT:
+            selectedLabel = self.getControl(self.DIALOG_CONTENT).getSelectedItem().getLabel()
+
+            if self.selectedLabel != selectedLabel:
+                self.selectedLabel = selectedLabel
+                self.onTabChanged(self.tabs[self.selectedLabel])
+        elif controlId == self.DIALOG_SUBCONTENT and self.selectedLabel is not None:
+            self.tabs[self.selectedLabel].scroll(self.getControl(self.DIALOG_SUBCONTENT))
+
+    def onTabChanged(self, tab):
+        tab.reset(self.getControl(self.DIALOG_SUBCONTENT))
+
+    def setOptions(self, heading, options):
+        """
+        Sets the heading and the options of the dialog.
+
+        :param heading: Dialog heading.
+        :type heading: str
+        :param options: Options to choose from.
+        :type options: TabOptions
+        """
+        self.heading = heading
+        self.options = options
+        self.tabs = {key: _MultiSelectTab(options, key) for key in options.labels}
+
+
+class MultiSelectTabSearchDialog(MultiSelectTabDialog):
+    """
+    The dialog behind Dialog.multiselecttabsearch.
+    """
+
+    DIALOG_INPUT = 1140
+    SEARCH_DELAY = 0.3
+
+    def __init__(self, xmlFilename, scriptPath, defaultSkin='Default', defaultRes='720p'):
+        super(MultiSelectTabSearchDialog, self).__init__(xmlFilename, scriptPath, defaultSkin, defaultRes)
+        self.filterOptions = False
+        self.filterText = ''
+        self.filterTimer = None
+        self.searchText = None
+
+    def close(self):
+        if self.filterTimer is not None:
+            self.filterTimer.cancel()
+
+        super(MultiSelectTabSearchDialog, self).close()
+
+    def onAction(self, action):
+        super(MultiSelectTabSearchDialog, self).onAction(action)
+
+        if self.filterOptions and action.getId() not in (xbmcgui.ACTION_PREVIOUS_MENU, xbmcgui.ACTION_STOP, xbmcgui.ACTION_NAV_BACK) and \
+                self.getFocusId() == self.DIALOG_INPUT:
+            if self.filterTimer is not None:
+                self.filterTimer.cancel()
+
+            self.filterTimer = threading.Timer(self.SEARCH_DELAY, self.onSearchTextChanged)
+            self.filterTimer.start()
+
+    def onClick(self, controlId):
+        if controlId == self.DIALOG_OK_BUTTON:
+            self.searchText = self.getControl(self.DIALOG_INPUT).getText()
+
+        super(MultiSelectTabSearchDialog, self).onClick(controlId)
+
+        if controlId == self.DIALOG_CLEAR_BUTTON:
+            self.getControl(self.DIALOG_INPUT).setText('')
+
+            if self.filterOptions:
+                self.onSearchTextChanged()
+
+    def onInit(self):
+        super(MultiSelectTabSearchDialog, self).onInit()
+        self.setFocusId(self.DIALOG_INPUT)
+
+    def onSearchTextChanged(self):
+        filterText = self.getControl(self.DIALOG_INPUT).getText()
+
+        if self.filterText != filterText:
+            self.filterText = filterText
+
+            if self.selectedLabel is not None:
+                self.tabs[self.selectedLabel].filter(self.getControl(self.DIALOG_SUBCONTENT), self.filterText)
+
+    def onTabChanged(self, tab):
+        if self.filterOptions:
+            tab.rows = tab.search(self.filterText)
+
+        super(MultiSelectTabSearchDialog, self).onTabChanged(tab)
+
+    def setOptions(self, heading, options, filterOptions=False):
+        """
+        Sets the heading and the options of the dialog.
+
+        :param heading: Dialog heading.
+        :type heading: str
+        :param options: Options to choose from.
+        :type options: TabOptions
+        :param filterOptions: True if the options should be filtered by the search text as it is typed; otherwise False.
+        :type filterOptions: bool
+        """
+        super(MultiSelectTabSearchDialog, self).setOptions(heading, options)
+        self.filterOptions = filterOptions
+
+
 class NotFoundException(Exception):
+    def __init__(self, message, diagnose=None):
+        """
+        Throws an exception when a resource is not found.
+
+        :param message: The error message.
+        :type message: str
+        :param diagnose: Returns the closest candidate routes and why the routes that matched could not handle the request. It is called the first time either is accessed, so that a miss stays cheap.
+        :type diagnose: typing.Callable[[], tuple[list[Route], list[str]]] | None
+        """
+        super(NotFoundException, self).__init__(message)
+        self._diagnose = diagnose
+        self._diagnosis = None
+
+    def __str__(self):
+        message = super(NotFoundException, self).__str__()
+
+        if self.candidates:
+            message += ' Closest routes: {}.'.format(', '.join('"{}"'.format(route.path) for route in self.candidates))
+
+        if self.reasons:
+            message += ' ' + ' '.join(self.reasons)
+
+        return message
+
+    @property
+    def candidates(self):
+        """
+        :return: The routes that come closest to the path that was not found.
+        :rtype: list[Route]
+        """
+        return self._getDiagnosis()[0]
+
+    @property
+    def reasons(self):
+        """
+        :return: Why the routes that matched the path could not handle the request.
+        :rtype: list[str]
+        """
+        return self._getDiagnosis()[1]
+
+    def _getDiagnosis(self):
+        if self._diagnosis is None:
+            self._diagnosis = self._diagnose() if self._diagnose else ([], [])
+
+        return self._diagnosis
+
+
+class _DeadlineException(Exception):
     """
-    Throws an exception when a resource is not found.
+    Throws an exception when a prefetch runs past its time budget.
     """
 
 
+class _RequestState(object):
+    def __init__(self, name):
+        """
+        An attribute of a Plugin that every thread sets on its own, so that a background thread can route a request
+        while the endpoint that started it still runs. Threads that have not set it see the first value it was set to.
+
+        :param name: The name of the attribute.
+        :type name: str
+        """
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        return getattr(instance.local, self.name, instance.defaults[self.name])
+
+    def __set__(self, instance, value):
+        instance.defaults.setdefault(self.name, value)
+        setattr(instance.local, self.name, value)
+
+
 class Plugin(object):
-    def __init__(self, handle=None, url=None):
+    CURSOR = 'xbmcext.cursor'
+    HANDOFF_PROPERTY = 'handoff'
+    HITS_COMPACTION = 512
+    HITS_FILE = 'routes.hits'
+    PREFETCH_DIRECTORY = 'prefetch'
+    PREFETCH_TTL = 300
+    SERVICE_CONNECT_TIMEOUT = 1
+    SERVICE_SOCKET = 'service.sock'
+    SERVICE_TIMEOUT = 30
+    SORT_DIRECTORY = 'sort'
+    SORT_TTL = 300
+    handle = _RequestState('handle')
+    path = _RequestState('path')
+    query = _RequestState('query')
+    redirects = _RequestState('redirects')
+
+    def __init__(self, handle=None, url=None, order=None):
         """
         This class is responsible for matching incoming request and dispatch those request to the plugins endpoints.
 
@@ -455,17 +731,36 @@ class Plugin(object):
         :type handle: int | None
         :param url: URL of the entry.
         :type url: str | None
+        :param order: The order in which routes are tried. Defaults to RouteOrder.REGISTRATION.
+        :type order: RouteOrder | None
         """
         self.converters = {
-            'bool': bool,
-            'float': float,
-            'int': int,
-            'json': json.loads,
-            'str': str
+            'bool': Converter('[Tt]rue|[Ff]alse|[01]', lambda value: value in ('True', 'true', '1'), lambda value: 'true' if value else 'false'),
+            'float': Converter('-?\\d+(?:\\.\\d+)?(?:e-?\\d+)?', float, lambda value: repr(float(value)).replace('e+', 'e')),
+            'int': Converter('-?\\d+', int, str),
+            'json': Converter('[^/]+', json.loads, json.dumps),
+            'str': Converter('[^/]+', str, str)
         }
-        self.handle = int(sys.argv[1]) if handle is None else handle
+        self.defaults = {}
+        self.local = threading.local()
+        self.handle = (int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else -1) if handle is None else handle
+        self.maxRedirects = 10
+        self.order = RouteOrder.REGISTRATION if order is None else order
+        self.hits, self.hitLines = self._readHits() if self.order == RouteOrder.HITS else ({}, 0)
+        self.lookups = {}
+        self.prefetchCache = None
+        self.prefetcher = None
+        self.prefetches = []
+        self.prefixes = {}
+        self.redirects = 0
         self.routes = []
-        self.scheme, self.netloc, path, params, query, fragment = urlparse(sys.argv[0] + sys.argv[2] if url is None else url)
+        self.sortCache = None
+        self.wildcards = []
+
+        if url is None:
+            url = sys.argv[0] + sys.argv[2] if len(sys.argv) > 2 else 'plugin://{}/'.format(getAddonId())
+
+        self.scheme, self.netloc, path, params, query, fragment = urlparse(url)
         path = path.rstrip('/')
         self.path = path if path else '/'
         self.query = {name: json.loads(value) for name, value in parse_qsl(query)}
@@ -475,34 +770,389 @@ class Plugin(object):
         Handles incoming request and dispatch to the endpoint.
         """
         Log.info('[script.module.xbmcext] Routing "{}"'.format(self.getFullPath()))
+        self.redirects = 0
+        handoff = xbmcgui.Window(WindowCache.WINDOW_HOME).getProperty('{}.{}'.format(getAddonId(), self.HANDOFF_PROPERTY))
+
+        if not (handoff and (self._replay() or self._delegate())):
+            self._dispatch()
+
+        if self.prefetches:
+            urls, budget = zip(*self.prefetches)
+            self.prefetches = []
+            self.prefetcher = threading.Thread(target=self._prefetch, args=([url for group in urls for url in group], time.time() + max(budget)))
+            self.prefetcher.daemon = True
+            self.prefetcher.start()
+
+    def _call(self, function, kwargs):
+        Log.info('[script.module.xbmcext] Calling "{}"'.format(function.__name__))
+        function(**kwargs)
+
+    def _delegate(self):
+        window = xbmcgui.Window(WindowCache.WINDOW_HOME)
+        property = window.getProperty('{}.service'.format(getAddonId()))
+
+        if not property:
+            return False
+
+        service = json.loads(property)
+
+        try:
+            connection = socket.socket(socket.AF_UNIX if service['family'] == 'unix' else socket.AF_INET, socket.SOCK_STREAM)
+
+            try:
+                connection.settimeout(self.SERVICE_CONNECT_TIMEOUT)
+
+                try:
+                    connection.connect(service['address'] if service['family'] == 'unix' else tuple(service['address']))
+                except EnvironmentError:
+                    if window.getProperty('{}.service'.format(getAddonId())) == property:
+                        window.clearProperty('{}.service'.format(getAddonId()))
+
+                    raise
+
+                connection.settimeout(self.SERVICE_TIMEOUT)
+                self._send(connection, json.dumps({'handle': self.handle, 'path': self.path, 'query': self.query, 'token': service['token']}).encode('utf-8'))
+                response = self._receive(connection)
+            finally:
+                connection.close()
 
-        for pattern, converters, function in self.routes:
-            match = re.match('^{}$'.format(pattern), self.path)
+            if not hmac.compare_digest(response[:32], self._sign(service['token'], response[32:])):
+                raise ValueError('The response of the service is not signed with its token.')
+
+            response = pickle.loads(response[32:])
+        except (EnvironmentError, EOFError, ValueError, pickle.UnpicklingError) as e:
+            Log.debug('[script.module.xbmcext] Delegating "{}" failed: {}'.format(self.getFullPath(), e))
+            return False
+
+        if 'error' in response:
+            if not response.get('notFound'):
+                raise ServiceException('The service failed to handle "{}": {}'.format(self.getFullPath(), response['error']))
+
+            Log.debug('[script.module.xbmcext] Delegating "{}" failed: {}'.format(self.getFullPath(), response['error']))
+            return False
+
+        Log.info('[script.module.xbmcext] Serving "{}" from the service'.format(self.getFullPath()))
+        self._replayCalls(response['calls'])
+        return True
+
+    def _diagnose(self, path, query):
+        parts = path.split('/')
+        reasons = []
+        scores = []
+
+        for index, route in enumerate(self.routes):
+            match = route.pattern.match(path)
 
             if match:
-                kwargs = match.groupdict()
+                kwargs = set(match.groupdict()) | set(query) - {self.CURSOR}
+                problems = []
 
-                for name, converter in converters.items():
-                    kwargs[name] = converter(kwargs[name])
+                if route.args - kwargs:
+                    problems.append('is missing {}'.format(', '.join(sorted(route.args - kwargs))))
 
-                kwargs.update(self.query)
-                argspec = inspect.getfullargspec(function)
+                if kwargs - route.args:
+                    problems.append('does not accept {}'.format(', '.join(sorted(kwargs - route.args))))
 
-                if set(kwargs) == set(argspec.args):
-                    Log.info('[script.module.xbmcext] Calling "{}"'.format(function.__name__))
-                    function(**kwargs)
-                    return
+                reasons.append('"{}" matched but {}.'.format(route.path, ' and '.join(problems)))
+                scores.append(((len(parts) + 1, 1.0), index, route))
+            else:
+                common = 0
+                rendered = []
+
+                for position, segment in enumerate(route.segments):
+                    part = parts[position] if position < len(parts) else ''
+
+                    if common == position and (isinstance(segment, tuple) or segment == part):
+                        common += 1
+
+                    rendered.append(part if isinstance(segment, tuple) else segment)
+
+                matcher = difflib.SequenceMatcher(None, '/'.join(rendered), path)
+
+                if common > 1 or matcher.real_quick_ratio() >= 0.6 and matcher.quick_ratio() >= 0.6 and matcher.ratio() >= 0.6:
+                    scores.append(((common, matcher.ratio()), index, route))
+
+        return [route for score, index, route in sorted(scores, key=lambda item: (-item[0][0], -item[0][1], item[1]))[:3]], reasons
+
+    def _dispatch(self):
+        for route in self._getRoutes(self.path):
+            if self._match(route):
+                return
+
+        path, query = self.path, self.query
+        raise NotFoundException('A route could not be found for "{}".'.format(path), lambda: self._diagnose(path, query))
+
+    def _getPrefetchCache(self):
+        if self.prefetchCache is None:
+            self.prefetchCache = WindowCache('prefetch', fallback=DiskCache(os.path.join(getAddonProfilePath(), self.PREFETCH_DIRECTORY)))
+
+        return self.prefetchCache
+
+    def _getPrefetchKey(self):
+        return '{}?{}'.format(self.path, urlencode(sorted((name, json.dumps(value, sort_keys=True)) for name, value in self.query.items())))
+
+    def _getRank(self, route):
+        if self.order == RouteOrder.REGISTRATION:
+            return len(self.routes),
+        elif self.order == RouteOrder.SPECIFICITY:
+            return route.specificity, 0, len(self.routes)
+
+        return route.specificity, -self.hits.get(route.key, 0), len(self.routes)
+
+    def _getRoutes(self, path):
+        segments = path.split('/', 2)
+        prefix = segments[1] if len(segments) > 1 and segments[1] in self.prefixes else None
+        routes = self.lookups.get(prefix)
+
+        if routes is None:
+            routes = self.lookups[prefix] = self.wildcards if prefix is None else self._merge(self.prefixes[prefix], self.wildcards)
+
+        return routes
+
+    def _getSortCache(self):
+        if self.sortCache is None:
+            self.sortCache = WindowCache('sort', fallback=DiskCache(os.path.join(getAddonProfilePath(), self.SORT_DIRECTORY)))
+
+        return self.sortCache
+
+    def _getSortOrder(self, records, sortMethod, reverse, version, refresh):
+        sortKey = sortMethod.getKey()
+        order = list(range(len(records)))
+
+        if sortKey is None:
+            return order
+
+        query = dict((name, value) for name, value in self.query.items() if name != self.CURSOR)
+        key = json.dumps([self.path, query, int(sortMethod), reverse, len(records), version], sort_keys=True)
+        cached = None if refresh else self._getSortCache().get(key)
+
+        if cached is not None:
+            return cached
+
+        order.sort(key=lambda index: sortKey(records[index]), reverse=reverse)
+        self._getSortCache().set(key, order, self.SORT_TTL)
+        return order
+
+    @staticmethod
+    def _insert(routes, route):
+        index = len(routes)
+
+        while index and routes[index - 1].rank > route.rank:
+            index -= 1
+
+        routes.insert(index, route)
+
+    @staticmethod
+    def _merge(first, second):
+        routes = []
+        index = 0
 
-        raise NotFoundException('A route could not be found in the route collection.')
+        for route in first:
+            while index < len(second) and second[index].rank < route.rank:
+                routes.append(second[index])
+                index += 1
 
-    def addDirectoryItems(self, items):
+            routes.append(route)
+
+        return routes + second[index:]
+
+    def _match(self, route):
+        match = route.pattern.match(self.path)
+
+        if match:
+            kwargs = match.groupdict()
+
+            for name, converter in route.converters.items():
+                kwargs[name] = converter.to_python(unquote(kwargs[name]))
+
+            kwargs.update(self.query)
+            kwargs.pop(self.CURSOR, None)
+
+            if set(kwargs) == route.args:
+                if self.order == RouteOrder.HITS and not getattr(_capture, 'prefetching', False):
+                    self._writeHit(route)
+
+                self._call(route.function, kwargs)
+                return True
+
+        return False
+
+    def _prefetch(self, urls, deadline):
+        monitor = xbmc.Monitor()
+        xbmcgui.Window(WindowCache.WINDOW_HOME).setProperty('{}.{}'.format(getAddonId(), self.HANDOFF_PROPERTY), 'true')
+        _capture.deadline = deadline
+        _capture.prefetching = True
+
+        try:
+            for url in urls:
+                if time.time() >= deadline or monitor.abortRequested():
+                    break
+
+                _capture.calls = []
+
+                try:
+                    scheme, netloc, path, params, query, fragment = urlparse(url)
+                    path = path.rstrip('/')
+                    self.path = path if path else '/'
+                    self.query = {name: json.loads(value) for name, value in parse_qsl(query)}
+                    self.redirects = 0
+                    self._dispatch()
+
+                    if time.time() >= deadline:
+                        raise _DeadlineException('The time budget ran out.')
+
+                    self._getPrefetchCache().set(self._getPrefetchKey(), _capture.calls, self.PREFETCH_TTL)
+                except Exception as e:
+                    Log.debug('[script.module.xbmcext] Prefetching "{}" failed: {}'.format(url, e))
+                finally:
+                    _capture.calls = None
+        finally:
+            _capture.deadline = None
+            _capture.prefetching = False
+
+    def _prefetchQueued(self, prefetches):
+        while True:
+            urls, deadline = prefetches.get()
+
+            if urls is None:
+                return
+
+            self._prefetch(urls, deadline)
+
+    def _readHits(self):
+        hits = collections.defaultdict(int)
+        lines = 0
+        path = os.path.join(getAddonProfilePath(), self.HITS_FILE)
+
+        if os.path.exists(path):
+            with open(path) as io:
+                for line in io:
+                    count, _, key = line.rstrip('\n').partition('\t')
+
+                    if key and count.isdigit():
+                        hits[key] += int(count)
+                        lines += 1
+
+        return dict(hits), lines
+
+    @staticmethod
+    def _receive(connection):
+        data = b''
+
+        while len(data) < 4 or len(data) < 4 + struct.unpack('>I', data[:4])[0]:
+            chunk = connection.recv(65536)
+
+            if not chunk:
+                raise EOFError('The connection was closed before the message was received.')
+
+            data += chunk
+
+        return data[4:]
+
+    def _record(self, name, *args):
+        calls = getattr(_capture, 'calls', None)
+
+        if calls is None:
+            return False
+
+        if getattr(_capture, 'deadline', None) is not None and time.time() >= _capture.deadline:
+            raise _DeadlineException('The time budget ran out.')
+
+        calls.append((name, args))
+        return True
+
+    def _replay(self):
+        key = self._getPrefetchKey()
+        calls = self._getPrefetchCache().get(key)
+
+        if calls is None:
+            return False
+
+        self._getPrefetchCache().delete(key)
+        Log.info('[script.module.xbmcext] Serving prefetched "{}"'.format(self.getFullPath()))
+        self._replayCalls(calls)
+        return True
+
+    def _replayCalls(self, calls):
+        def build(value):
+            if isinstance(value, _ListItemRecorder):
+                return value.build()
+            elif isinstance(value, (list, tuple)):
+                return type(value)(build(item) for item in value)
+            else:
+                return value
+
+        for name, args in calls:
+            getattr(self, name)(*build(args))
+
+    @staticmethod
+    def _send(connection, data):
+        connection.sendall(struct.pack('>I', len(data)) + data)
+
+    def _serve(self, connection, token, prefetches):
+        request = json.loads(self._receive(connection).decode('utf-8'))
+
+        if request.get('token') != token:
+            return
+
+        self.handle = request['handle']
+        self.path = request['path']
+        self.query = request['query']
+        self.redirects = 0
+        _capture.calls = []
+
+        try:
+            self._dispatch()
+            response = {'calls': [call for call in _capture.calls if call[0] != 'prefetch']}
+
+            for name, (urls, budget) in [call for call in _capture.calls if call[0] == 'prefetch']:
+                prefetches.put((urls, time.time() + budget))
+        except Exception as e:
+            response = {'error': '{}: {}'.format(type(e).__name__, e), 'notFound': isinstance(e, NotFoundException)}
+        finally:
+            _capture.calls = None
+
+        response = pickle.dumps(response, pickle.HIGHEST_PROTOCOL)
+        self._send(connection, self._sign(token, response) + response)
+
+    @staticmethod
+    def _sign(token, data):
+        return hmac.new(token.encode('utf-8'), data, hashlib.sha256).digest()
+
+    def _writeHit(self, route):
+        directory = getAddonProfilePath()
+        path = os.path.join(directory, self.HITS_FILE)
+        self.hits[route.key] = self.hits.get(route.key, 0) + 1
+        self.hitLines += 1
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        if self.hitLines < self.HITS_COMPACTION:
+            with open(path, 'a') as io:
+                io.write('1\t{}\n'.format(route.key))
+        else:
+            hits, lines = self._readHits()
+            hits[route.key] = hits.get(route.key, 0) + 1
+
+            with open(path + '.tmp', 'w') as io:
+                for key, count in sorted(hits.items()):
+                    io.write('{}\t{}\n'.format(count, key))
+
+            getattr(os, 'replace', os.rename)(path + '.tmp', path)
+            self.hits, self.hitLines = hits, len(hits)
+
+    def addDirectoryItems(self, items, totalItems=None):
         """
         Callback function to pass directory contents back to Kodi as a list.
 
         :param items: List of (url, listitem, isFolder) as a tuple to add.
         :type items: list[(str, ListItem, bool)]
+        :param totalItems: The number of items in the listing, which Kodi shows the progress against. Defaults to the number of items.
+        :type totalItems: int | None
         """
-        xbmcplugin.addDirectoryItems(self.handle, items, len(items))
+        if not self._record('addDirectoryItems', list(items), totalItems):
+            xbmcplugin.addDirectoryItems(self.handle, items, len(items) if totalItems is None else totalItems)
 
     def addSortMethods(self, *sortMethods):
         """
@@ -511,9 +1161,31 @@ class Plugin(object):
         :param sortMethods: The sorting methods.
         :type sortMethods: SortMethod
         """
+        if self._record('addSortMethods', *sortMethods):
+            return
+
         for sortMethod in sortMethods:
             xbmcplugin.addSortMethod(self.handle, sortMethod)
 
+    def converter(self, name, regex='[^/]+', to_python=str, to_url=str):
+        """
+        Adds a converter that can be used in route patterns as {name:converter}.
+
+        :param name: The name of the converter.
+        :type name: str
+        :param regex: The regular expression that a path segment must match, before it is percent-decoded.
+        :type regex: str
+        :param to_python: Converts the matched path segment, percent-decoded, to a Python value.
+        :type to_python: typing.Callable
+        :param to_url: Converts a Python value to a path segment, which is percent-encoded afterwards. It must only
+            return segments that match the regular expression.
+        :type to_url: typing.Callable
+        :return: The converter.
+        :rtype: Converter
+        """
+        self.converters[name] = Converter(regex, to_python, to_url)
+        return self.converters[name]
+
     def endOfDirectory(self, succeeded=True, updateListing=False, cacheToDisc=True):
         """
         Callback function to tell Kodi that the end of the directory listing in a virtualPythonFolder module is reached.
@@ -525,16 +1197,50 @@ class Plugin(object):
         :param cacheToDisc: True if folder will cache if extended time; otherwise False.
         :type cacheToDisc: bool
         """
-        xbmcplugin.endOfDirectory(self.handle, succeeded, updateListing, cacheToDisc)
+        if not self._record('endOfDirectory', succeeded, updateListing, cacheToDisc):
+            xbmcplugin.endOfDirectory(self.handle, succeeded, updateListing, cacheToDisc)
+
+    def getFullPath(self):
+        """
+        Returns a relative URL.
+
+        :return: A relative URL.
+        :rtype: str
+        """
+        return urlunsplit(('', '', self.path, urlencode(self.query), ''))
+
+    def getPathFor(self, path, query):
+        """
+        Returns the path of an endpoint and the query that remains after the path segments are built.
+
+        :param path: The path or the endpoint.
+        :type path: str | typing.Callable
+        :param query: The values of the named path segments and the query.
+        :type query: dict[str, Any]
+        :return: The path and the remaining query.
+        :rtype: tuple[str, dict[str, Any]]
+        """
+        if not callable(path):
+            return path, query
+
+        for route in self.routes:
+            if route.function is path:
+                remainingQuery = dict(query)
+                routePath = route.build(remainingQuery)
+
+                if routePath is not None:
+                    return routePath, remainingQuery
+
+        raise NotFoundException('A route could not be found for "{}".'.format(path.__name__))
 
-    def getFullPath(self):
+    def getRouteStats(self):
         """
-        Returns a relative URL.
+        Returns the hits recorded for every route by RouteOrder.HITS, most hit first.
 
-        :return: A relative URL.
-        :rtype: str
+        :return: The (route, hits) tuples, where a route is identified by its path pattern and its arguments.
+        :rtype: list[tuple[str, int]]
         """
-        return urlunsplit(('', '', self.path, urlencode(self.query), ''))
+        return sorted(self._readHits()[0].items(), key=lambda item: (-item[1], item[0]))
 
     def getSerializedFullPath(self):
         """
@@ -549,13 +1255,14 @@ class Plugin(object):
         """
         Returns an absolute URL.
 
-        :param path: The path for combining into a complete URL. Accepts any query found in path.
-        :type path: str
+        :param path: The path or the endpoint for combining into a complete URL. Accepts any query found in path.
+        :type path: str | typing.Callable
         :param query: The query for serialization and combining into a complete URL.
         :type query: Any
         :return: An absolute URL.
         :rtype: str
         """
+        path, query = self.getPathFor(path, query)
         scheme, netloc, path, params, querystring, fragment = urlparse(path)
         query.update(parse_qsl(querystring))
         return urlunsplit((self.scheme, self.netloc, path, urlencode({name: json.dumps(value) for name, value in query.items()}), ''))
@@ -564,34 +1271,161 @@ class Plugin(object):
         """
         Returns an absolute URL.
 
-        :param path: The path for combining into a complete URL. Accepts any query found in path.
-        :type path: str
+        :param path: The path or the endpoint for combining into a complete URL. Accepts any query found in path.
+        :type path: str | typing.Callable
         :param query: The query for combining into a complete URL.
         :type query: Any
         :return: An absolute URL.
         :rtype: str
         """
+        path, query = self.getPathFor(path, query)
         scheme, netloc, path, params, querystring, fragment = urlparse(path)
         query.update(parse_qsl(querystring))
         return urlunsplit((self.scheme, self.netloc, path, urlencode(query), ''))
 
+    def paginate(self, entries, build, pageSize=50, cursor=None, label='Next page', total=None, sortMethod=None, reverse=False, version=None):
+        """
+        Passes a page of a listing to Kodi, followed by a "Next page" item that opens the next page. Only the entries
+        of the page are built. The next page is the current URL with an opaque cursor in the query parameter named by
+        Plugin.CURSOR, which is reserved for paginate and not passed to the endpoint. A malformed cursor opens the first
+        page.
+
+        :param entries: The entries of the listing. A sequence is sliced, any other iterable is consumed up to the end
+            of the page, and a function is called with the upstream cursor of the page (None for the first page) and
+            the page size, and returns the entries of the page and the upstream cursor of the next page (None for the
+            last page), for APIs that page by cursor instead of offset.
+        :type entries: typing.Sequence | typing.Iterable | typing.Callable
+        :param build: The function that builds the (url, listitem, isFolder) tuple of an entry.
+        :type build: typing.Callable
+        :param pageSize: The number of entries in a page.
+        :type pageSize: int
+        :param cursor: The cursor of the page. Defaults to the cursor of the current URL.
+        :type cursor: str | None
+        :param label: The label of the "Next page" item.
+        :type label: str
+        :param total: The number of entries in the listing, which is passed to Kodi as the TotalEntries container
+            property. Defaults to the length of a sequence.
+        :type total: int | None
+        :param sortMethod: The method the entries, which must be records as SortMethod.sort takes them, are sorted by
+            across all pages before the page is sliced. The first page always sorts the entries and caches the order
+            for the URL without the cursor, the number of entries and the version, so that the following pages are not
+            sorted again. Entries given by a function must be sorted upstream.
+        :type sortMethod: SortMethod | None
+        :param reverse: Whether the entries are sorted in descending order.
+        :type reverse: bool
+        :param version: A value that changes whenever the entries change without changing in number, such as the
+            modification time of their source, so that the following pages do not use an order that is out of date.
+        :type version: str | int | None
+        :return: The cursor of the next page, or None for the last page.
+        :rtype: str | None
+        """
+        cursor = self.query.get(self.CURSOR) if cursor is None else cursor
+
+        try:
+            position = json.loads(base64.urlsafe_b64decode(str(cursor)).decode('utf-8')) if cursor else None
+
+            if position is not None and not callable(entries) and not (isinstance(position, six.integer_types) and position >= 0):
+                raise ValueError('The offset is not a natural number.')
+        except (TypeError, ValueError) as e:
+            Log.debug('[script.module.xbmcext] Ignoring the malformed cursor "{}": {}'.format(cursor, e))
+            position = None
+
+        if callable(entries):
+            if sortMethod is not None:
+                raise ValueError('Entries given by a function cannot be sorted across pages.')
+
+            page, position = entries(position, pageSize)
+            page = list(page)
+        elif sortMethod is not None:
+            entries = entries if hasattr(entries, '__len__') and hasattr(entries, '__getitem__') else list(entries)
+            offset = position or 0
+            page = [entries[index] for index in self._getSortOrder(entries, sortMethod, reverse, version, position is None)[offset:offset + pageSize]]
+            position = offset + pageSize if offset + pageSize < len(entries) else None
+            total = len(entries) if total is None else total
+        elif hasattr(entries, '__len__') and hasattr(entries, '__getitem__'):
+            offset = position or 0
+            page = entries[offset:offset + pageSize]
+            position = offset + pageSize if offset + pageSize < len(entries) else None
+            total = len(entries) if total is None else total
+        else:
+            offset = position or 0
+            page = list(itertools.islice(entries, offset, offset + pageSize + 1))
+            position = offset + pageSize if len(page) > pageSize else None
+            page = page[:pageSize]
+
+        items = [build(entry) for entry in page]
+        cursor = None
+
+        if position is not None:
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+            item = ListItem(label)
+            item.setProperty('SpecialSort', 'bottom')
+            query = dict(self.query)
+            query[self.CURSOR] = cursor
+            items.append((self.getSerializedUrlFor(self.path, **query), item, True))
+
+        if total is not None:
+            self.setProperty('TotalEntries', str(total))
+
+        self.addDirectoryItems(items, len(items) if total is None else total)
+        return cursor
+
+    def prefetch(self, urls, budget=3.0):
+        """
+        Declares the URLs that the user is likely to open next, such as the seasons of a show. Once the current request
+        has been handled, a background thread runs their endpoints within the time budget and captures the listings in
+        a WindowCache that overflows to the add-on profile, where the next invocation of one of the URLs is served from.
+        The endpoints must pass their output to Kodi through this class, not through xbmcplugin, and must not open
+        dialogs. Prefetched listings are only looked up once the add-on has prefetched or started the service, which
+        the home window property named by Plugin.HANDOFF_PROPERTY records.
+
+        :param urls: The URLs, as built by getUrlFor or getSerializedUrlFor.
+        :type urls: list[str]
+        :param budget: The number of seconds after which no more URLs are prefetched.
+        :type budget: float
+        """
+        if not self._record('prefetch', list(urls), budget):
+            self.prefetches.append((list(urls), budget))
+
     def redirect(self, path, **query):
         """
-        Redirects to a new path.
+        Redirects to a new path without routing the request again.
 
-        :param path: The target path.
-        :type path: str
+        :param path: The target path or endpoint. An endpoint is resolved through its routes, like a path.
+        :type path: str | typing.Callable
         :param query: The HTTP query.
         :type query: Any
+        :raises NotFoundException: When no route of the endpoint accepts the query.
         """
-        path = path.rstrip('/')
-        self.path = path if path else '/'
-        self.query = query
-        self()
+        self.redirects += 1
+
+        if self.redirects > self.maxRedirects:
+            raise RedirectLoopException('Exceeded {} redirects at "{}".'.format(self.maxRedirects, self.getFullPath()))
+
+        if callable(path):
+            function = path
+            path, self.query = self.getPathFor(function, query)
+            self.path = path
+            Log.debug('[script.module.xbmcext] Redirecting "{}"'.format(self.getFullPath()))
+
+            for route in self.routes:
+                if route.function is function and self._match(route):
+                    return
+
+            path, query = self.path, self.query
+            raise NotFoundException('"{}" does not accept "{}".'.format(function.__name__, self.getFullPath()), lambda: self._diagnose(path, query))
+        else:
+            path = path.rstrip('/')
+            self.path = path if path else '/'
+            self.query = query
+            Log.debug('[script.module.xbmcext] Redirecting "{}"'.format(self.getFullPath()))
+            self._dispatch()
 
     def route(self, path):
         """
-        Adds a route that matches the specified pattern.
+        Adds a route that matches the specified pattern. The values of the named path segments are percent-decoded
+        before they are converted and passed to the endpoint, so that "/search/{query}" receives "Stranger Things"
+        for "/search/Stranger%20Things", the way getUrlFor encodes it.
 
         :param path: The path pattern of the route.
         :type path: str
@@ -600,32 +1434,133 @@ class Plugin(object):
         """
         converters = {}
         path = path.rstrip('/')
-        segments = (path if path else '/').split('/')
-        path = []
+        segments = []
+        pattern = []
+        specificity = []
 
-        for segment in segments:
+        for segment in (path if path else '/').split('/'):
             match = re.match('^{(?:(\\w+?)(?::(\\w+?))?)?(?::re\\("(.+?)"\\))?}$', segment)
 
             if match:
                 name, converter, constraint = match.groups()
+                converter = self.converters[converter] if converter else self.converters['str']
+
+                if not isinstance(converter, Converter):
+                    converter = Converter(to_python=converter)
 
                 if constraint is None:
-                    constraint = '[^/]+'
+                    constraint = converter.regex
+                    specificity.append(3 if converter.regex == '[^/]+' else 1)
+                else:
+                    specificity.append(2)
 
                 if name:
-                    converters[name] = self.converters[converter] if converter else str
-                    path.append('(?P<{}>{})'.format(name, constraint))
+                    converters[name] = converter
+                    segments.append((name, converter))
+                    pattern.append('(?P<{}>{})'.format(name, constraint))
                 else:
-                    path.append(constraint)
+                    segments.append((None, converter))
+                    pattern.append('(?:{})'.format(constraint))
             else:
-                path.append(re.escape(segment))
+                segments.append(segment)
+                pattern.append(re.escape(segment))
+                specificity.append(0)
 
         def decorator(function):
-            self.routes.append(('/'.join(path), converters, function))
+            route = Route(path if path else '/', '/'.join(pattern), converters, segments, function, specificity)
+            route.rank = self._getRank(route)
+            self._insert(self.routes, route)
+
+            if len(segments) > 1 and segments[0] == '' and not isinstance(segments[1], tuple):
+                self._insert(self.prefixes.setdefault(segments[1], []), route)
+            else:
+                self._insert(self.wildcards, route)
+
+            if self.lookups:
+                self.lookups.clear()
+
             return function
 
         return decorator
 
+    def serve(self):
+        """
+        Runs the plugin as a Kodi service until Kodi asks it to abort, so that its endpoints stay imported and its
+        caches stay warm. While the service runs, every invocation of the plugin forwards its path, query and handle to
+        the service, which runs the endpoint and sends back the listing to replay. When the service is not running,
+        cannot be reached or has no route for the request, the plugin handles the request itself. When the endpoint
+        raises in the service, the plugin raises a ServiceException instead of running the endpoint a second time. The
+        service runs the prefetches of the listings it serves on a background thread, next to the requests it handles.
+
+        Define the routes in a module that both the plugin and the service import, and call serve() from a script that
+        addon.xml declares as an xbmc.service extension. The endpoints must pass their output to Kodi through this
+        class, not through xbmcplugin, and must not open dialogs.
+
+        The service listens on a Unix socket in the add-on profile, or on a loopback port where Unix sockets are not
+        available, and publishes the address with a token in a property of the home window. Requests carry the token,
+        and responses are signed with it, so that the plugin does not unpickle a response that the service did not send.
+        """
+        monitor = xbmc.Monitor()
+        window = xbmcgui.Window(WindowCache.WINDOW_HOME)
+        token = hashlib.sha1(os.urandom(32)).hexdigest()
+        path = os.path.join(getAddonProfilePath(), self.SERVICE_SOCKET)
+        server = None
+
+        if hasattr(socket, 'AF_UNIX'):
+            try:
+                if not os.path.isdir(os.path.dirname(path)):
+                    os.makedirs(os.path.dirname(path))
+
+                if os.path.exists(path):
+                    os.remove(path)
+
+                server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                server.bind(path)
+                service = {'address': path, 'family': 'unix', 'token': token}
+            except EnvironmentError:
+                if server is not None:
+                    server.close()
+
+                server = None
+
+        if server is None:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.bind(('127.0.0.1', 0))
+            service = {'address': server.getsockname(), 'family': 'inet', 'token': token}
+
+        server.listen(5)
+        server.settimeout(1)
+        prefetches = six.moves.queue.Queue()
+        prefetcher = threading.Thread(target=self._prefetchQueued, args=(prefetches,))
+        prefetcher.daemon = True
+        prefetcher.start()
+        window.setProperty('{}.service'.format(getAddonId()), json.dumps(service))
+        window.setProperty('{}.{}'.format(getAddonId(), self.HANDOFF_PROPERTY), 'true')
+        Log.info('[script.module.xbmcext] Serving on {}'.format(service['address']))
+
+        try:
+            while not monitor.abortRequested():
+                try:
+                    connection, address = server.accept()
+                except socket.timeout:
+                    continue
+
+                try:
+                    connection.settimeout(self.SERVICE_TIMEOUT)
+                    self._serve(connection, token, prefetches)
+                except Exception as e:
+                    Log.debug('[script.module.xbmcext] Serving a request failed: {}'.format(e))
+                finally:
+                    connection.close()
+        finally:
+            window.clearProperty('{}.service'.format(getAddonId()))
+            window.clearProperty('{}.{}'.format(getAddonId(), self.HANDOFF_PROPERTY))
+            server.close()
+            prefetches.put((None, None))
+
+            if service['family'] == 'unix' and os.path.exists(path):
+                os.remove(path)
+
     def setContent(self, content):
         """
         Sets the plugins content. Available content strings
@@ -645,7 +1580,20 @@ class Plugin(object):
         :param content: Content type (e.g. movies).
         :type content: str
         """
-        xbmcplugin.setContent(self.handle, content)
+        if not self._record('setContent', content):
+            xbmcplugin.setContent(self.handle, content)
+
+    def setProperty(self, key, value):
+        """
+        Sets a property of the container, which skins read as Container.Property(key).
+
+        :param key: The key of the property.
+        :type key: str
+        :param value: The value of the property.
+        :type value: str
+        """
+        if not self._record('setProperty', key, value):
+            xbmcplugin.setProperty(self.handle, key, value)
 
     def setResolvedUrl(self, succeeded, listitem):
         """
@@ -656,7 +1604,217 @@ class Plugin(object):
         :param listitem: Item the file plugin resolved to for playback.
         :type listitem: ListItem
         """
-        xbmcplugin.setResolvedUrl(self.handle, succeeded, listitem)
+        if not self._record('setResolvedUrl', succeeded, listitem):
+            xbmcplugin.setResolvedUrl(self.handle, succeeded, listitem)
+
+
+class RedirectLoopException(Exception):
+    """
+    Throws an exception when a request is redirected too many times.
+    """
+
+
+class Route(object):
+    def __init__(self, path, pattern, converters, segments, function, specificity=()):
+        """
+        A route maps a path pattern to the endpoint that handles it.
+
+        :param path: The path pattern of the route.
+        :type path: str
+        :param pattern: The regular expression compiled from the path pattern.
+        :type pattern: str
+        :param converters: The converters of the named path segments.
+        :type converters: dict[str, Converter]
+        :param segments: The literal path segments and (name, converter) tuples of the path pattern.
+        :type segments: list[str | tuple[str | None, Converter]]
+        :param function: The endpoint.
+        :type function: typing.Callable
+        :param specificity: The rank of every path segment, from 0 for a literal, 1 for a typed parameter and 2 for a regular expression constraint to 3 for a parameter that matches any segment.
+        :type specificity: list[int]
+        """
+        self.path = path
+        self.regex = '^{}$'.format(pattern)
+        self.compiled = None
+        self.converters = converters
+        self.segments = segments
+        self.function = function
+        self.specificity = tuple(specificity)
+        self.arguments = None
+
+    @property
+    def args(self):
+        """
+        The names of the arguments of the endpoint, which are inspected when the route is first tried.
+
+        :rtype: set[str]
+        """
+        if self.arguments is None:
+            self.arguments = set(inspect.getfullargspec(self.function).args)
+
+        return self.arguments
+
+    @property
+    def key(self):
+        """
+        The path pattern and the arguments of the route, which identify it in the hits file.
+
+        :rtype: str
+        """
+        return '{}({})'.format(self.path, ', '.join(sorted(self.args)))
+
+    @property
+    def pattern(self):
+        """
+        The compiled regular expression of the route, which is compiled when the route is first tried, so that
+        registering routes on every invocation does not pay for routes that are never matched.
+
+        :rtype: re.Pattern
+        """
+        if self.compiled is None:
+            self.compiled = re.compile(self.regex)
+
+        return self.compiled
+
+    def build(self, query):
+        """
+        Builds a path from the route by consuming the values of the named path segments from the query.
+
+        :param query: The values of the named path segments and the remaining query.
+        :type query: dict[str, Any]
+        :return: The path, or None if the route cannot be built from the query.
+        :rtype: str | None
+        """
+        path = []
+
+        for segment in self.segments:
+            if isinstance(segment, tuple):
+                name, converter = segment
+
+                if name is None or name not in query:
+                    return None
+
+                path.append(quote(converter.to_url(query[name]), safe=''))
+            else:
+                path.append(segment)
+
+        for name in self.converters:
+            del query[name]
+
+        return '/'.join(path) or '/'
+
+
+class RouteOrder(enum.Enum):
+    """
+    The order in which a plugin tries its routes.
+
+    :var REGISTRATION: Try the routes in the order they were added.
+    :var SPECIFICITY: Try the most specific routes first, whatever order they were added in. Segment by segment, a literal beats a typed parameter, which beats a regular expression constraint, which beats a parameter that matches any segment. Routes of equal specificity keep the order they were added in.
+    :var HITS: Like SPECIFICITY, but routes of equal specificity are tried in the order of the hits recorded in the add-on profile by previous invocations.
+    """
+
+    REGISTRATION = 0
+    SPECIFICITY = 1
+    HITS = 2
+
+
+class SelectTabDialog(xbmcgui.WindowXMLDialog):
+    """
+    The dialog behind Dialog.selecttab.
+    """
+
+    DIALOG_TITLE = 1100
+    DIALOG_CONTENT = 1110
+    DIALOG_SUBCONTENT = 1120
+    DIALOG_OK_BUTTON = 1131
+    DIALOG_CLEAR_BUTTON = 1132
+
+    def __init__(self, xmlFilename, scriptPath, defaultSkin='Default', defaultRes='720p'):
+        super(SelectTabDialog, self).__init__(xmlFilename, scriptPath, defaultSkin, defaultRes)
+        self.heading = ''
+        self.highlightedIndex = -1
+        self.options = None
+        self.preselect = {}
+        self.selectedItems = {}
+        self.selectedLabel = None
+
+    def getSelectedItems(self):
+        return {self.options.keys[key]: self.options.values[key][value] for key, value in self.selectedItems.items()} if self.selectedItems else None
+
+    def onAction(self, action):
+        if action.getId() in (xbmcgui.ACTION_PREVIOUS_MENU, xbmcgui.ACTION_STOP, xbmcgui.ACTION_NAV_BACK):
+            self.selectedItems.clear()
+            self.close()
+        elif action.getId() in (xbmcgui.ACTION_MOUSE_MOVE, xbmcgui.ACTION_MOVE_UP, xbmcgui.ACTION_MOVE_DOWN):
+            self.onSelectedItemChanged(self.getFocusId())
+
+    def onClick(self, controlId):
+        if controlId == self.DIALOG_SUBCONTENT:
+            self.onListItemClick(self.getControl(self.DIALOG_SUBCONTENT).getSelectedPosition())
+        elif controlId == self.DIALOG_OK_BUTTON:
+            self.close()
+        elif controlId == self.DIALOG_CLEAR_BUTTON:
+            self.selectedItems.clear()
+            self.selectedItems.update(self.preselect)
+            selectedItemIndex = self.options.indexes[self.selectedLabel][self.selectedItems[self.selectedLabel]] if self.selectedLabel in self.selectedItems else -1
+            self.onListItemClick(selectedItemIndex)
+
+    def onFocus(self, controlId):
+        self.onSelectedItemChanged(controlId)
+
+    def onInit(self):
+        self.getControl(self.DIALOG_TITLE).setLabel(self.heading)
+        self.getControl(self.DIALOG_CONTENT).addItems(list(self.options.labels))
+        self.getControl(self.DIALOG_OK_BUTTON).setEnabled(len(self.selectedItems) == len(self.options.labels))
+        self.setFocusId(self.DIALOG_CONTENT)
+
+    def onListItemClick(self, selectedItemIndex):
+        control = self.getControl(self.DIALOG_SUBCONTENT)
+        selectedList = self.options.items[self.selectedLabel]
+
+        if self.highlightedIndex != -1 and self.highlightedIndex != selectedItemIndex:
+            control.getListItem(self.highlightedIndex).setLabel(selectedList[self.highlightedIndex])
+
+        if selectedItemIndex != -1:
+            label = selectedList[selectedItemIndex]
+            control.getListItem(selectedItemIndex).setLabel('[COLOR orange]{}[/COLOR]'.format(label))
+            self.selectedItems[self.selectedLabel] = label
+
+        self.highlightedIndex = selectedItemIndex
+        self.getControl(self.DIALOG_OK_BUTTON).setEnabled(len(self.selectedItems) == len(self.options.labels))
+
+    def onSelectedItemChanged(self, controlId):
+        if controlId == self.DIALOG_CONTENT:
+            selectedLabel = self.getControl(self.DIALOG_CONTENT).getSelectedItem().getLabel()
+
+            if self.selectedLabel != selectedLabel:
+                self.selectedLabel = selectedLabel
+                selectedItem = self.selectedItems.get(self.selectedLabel)
+                self.highlightedIndex = self.options.indexes[self.selectedLabel].get(selectedItem, -1)
+                control = self.getControl(self.DIALOG_SUBCONTENT)
+                control.reset()
+                control.addItems(['[COLOR orange]{}[/COLOR]'.format(item) if item == selectedItem else item for item in self.options.items[self.selectedLabel]])
+
+    def setOptions(self, heading, options, preselect):
+        """
+        Sets the heading, the options and the preselected items of the dialog.
+
+        :param heading: Dialog heading.
+        :type heading: str
+        :param options: Options to choose from.
+        :type options: TabOptions
+        :param preselect: Items to preselect in list.
+        :type preselect: dict[str, str]
+        """
+        self.heading = heading
+        self.options = options
+        self.preselect = preselect
+        self.selectedItems = dict(preselect)
+
+
+class ServiceException(Exception):
+    """
+    Throws an exception when the service failed to handle a request that was delegated to it.
+    """
 
 
 class SortMethod(enum.IntEnum):
@@ -751,6 +1909,453 @@ class SortMethod(enum.IntEnum):
     VIDEO_USER_RATING = xbmcplugin.SORT_METHOD_VIDEO_USER_RATING
     VIDEO_YEAR = xbmcplugin.SORT_METHOD_VIDEO_YEAR
 
+    @staticmethod
+    def _getValue(record, field, ignoreThe):
+        value = record.get(field)
+
+        if value is None and field == 'sorttitle':
+            value = record.get('title')
+
+        if value is None:
+            return 0,
+
+        if isinstance(value, six.string_types):
+            if _NUMBER.match(value):
+                return 1, float(value)
+
+            value = value.lower()
+
+            if ignoreThe and value[:4] in ('the ', 'the.', 'the_'):
+                value = value[4:]
+
+            return 2, [int(part) if part.isdigit() else part for part in _DIGITS.split(value)]
+
+        if isinstance(value, (bool, float) + six.integer_types):
+            return 1, value
+
+        return 3, value
+
+    def getKey(self):
+        """
+        Returns a key function that sorts records the way Kodi sorts list items by this method. A record is a dict
+        with the fields of the sorting method, named after the info labels: album, artist, bitrate, country, date,
+        dateadded, duration, episode, genre, label, lastplayed, listeners, mpaa, path, playcount, productioncode,
+        rating, season, size, sorttitle, studio, title, tracknumber, userrating and year. Numbers and strings that
+        hold a number, such as 2001 and '2001', are compared by value and come before other strings, which are compared
+        ignoring case and numbers in them by value. Records that lack the field come first.
+
+        :return: The key function, or None for the methods that keep the order of the records.
+        :rtype: typing.Callable | None
+        """
+        fields = _SORT_FIELDS.get(self.name)
+
+        if fields is None:
+            return None
+
+        ignoreThe = self.name.endswith('_IGNORE_THE')
+        return lambda record: [self._getValue(record, field, ignoreThe) for field in fields]
+
+    def sort(self, records, reverse=False):
+        """
+        Sorts records by this method, before any ListItem is built for them.
+
+        :param records: The records.
+        :type records: typing.Iterable[dict]
+        :param reverse: Whether the records are sorted in descending order.
+        :type reverse: bool
+        :return: The sorted records.
+        :rtype: list[dict]
+        """
+        key = self.getKey()
+        return list(records) if key is None else sorted(records, key=key, reverse=reverse)
+
+
+class StringTable(object):
+    CACHE_DIRECTORY = 'strings'
+    DEFAULT_LANGUAGE = 'en_gb'
+    ESCAPE = re.compile(r'\\(.)')
+    ESCAPES = {'n': '\n', 'r': '\r', 't': '\t'}
+    _memo = {}
+
+    def __init__(self, language=None):
+        """
+        The localized strings of the add-on, parsed from the strings.po files of its language directories once and kept
+        compiled in the add-on profile until the files change. The language directory of the region is preferred, such
+        as resource.language.pt_br over resource.language.pt_pt, then that of the language. Strings missing from the
+        language fall back to English, as they do in Kodi, and strings missing from both fall back to
+        Addon.getLocalizedString.
+
+        :param language: The ISO 639-1 code of the language with an optional region, such as pt or pt-br, or the name
+            of a language directory such as pt_br. Defaults to the active language and region.
+        :type language: str | None
+        """
+        self.language = (getLanguage(True) if language is None else language).lower().replace('-', '_')
+        self.strings = self._load()
+
+    def __getitem__(self, id):
+        return self.get(id)
+
+    @staticmethod
+    def _addEntry(strings, entry, source):
+        context = entry.get('msgctxt', '')
+
+        if context.startswith('#') and context[1:].isdigit():
+            string = entry.get('msgstr') or (entry.get('msgid') if source else None)
+
+            if string:
+                strings[int(context[1:])] = string
+
+    def _getName(self, names, language):
+        code = language.partition('_')[0]
+        candidates = [language, code, '{0}_{0}'.format(code)]
+
+        if self.DEFAULT_LANGUAGE.startswith(code + '_'):
+            candidates.append(self.DEFAULT_LANGUAGE)
+
+        candidates += sorted(name[len('resource.language.'):] for name in names if name.startswith('resource.language.{}_'.format(code)))
+        return next(('resource.language.' + candidate for candidate in candidates if 'resource.language.' + candidate in names), None)
+
+    def _getPaths(self):
+        directory = os.path.join(getAddonPath(), 'resources', 'language')
+        names = set(os.listdir(directory)) if os.path.isdir(directory) else set()
+        paths = []
+
+        for language in (self.DEFAULT_LANGUAGE, self.language):
+            name = self._getName(names, language)
+
+            if name:
+                path = os.path.join(directory, name, 'strings.po')
+
+                if os.path.exists(path) and path not in paths:
+                    paths.append(path)
+
+        return paths
+
+    def _load(self):
+        paths = self._getPaths()
+        mtimes = [(path, os.path.getmtime(path)) for path in paths]
+        key = getAddonId() + '.' + self.language
+        memo = StringTable._memo.get(key)
+
+        if memo and memo[0] == mtimes:
+            return memo[1]
+
+        cache = DiskCache(os.path.join(getAddonProfilePath(), self.CACHE_DIRECTORY))
+        cached = cache.get(key)
+
+        if cached and cached[0] == mtimes:
+            strings = cached[1]
+        else:
+            strings = {}
+
+            for path in paths:
+                strings.update(self.parse(path, os.path.basename(os.path.dirname(path)) == 'resource.language.' + self.DEFAULT_LANGUAGE))
+
+            cache.set(key, (mtimes, strings))
+
+        StringTable._memo[key] = (mtimes, strings)
+        return strings
+
+    @classmethod
+    def _unquote(cls, value):
+        return cls.ESCAPE.sub(lambda match: cls.ESCAPES.get(match.group(1), match.group(1)), value.strip()[1:-1])
+
+    def get(self, id):
+        """
+        Returns a localized string.
+
+        :param id: The id of the string.
+        :type id: int
+        :return: The localized string.
+        :rtype: str
+        """
+        string = self.strings.get(id)
+        return Addon.getLocalizedString(id) if string is None else string
+
+    @classmethod
+    def parse(cls, path, source=False):
+        """
+        Parses the strings of a strings.po file.
+
+        :param path: The path of the file.
+        :type path: str
+        :param source: Whether the file is in the source language, whose untranslated strings are their msgid.
+        :type source: bool
+        :return: The strings by id.
+        :rtype: dict[int, str]
+        """
+        strings = {}
+        entry = {}
+        field = None
+
+        with open(path, 'rb') as io:
+            lines = io.read().decode('utf-8').splitlines()
+
+        for line in lines + ['']:
+            line = line.strip()
+
+            if line.startswith('"') and field:
+                entry[field] += cls._unquote(line)
+            elif line.startswith('msg'):
+                field, _, value = line.partition(' ')
+
+                if field == 'msgctxt' and entry:
+                    cls._addEntry(strings, entry, source)
+                    entry = {}
+
+                entry[field] = cls._unquote(value)
+            elif not line:
+                cls._addEntry(strings, entry, source)
+                entry = {}
+                field = None
+
+        return strings
+
+
+class TabOptions(object):
+    def __init__(self, options):
+        """
+        The normalized options of a tab dialog. Build it once and pass it to the tab dialogs to reuse it across dialog opens.
+
+        :param options: Options to choose from.
+        :type options: dict[str | tuple[str], list[str | tuple[str]]]
+        """
+        self.indexes = {}
+        self.keys = {}
+        self.labels = []
+        self.items = {}
+        self.searchIndexes = {}
+        self.values = {}
+
+        for key, option in options.items():
+            if isinstance(key, tuple):
+                key, id = key
+                self.keys[key] = id
+            else:
+                self.keys[key] = key
+
+            self.labels.append(key)
+            self.values[key] = collections.OrderedDict(value if isinstance(value, tuple) else (value, value) for value in option)
+            self.items[key] = list(self.values[key].keys())
+            self.indexes[key] = {label: index for index, label in enumerate(self.items[key])}
+
+    def search(self, key, text):
+        """
+        Returns the indexes of the options of a tab whose labels contain the text, ignoring case.
+
+        :param key: The tab label.
+        :type key: str
+        :param text: The text to search for.
+        :type text: str
+        :return: The indexes of the matching options in ascending order.
+        :rtype: list[int]
+        """
+        if key not in self.searchIndexes:
+            self.searchIndexes[key] = _SearchIndex(self.items[key])
+
+        return self.searchIndexes[key].search(text)
+
+
+class WindowCache(object):
+    LOCK_TIMEOUT = 2
+    USE_RESOLUTION = 60
+    WINDOW_HOME = 10000
+    _lock = threading.Lock()
+
+    def __init__(self, name='cache', budget=1048576, fallback=None):
+        """
+        A cache that keeps serialized values in the properties of Kodi's home window, which outlives the interpreter
+        of every plugin invocation, so that a hit costs no file access. An index property keeps the expiry, size and
+        last use of every value. When the values outgrow the budget, the least recently used are moved to the fallback,
+        and a value that is larger than the budget is stored in the fallback directly.
+
+        The index is rewritten under a lock held in a window property, which the interpreters of concurrent add-on
+        invocations share, so that they do not lose each other's entries. A lock left behind by an interpreter that
+        died is taken over after LOCK_TIMEOUT seconds. Hits do not take the lock, and record the last use of a value
+        only when it is older than USE_RESOLUTION seconds.
+
+        :param name: The name of the cache, prefixed with the add-on id to namespace the properties.
+        :type name: str
+        :param budget: The number of characters the serialized values may take in window properties.
+        :type budget: int
+        :param fallback: The cache for the values that do not fit, such as a DiskCache.
+        :type fallback: DiskCache | None
+        """
+        self.namespace = '{}.{}'.format(getAddonId(), name)
+        self.budget = budget
+        self.fallback = fallback
+        self.window = xbmcgui.Window(self.WINDOW_HOME)
+
+    def _getName(self, key):
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        name = '{}.lock'.format(self.namespace)
+        token = hashlib.sha1(os.urandom(32)).hexdigest()
+
+        with WindowCache._lock:
+            while True:
+                owner = self.window.getProperty(name)
+
+                if not owner or float(owner.partition(' ')[2]) < time.time():
+                    owner = '{} {}'.format(token, time.time() + self.LOCK_TIMEOUT)
+                    self.window.setProperty(name, owner)
+
+                    if self.window.getProperty(name) == owner:
+                        break
+
+                time.sleep(0.005)
+
+            try:
+                yield
+            finally:
+                if self.window.getProperty(name) == owner:
+                    self.window.clearProperty(name)
+
+    def _readIndex(self):
+        index = self.window.getProperty(self.namespace)
+        return json.loads(index) if index else None
+
+    def _remove(self, index, name):
+        expires, size, used, spilled = index.pop(name)
+
+        if spilled:
+            if self.fallback is not None:
+                self.fallback.delete(name)
+        else:
+            self.window.clearProperty('{}.{}'.format(self.namespace, name))
+
+    def clear(self):
+        """
+        Removes every value, including those in the fallback.
+        """
+        with self._locked():
+            index = self._readIndex() or {}
+
+            for name in list(index):
+                self._remove(index, name)
+
+            if self.fallback is not None:
+                self.fallback.clear()
+
+            self.window.clearProperty(self.namespace)
+
+    def delete(self, key):
+        """
+        Removes a value.
+
+        :param key: The key of the value.
+        :type key: str
+        """
+        with self._locked():
+            index = self._readIndex()
+            name = self._getName(key)
+
+            if index is None:
+                if self.fallback is not None:
+                    self.fallback.delete(name)
+            elif name in index:
+                self._remove(index, name)
+                self.window.setProperty(self.namespace, json.dumps(index))
+
+    def get(self, key, default=None):
+        """
+        Returns a value that has not expired. Only a value that was moved to the fallback costs a file access, or every
+        value while the index is missing because Kodi was restarted.
+
+        :param key: The key of the value.
+        :type key: str
+        :param default: The value returned when the key is missing or has expired.
+        :type default: Any
+        :return: The value.
+        :rtype: Any
+        """
+        index = self._readIndex()
+        name = self._getName(key)
+        now = time.time()
+
+        if index is None:
+            return default if self.fallback is None else self.fallback.get(name, default)
+
+        if name not in index:
+            return default
+
+        entry = index[name]
+        expires, size, used, spilled = entry
+
+        if expires is not None and expires < now:
+            value = None
+        elif spilled:
+            value = None if self.fallback is None else self.fallback.get(name)
+        else:
+            value = self.window.getProperty('{}.{}'.format(self.namespace, name))
+            value = pickle.loads(base64.b64decode(value)) if value else None
+
+        if value is not None and now - used < self.USE_RESOLUTION:
+            return value
+
+        with self._locked():
+            index = self._readIndex() or {}
+
+            if index.get(name) == entry:
+                if value is None:
+                    self._remove(index, name)
+                else:
+                    index[name][2] = now
+
+                self.window.setProperty(self.namespace, json.dumps(index))
+
+        return default if value is None else value
+
+    def set(self, key, value, ttl=None):
+        """
+        Stores a value.
+
+        :param key: The key of the value.
+        :type key: str
+        :param value: The value, which must be picklable and not None.
+        :type value: Any
+        :param ttl: The number of seconds the value is kept, or None to keep it until it is removed.
+        :type ttl: float | None
+        """
+        with self._locked():
+            index = self._readIndex() or {}
+            name = self._getName(key)
+            now = time.time()
+            data = base64.b64encode(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)).decode('ascii')
+
+            for other in [other for other, entry in index.items() if other == name or entry[0] is not None and entry[0] < now]:
+                self._remove(index, other)
+
+            if len(data) > self.budget:
+                if self.fallback is not None:
+                    self.fallback.set(name, value, ttl)
+                    index[name] = [None if ttl is None else now + ttl, 0, now, True]
+            else:
+                resident = sorted((entry[2], other) for other, entry in index.items() if not entry[3])
+                size = sum(index[other][1] for used, other in resident) + len(data)
+
+                for used, other in resident:
+                    if size <= self.budget:
+                        break
+
+                    expires, otherSize, used, spilled = index[other]
+                    evicted = self.window.getProperty('{}.{}'.format(self.namespace, other))
+                    size -= otherSize
+
+                    if self.fallback is not None and evicted:
+                        self.fallback.set(other, pickle.loads(base64.b64decode(evicted)), None if expires is None else max(expires - now, 0))
+                        self.window.clearProperty('{}.{}'.format(self.namespace, other))
+                        index[other] = [expires, 0, used, True]
+                    else:
+                        self._remove(index, other)
+
+                self.window.setProperty('{}.{}'.format(self.namespace, name), data)
+                index[name] = [None if ttl is None else now + ttl, len(data), now, False]
+
+            self.window.setProperty(self.namespace, json.dumps(index))
+
 
 def getAddonId():
     """
@@ -782,46 +2387,235 @@ def getAddonProfilePath():
     return xbmcvfs.translatePath(Addon.getAddonInfo('profile'))
 
 
-def getLanguage():
+def getLanguage(region=False):
     """
     Get the active language.
 
+    :param region: Whether the region is appended, such as pt-br.
+    :type region: bool
     :return: The active language as a string.
     :rtype: str
     """
-    return xbmc.getLanguage(xbmc.ISO_639_1)
+    return xbmc.getLanguage(xbmc.ISO_639_1, region)
+
+
+def getLocalizedString(id):
+    """
+    Returns a localized string of the add-on from a StringTable of the active language, which is loaded on the first
+    call and again whenever the active language changes, such as in a service that outlives a change of the setting.
+
+    :param id: The id of the string.
+    :type id: int
+    :return: The localized string.
+    :rtype: str
+    """
+    global _strings
+    language = getLanguage(True).lower().replace('-', '_')
+
+    if _strings is None or _strings.language != language:
+        _strings = StringTable(language)
+
+    return _strings.get(id)
 
 
 class ResourceManager(dict):
     """
     A resource manager that provides convenient access to resources at run time.
+
+    Several plugin invocations can hold a resource manager at the same time. Every one of them keeps track of the keys it
+    changed and merges only these into the file when it is saved, under an exclusive lock, so that concurrent updates of
+    different keys are kept. The file is replaced atomically, so readers never wait for the lock. Values that are
+    changed in place, such as a list that is appended to, must be marked with markChanged(), because only assigned and
+    removed keys are tracked.
+
+    Nothing is written until save() is called, or until a with block over the resource manager exits without an
+    exception.
     """
 
+    _changes = None
+
     def __init__(self):
         super(ResourceManager, self).__init__()
-        path = os.path.join(getAddonPath(), 'resources/data/resource.resx')
+        self.path = os.path.join(getAddonPath(), 'resources/data/resource.resx')
+        dict.update(self, self._load())
+        self._changes = {}
+
+    def __delitem__(self, key):
+        super(ResourceManager, self).__delitem__(key)
+        self._track(key, _DELETED)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.save()
+
+    def __setitem__(self, key, value):
+        super(ResourceManager, self).__setitem__(key, value)
+        self._track(key, value)
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as io:
+                return dict(pickle.load(io))
+        except (EnvironmentError, EOFError):
+            return {}
+
+    def _lock(self, io):
+        if fcntl:
+            fcntl.flock(io.fileno(), fcntl.LOCK_EX)
+        elif msvcrt:
+            io.seek(0)
+
+            while True:
+                try:
+                    return msvcrt.locking(io.fileno(), msvcrt.LK_LOCK, 1)
+                except IOError:
+                    pass
+
+    def _track(self, key, value):
+        if self._changes is not None:
+            self._changes[key] = value
+
+    def _unlock(self, io):
+        if fcntl:
+            fcntl.flock(io.fileno(), fcntl.LOCK_UN)
+        elif msvcrt:
+            io.seek(0)
+            msvcrt.locking(io.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def clear(self):
+        for key in self:
+            self._track(key, _DELETED)
+
+        super(ResourceManager, self).clear()
+
+    def pop(self, key, *args):
+        if key in self:
+            self._track(key, _DELETED)
+
+        return super(ResourceManager, self).pop(key, *args)
+
+    def markChanged(self, key):
+        """
+        Marks a value that was changed in place, so that it is saved.
 
-        if os.path.exists(path):
-            with open(path, 'rb') as io:
-                self.update(pickle.load(io))
+        :param key: The key of the value.
+        :type key: str
+        """
+        self._track(key, self[key] if key in self else _DELETED)
+
+    def popitem(self):
+        key, value = super(ResourceManager, self).popitem()
+        self._track(key, _DELETED)
+        return key, value
+
+    def save(self):
+        """
+        Merges the changed keys into the file. Keys changed by other processes since this resource manager was loaded
+        are kept, unless this resource manager changed them too.
+        """
+        if not self._changes:
+            return
+
+        directory = os.path.dirname(self.path)
+
+        try:
+            os.makedirs(directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+
+        with open(self.path + '.lock', 'a+b') as lock:
+            self._lock(lock)
+
+            try:
+                resources = self._load()
+
+                for key, value in self._changes.items():
+                    if value is _DELETED:
+                        resources.pop(key, None)
+                    else:
+                        resources[key] = value
+
+                descriptor, path = tempfile.mkstemp(dir=directory)
+
+                with os.fdopen(descriptor, 'wb') as io:
+                    pickle.dump(resources, io, pickle.HIGHEST_PROTOCOL)
+
+                getattr(os, 'replace', os.rename)(path, self.path)
+            finally:
+                self._unlock(lock)
+
+        dict.clear(self)
+        dict.update(self, resources)
+        self._changes.clear()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
 
-    def __del__(self):
-        path = os.path.join(getAddonPath(), 'resources/data/resource.resx')
-        os.makedirs(os.path.join(getAddonPath(), 'resources/data'), exist_ok=True)
+        return self[key]
 
-        with open(path, 'wb') as io:
-            return pickle.dump(self, io)
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
 
 
 Addon = xbmcaddon.Addon()
 Keyboard = xbmc.Keyboard
 executebuiltin = xbmc.executebuiltin
-getLocalizedString = Addon.getLocalizedString
 getSetting = Addon.getSetting
 parse_qsl = six.moves.urllib_parse.parse_qsl
+quote = six.moves.urllib_parse.quote
 sleep = xbmc.sleep
 translatePath = xbmcvfs.translatePath
+unquote = six.moves.urllib_parse.unquote
 urlencode = six.moves.urllib_parse.urlencode
 urljoin = six.moves.urllib_parse.urljoin
 urlparse = six.moves.urllib_parse.urlparse
 urlunsplit = six.moves.urllib_parse.urlunsplit
+_DELETED = object()
+_DIGITS = re.compile(r'(\d+)')
+_NUMBER = re.compile(r'\s*-?\d+(?:\.\d+)?\s*$')
+_SORT_FIELDS = {
+    'ALBUM': ('album',),
+    'ALBUM_IGNORE_THE': ('album',),
+    'ARTIST': ('artist',),
+    'ARTIST_IGNORE_THE': ('artist',),
+    'BITRATE': ('bitrate',),
+    'COUNTRY': ('country',),
+    'DATE': ('date',),
+    'DATEADDED': ('dateadded',),
+    'DURATION': ('duration',),
+    'EPISODE': ('season', 'episode'),
+    'FILE': ('path',),
+    'FULLPATH': ('path',),
+    'GENRE': ('genre',),
+    'LABEL': ('label',),
+    'LABEL_IGNORE_FOLDERS': ('label',),
+    'LABEL_IGNORE_THE': ('label',),
+    'LASTPLAYED': ('lastplayed',),
+    'LISTENERS': ('listeners',),
+    'MPAA_RATING': ('mpaa',),
+    'PLAYCOUNT': ('playcount',),
+    'PRODUCTIONCODE': ('productioncode',),
+    'SIZE': ('size',),
+    'SONG_RATING': ('rating',),
+    'SONG_USER_RATING': ('userrating',),
+    'STUDIO': ('studio',),
+    'STUDIO_IGNORE_THE': ('studio',),
+    'TITLE': ('title',),
+    'TITLE_IGNORE_THE': ('title',),
+    'TRACKNUM': ('tracknumber',),
+    'VIDEO_RATING': ('rating',),
+    'VIDEO_RUNTIME': ('duration',),
+    'VIDEO_SORT_TITLE': ('sorttitle',),
+    'VIDEO_SORT_TITLE_IGNORE_THE': ('sorttitle',),
+    'VIDEO_TITLE': ('title',),
+    'VIDEO_USER_RATING': ('userrating',),
+    'VIDEO_YEAR': ('year',)
+}
+_capture = threading.local()
+_strings = None
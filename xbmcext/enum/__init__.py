@@ -43,6 +43,10 @@ class _RouteClassAttributeToGetattr(object):
     normal, but access to an attribute through a class will be routed to the
     class's __getattr__ method; this is done by raising AttributeError.
 
+    This is a non-data descriptor, so that a value cached in the instance
+    dictionary (see _cache_attributes) is found without calling it; Enum's
+    __setattr__ and __delattr__ keep such attributes read-only.
+
     """
     def __init__(self, fget=None):
         self.fget = fget
@@ -52,11 +56,22 @@ class _RouteClassAttributeToGetattr(object):
             raise AttributeError()
         return self.fget(instance)
 
-    def __set__(self, instance, value):
-        raise AttributeError("can't set attribute")
 
-    def __delete__(self, instance):
-        raise AttributeError("can't delete attribute")
+_CACHED_ATTRIBUTES = ('name', 'value')
+
+
+def _cache_attributes(member):
+    """Stores the name and value of a member in its instance dictionary.
+
+    Members of int and other builtin subclasses cannot have __slots__, so the
+    instance dictionary takes their place: the attributes are then read like
+    plain attributes instead of through a descriptor call.
+
+    """
+    attributes = getattr(member, '__dict__', None)
+    if attributes is not None:
+        attributes['name'] = member._name_
+        attributes['value'] = member._value_
 
 
 def _is_descriptor(obj):
@@ -249,6 +264,8 @@ class EnumMeta(type):
             if member_name not in base_attributes:
                 setattr(enum_class, member_name, enum_member)
             # now add to _member_map_
+            if enum_member._name_ == member_name:
+                _cache_attributes(enum_member)
             enum_class._member_map_[member_name] = enum_member
             try:
                 # This may fail if value is not hashable. We can't add the value
@@ -345,7 +362,11 @@ class EnumMeta(type):
 
         """
         if names is None:  # simple value lookup
-            return cls.__new__(cls, value)
+            # fast path: an exact hit in the value->member map
+            try:
+                return cls._value2member_map_[value]
+            except (KeyError, TypeError):
+                return cls.__new__(cls, value)
         # otherwise, functional API: we're creating a new Enum type
         return cls._create_(value, names, module=module, type=type, start=start)
 
@@ -757,6 +778,20 @@ def __ne__(self, other):
 temp_enum_dict['__ne__'] = __ne__
 del __ne__
 
+def __setattr__(self, name, value):
+    if name in _CACHED_ATTRIBUTES:
+        raise AttributeError("can't set attribute")
+    super(Enum, self).__setattr__(name, value)
+temp_enum_dict['__setattr__'] = __setattr__
+del __setattr__
+
+def __delattr__(self, name):
+    if name in _CACHED_ATTRIBUTES:
+        raise AttributeError("can't delete attribute")
+    super(Enum, self).__delattr__(name)
+temp_enum_dict['__delattr__'] = __delattr__
+del __delattr__
+
 def __hash__(self):
     return hash(self._name_)
 temp_enum_dict['__hash__'] = __hash__
@@ -0,0 +1,115 @@
+"""
+Headless stand-in for the Kodi xbmc module.
+"""
+
+import json
+import os
+import sys
+import time
+
+import xbmcheadless
+
+DRIVE_NOT_READY = 1
+ENGLISH_NAME = 2
+ISO_639_1 = 0
+ISO_639_2 = 1
+LOGDEBUG = 0
+LOGINFO = 1
+LOGWARNING = 2
+LOGERROR = 3
+LOGFATAL = 4
+LOGNONE = 5
+PLAYLIST_MUSIC = 0
+PLAYLIST_VIDEO = 1
+
+log_levels = {LOGDEBUG: 'DEBUG', LOGINFO: 'INFO', LOGWARNING: 'WARNING', LOGERROR: 'ERROR', LOGFATAL: 'FATAL', LOGNONE: 'NONE'}
+
+
+@xbmcheadless.record('xbmc.executebuiltin')
+def executebuiltin(function, wait=False):
+    pass
+
+
+@xbmcheadless.record('xbmc.executeJSONRPC')
+def executeJSONRPC(jsonrpccommand):
+    if xbmcheadless.jsonrpc is None:
+        request = json.loads(jsonrpccommand)
+
+        if isinstance(request, list):
+            return json.dumps([{'id': item.get('id'), 'jsonrpc': '2.0', 'result': 'OK'} for item in request])
+
+        return json.dumps({'id': request.get('id'), 'jsonrpc': '2.0', 'result': 'OK'})
+
+    return xbmcheadless.jsonrpc(jsonrpccommand)
+
+
+@xbmcheadless.record('xbmc.getCondVisibility')
+def getCondVisibility(condition):
+    return False
+
+
+@xbmcheadless.record('xbmc.getInfoLabel')
+def getInfoLabel(cLine):
+    return ''
+
+
+@xbmcheadless.record('xbmc.getLanguage')
+def getLanguage(format=ENGLISH_NAME, region=False):
+    return xbmcheadless.language if region else xbmcheadless.language.partition('-')[0]
+
+
+@xbmcheadless.record('xbmc.getLocalizedString')
+def getLocalizedString(id):
+    return xbmcheadless.strings.get(id, '')
+
+
+@xbmcheadless.record('xbmc.log')
+def log(msg, level=LOGDEBUG):
+    if os.environ.get('XBMCHEADLESS_LOG'):
+        sys.stderr.write('{} {}\n'.format(log_levels.get(level, level), msg))
+
+
+@xbmcheadless.record('xbmc.sleep')
+def sleep(timemillis):
+    time.sleep(timemillis / 1000.0)
+
+
+@xbmcheadless.record('xbmc.translatePath')
+def translatePath(path):
+    return xbmcheadless.translatePath(path)
+
+
+@xbmcheadless.recorded('Keyboard')
+class Keyboard(object):
+    def __init__(self, line='', heading='', hidden=False):
+        self.confirmed = True
+        self.heading = heading
+        self.hidden = hidden
+        self.text = line
+
+    def doModal(self, autoclose=0):
+        pass
+
+    def getText(self):
+        return self.text
+
+    def isConfirmed(self):
+        return self.confirmed
+
+    def setDefault(self, line=''):
+        self.text = line
+
+    def setHeading(self, heading):
+        self.heading = heading
+
+    def setHiddenInput(self, hidden=False):
+        self.hidden = hidden
+
+
+@xbmcheadless.recorded('Monitor')
+class Monitor(object):
+    def abortRequested(self):
+        return xbmcheadless.abort.is_set()
+
+    def waitForAbort(self, timeout=-1):
+        return xbmcheadless.abort.wait(timeout if timeout >= 0 else None) or False
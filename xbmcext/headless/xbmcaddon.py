@@ -0,0 +1,47 @@
+"""
+Headless stand-in for the Kodi xbmcaddon module. Add-on info, settings and strings come from xbmcheadless.
+"""
+
+import xbmcheadless
+
+
+@xbmcheadless.recorded('Addon')
+class Addon(object):
+    def __init__(self, id=None):
+        self.id = id
+
+    def getAddonInfo(self, id):
+        if id == 'id' and self.id is not None:
+            return self.id
+
+        return xbmcheadless.addon.get(id, '')
+
+    def getLocalizedString(self, id):
+        return xbmcheadless.strings.get(id, '')
+
+    def getSetting(self, id):
+        return xbmcheadless.settings.get(id, '')
+
+    def getSettingBool(self, id):
+        return xbmcheadless.settings.get(id, '') in ('true', True)
+
+    def getSettingInt(self, id):
+        return int(xbmcheadless.settings.get(id) or 0)
+
+    def getSettingString(self, id):
+        return xbmcheadless.settings.get(id, '')
+
+    def openSettings(self):
+        pass
+
+    def setSetting(self, id, value):
+        xbmcheadless.settings[id] = value
+
+    def setSettingBool(self, id, value):
+        xbmcheadless.settings[id] = 'true' if value else 'false'
+
+    def setSettingInt(self, id, value):
+        xbmcheadless.settings[id] = str(value)
+
+    def setSettingString(self, id, value):
+        xbmcheadless.settings[id] = value
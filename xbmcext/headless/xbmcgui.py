@@ -0,0 +1,475 @@
+"""
+Headless stand-in for the Kodi xbmcgui module. Windows keep their properties in xbmcheadless.properties, dialogs return
+the values queued with xbmcheadless.respond() and WindowXMLDialog.doModal() replays the events queued with
+xbmcheadless.script().
+"""
+
+import os
+import xml.etree.ElementTree
+
+import xbmcheadless
+
+ACTION_BACKSPACE = 110
+ACTION_CONTEXT_MENU = 117
+ACTION_FIRST_PAGE = 159
+ACTION_LAST_PAGE = 160
+ACTION_MOUSE_DOUBLE_CLICK = 103
+ACTION_MOUSE_LEFT_CLICK = 100
+ACTION_MOUSE_MOVE = 107
+ACTION_MOUSE_RIGHT_CLICK = 101
+ACTION_MOUSE_WHEEL_DOWN = 105
+ACTION_MOUSE_WHEEL_UP = 104
+ACTION_MOVE_DOWN = 4
+ACTION_MOVE_LEFT = 1
+ACTION_MOVE_RIGHT = 2
+ACTION_MOVE_UP = 3
+ACTION_NAV_BACK = 92
+ACTION_PAGE_DOWN = 6
+ACTION_PAGE_UP = 5
+ACTION_PARENT_DIR = 9
+ACTION_PREVIOUS_MENU = 10
+ACTION_SELECT_ITEM = 7
+ACTION_SHOW_INFO = 11
+ACTION_STOP = 13
+INPUT_ALPHANUM = 0
+INPUT_DATE = 2
+INPUT_IPADDRESS = 4
+INPUT_NUMERIC = 1
+INPUT_PASSWORD = 5
+INPUT_TIME = 3
+NOTIFICATION_ERROR = 'error'
+NOTIFICATION_INFO = 'info'
+NOTIFICATION_WARNING = 'warning'
+
+
+def respond(default):
+    return xbmcheadless.responses.popleft() if xbmcheadless.responses else default
+
+
+class Action(object):
+    def __init__(self, actionId=0, buttonCode=0, amount1=0.0, amount2=0.0):
+        self.actionId = actionId
+        self.amount1 = amount1
+        self.amount2 = amount2
+        self.buttonCode = buttonCode
+
+    def getAmount1(self):
+        return self.amount1
+
+    def getAmount2(self):
+        return self.amount2
+
+    def getButtonCode(self):
+        return self.buttonCode
+
+    def getId(self):
+        return self.actionId
+
+
+@xbmcheadless.recorded('InfoTagVideo')
+class InfoTagVideo(object):
+    def __init__(self):
+        self.info = {}
+
+    def __getattr__(self, name):
+        if name.startswith('set'):
+            key = name[3:4].lower() + name[4:]
+            return lambda value, *args: self.info.__setitem__(key, value)
+
+        if name.startswith('get'):
+            key = name[3:4].lower() + name[4:]
+            return lambda: self.info.get(key)
+
+        raise AttributeError(name)
+
+
+@xbmcheadless.recorded('ListItem')
+class ListItem(object):
+    def __new__(cls, label='', label2='', path='', offscreen=False):
+        self = super(ListItem, cls).__new__(cls)
+        self.art = {}
+        self.contextMenuItems = []
+        self.folder = False
+        self.info = {}
+        self.label = label
+        self.label2 = label2
+        self.path = path
+        self.properties = {}
+        self.videoInfoTag = None
+        return self
+
+    def __init__(self, label='', label2='', path='', offscreen=False):
+        pass
+
+    def addContextMenuItems(self, items, replaceItems=False):
+        if replaceItems:
+            del self.contextMenuItems[:]
+
+        self.contextMenuItems.extend(items)
+
+    def getArt(self, key):
+        return self.art.get(key, '')
+
+    def getLabel(self):
+        return self.label
+
+    def getLabel2(self):
+        return self.label2
+
+    def getPath(self):
+        return self.path
+
+    def getProperty(self, key):
+        return self.properties.get(key.lower(), '')
+
+    def getVideoInfoTag(self):
+        if self.videoInfoTag is None:
+            self.videoInfoTag = InfoTagVideo()
+
+        return self.videoInfoTag
+
+    def isFolder(self):
+        return self.folder
+
+    def setArt(self, dictionary):
+        self.art.update(dictionary)
+
+    def setInfo(self, type, infoLabels):
+        self.info.setdefault(type, {}).update(infoLabels)
+
+    def setIsFolder(self, isFolder):
+        self.folder = isFolder
+
+    def setLabel(self, label):
+        self.label = label
+
+    def setLabel2(self, label):
+        self.label2 = label
+
+    def setPath(self, path):
+        self.path = path
+
+    def setProperties(self, dictionary):
+        for key, value in dictionary.items():
+            self.setProperty(key, value)
+
+    def setProperty(self, key, value):
+        self.properties[key.lower()] = value
+
+
+@xbmcheadless.recorded('Dialog')
+class Dialog(object):
+    def browse(self, type, heading, shares, mask='', useThumbs=False, treatAsFolder=False, defaultt='', enableMultiple=False):
+        return respond(defaultt)
+
+    def contextmenu(self, list):
+        return respond(-1)
+
+    def input(self, heading, defaultt='', type=INPUT_ALPHANUM, option=0, autoclose=0):
+        return respond('')
+
+    def multiselect(self, heading, options, autoclose=0, preselect=None, useDetails=False):
+        return respond(None)
+
+    def notification(self, heading, message, icon=NOTIFICATION_INFO, time=5000, sound=True):
+        pass
+
+    def numeric(self, type, heading, defaultt='', bHiddenInput=False):
+        return respond(defaultt)
+
+    def ok(self, heading, message):
+        return respond(True)
+
+    def select(self, heading, list, autoclose=0, preselect=-1, useDetails=False):
+        return respond(-1)
+
+    def textviewer(self, heading, text, usemono=False):
+        pass
+
+    def yesno(self, heading, message, nolabel='', yeslabel='', autoclose=0, defaultbutton=0):
+        return respond(False)
+
+
+@xbmcheadless.recorded('DialogProgress')
+class DialogProgress(object):
+    def __init__(self):
+        self.percent = 0
+
+    def close(self):
+        pass
+
+    def create(self, heading, message=''):
+        pass
+
+    def iscanceled(self):
+        return False
+
+    def update(self, percent, message=''):
+        self.percent = percent
+
+
+@xbmcheadless.recorded('DialogProgressBG')
+class DialogProgressBG(object):
+    def __init__(self):
+        self.percent = 0
+
+    def close(self):
+        pass
+
+    def create(self, heading, message=''):
+        pass
+
+    def isFinished(self):
+        return False
+
+    def update(self, percent=0, heading='', message=''):
+        self.percent = percent
+
+
+@xbmcheadless.recorded('Control')
+class Control(object):
+    def __init__(self, controlId=0):
+        self.controlId = controlId
+        self.enabled = True
+        self.label = ''
+        self.visible = True
+
+    def getId(self):
+        return self.controlId
+
+    def getLabel(self):
+        return self.label
+
+    def isVisible(self):
+        return self.visible
+
+    def setEnabled(self, enabled):
+        self.enabled = enabled
+
+    def setLabel(self, label='', *args, **kwargs):
+        self.label = label
+
+    def setVisible(self, visible):
+        self.visible = visible
+
+
+@xbmcheadless.recorded('ControlButton')
+class ControlButton(Control):
+    pass
+
+
+@xbmcheadless.recorded('ControlEdit')
+class ControlEdit(Control):
+    def __init__(self, controlId=0):
+        super(ControlEdit, self).__init__(controlId)
+        self.text = ''
+
+    def getText(self):
+        return self.text
+
+    def setText(self, text):
+        self.text = text
+
+
+@xbmcheadless.recorded('ControlGroup')
+class ControlGroup(Control):
+    pass
+
+
+@xbmcheadless.recorded('ControlImage')
+class ControlImage(Control):
+    def setImage(self, filename, useCache=True):
+        self.label = filename
+
+
+@xbmcheadless.recorded('ControlLabel')
+class ControlLabel(Control):
+    pass
+
+
+@xbmcheadless.recorded('ControlList')
+class ControlList(Control):
+    def __init__(self, controlId=0):
+        super(ControlList, self).__init__(controlId)
+        self.items = []
+        self.position = -1
+
+    def addItem(self, item, sendMessage=True):
+        self.items.append(item if isinstance(item, ListItem) else ListItem(item))
+
+        if self.position == -1:
+            self.position = 0
+
+    def addItems(self, items):
+        self.items.extend(item if isinstance(item, ListItem) else ListItem(item) for item in items)
+
+        if self.position == -1 and self.items:
+            self.position = 0
+
+    def getListItem(self, index):
+        if not 0 <= index < len(self.items):
+            raise RuntimeError('Index out of range')
+
+        return self.items[index]
+
+    def getSelectedItem(self):
+        return self.items[self.position] if self.items else None
+
+    def getSelectedPosition(self):
+        return self.position
+
+    def removeItem(self, index):
+        del self.items[index]
+        self.position = min(self.position, len(self.items) - 1)
+
+    def reset(self):
+        del self.items[:]
+        self.position = -1
+
+    def selectItem(self, item):
+        self.position = item
+
+    def size(self):
+        return len(self.items)
+
+
+@xbmcheadless.recorded('ControlRadioButton')
+class ControlRadioButton(Control):
+    def __init__(self, controlId=0):
+        super(ControlRadioButton, self).__init__(controlId)
+        self.selected = False
+
+    def isSelected(self):
+        return self.selected
+
+    def setSelected(self, selected):
+        self.selected = selected
+
+
+controlTypes = {
+    'button': ControlButton,
+    'edit': ControlEdit,
+    'fixedlist': ControlList,
+    'group': ControlGroup,
+    'grouplist': ControlGroup,
+    'image': ControlImage,
+    'label': ControlLabel,
+    'list': ControlList,
+    'panel': ControlList,
+    'radiobutton': ControlRadioButton,
+    'wraplist': ControlList
+}
+
+
+@xbmcheadless.recorded('Window')
+class Window(object):
+    def __init__(self, existingWindowId=-1):
+        self.closed = False
+        self.controls = {}
+        self.controlTypes = None
+        self.focusId = 0
+        self.windowId = existingWindowId
+
+    def clearProperties(self):
+        xbmcheadless.properties[self.windowId].clear()
+
+    def clearProperty(self, key):
+        xbmcheadless.properties[self.windowId].pop(key.lower(), None)
+
+    def close(self):
+        self.closed = True
+
+    def doModal(self):
+        self.closed = False
+        self.show()
+
+        while not self.closed and xbmcheadless.events:
+            event = xbmcheadless.events.popleft()
+
+            if callable(event):
+                event(self)
+            elif event[0] == 'action':
+                self.onAction(Action(event[1]))
+            elif event[0] == 'click':
+                self.onClick(event[1])
+            elif event[0] == 'focus':
+                self.focusId = event[1]
+                self.onFocus(event[1])
+            elif event[0] == 'select':
+                self.getControl(event[1]).selectItem(event[2])
+            elif event[0] == 'text':
+                self.getControl(event[1]).setText(event[2])
+            else:
+                raise ValueError('Unknown event "{}".'.format(event[0]))
+
+    def getControl(self, iControlId):
+        if iControlId not in self.controls:
+            if self.controlTypes is None:
+                controlType = ControlList
+            elif iControlId in self.controlTypes:
+                controlType = controlTypes.get(self.controlTypes[iControlId], Control)
+            else:
+                raise RuntimeError('Non-Existent Control {}'.format(iControlId))
+
+            self.controls[iControlId] = controlType(iControlId)
+
+        return self.controls[iControlId]
+
+    def getFocusId(self):
+        return self.focusId
+
+    def getProperty(self, key):
+        return xbmcheadless.properties[self.windowId].get(key.lower(), '')
+
+    def onAction(self, action):
+        if action.getId() in (ACTION_PREVIOUS_MENU, ACTION_NAV_BACK):
+            self.close()
+
+    def onClick(self, controlId):
+        pass
+
+    def onFocus(self, controlId):
+        pass
+
+    def onInit(self):
+        pass
+
+    def setFocusId(self, iControlId):
+        self.focusId = iControlId
+
+    def setProperty(self, key, value):
+        xbmcheadless.properties[self.windowId][key.lower()] = value
+
+    def show(self):
+        self.onInit()
+
+
+@xbmcheadless.recorded('WindowDialog')
+class WindowDialog(Window):
+    pass
+
+
+@xbmcheadless.recorded('WindowXML')
+class WindowXML(Window):
+    def __init__(self, xmlFilename, scriptPath, defaultSkin='Default', defaultRes='720p', isMedia=False):
+        super(WindowXML, self).__init__()
+        path = os.path.join(scriptPath, 'resources', 'skins', defaultSkin, defaultRes, xmlFilename)
+
+        if os.path.exists(path):
+            self.controlTypes = {int(control.get('id')): control.get('type')
+                                 for control in xml.etree.ElementTree.parse(path).iter('control') if control.get('id')}
+
+
+@xbmcheadless.recorded('WindowXMLDialog')
+class WindowXMLDialog(WindowXML):
+    pass
+
+
+@xbmcheadless.record('xbmcgui.getCurrentWindowDialogId')
+def getCurrentWindowDialogId():
+    return 9999
+
+
+@xbmcheadless.record('xbmcgui.getCurrentWindowId')
+def getCurrentWindowId():
+    return 10000
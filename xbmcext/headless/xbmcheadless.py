@@ -0,0 +1,219 @@
+"""
+State of the headless Kodi stand-in.
+
+The xbmc, xbmcaddon, xbmcgui, xbmcplugin and xbmcvfs modules next to this one implement the parts of the Kodi API that
+add-ons built on xbmcext use. Put this directory in front of sys.path before importing xbmcext, then use this module to
+script dialogs, inject latency and inspect the recorded calls.
+
+    sys.path.insert(0, os.path.join(os.path.dirname(xbmcext_path), 'xbmcext', 'headless'))
+    import xbmcheadless
+    import xbmcext
+
+Set xbmcheadless.abort to make xbmc.Monitor report an abort request, set xbmcheadless.jsonrpc to a function that
+answers xbmc.executeJSONRPC requests and set xbmcheadless.recording to False to stop recording calls.
+The special paths resolve below xbmcheadless.root, a temporary directory that is removed when the interpreter exits.
+"""
+
+import atexit
+import collections
+import functools
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+Call = collections.namedtuple('Call', ('name', 'args', 'kwargs'))
+
+addon = {}
+calls = []
+directories = {}
+events = collections.deque()
+latency = {}
+properties = collections.defaultdict(dict)
+responses = collections.deque()
+settings = {}
+strings = {}
+abort = threading.Event()
+jsonrpc = None
+language = 'en'
+recording = True
+root = tempfile.mkdtemp(prefix='xbmcheadless-')
+special = (
+    ('special://home/', ''),
+    ('special://masterprofile/', 'userdata'),
+    ('special://profile/', 'userdata'),
+    ('special://temp/', 'temp'),
+    ('special://userdata/', 'userdata'),
+    ('special://xbmc/', 'xbmc')
+)
+
+
+def count(name):
+    """
+    Returns the number of recorded calls of a Kodi API function.
+
+    :param name: The qualified name of the function (e.g. ControlList.addItems or xbmcplugin.endOfDirectory).
+    :type name: str
+    :return: The number of calls.
+    :rtype: int
+    """
+    return sum(1 for call in calls if call.name == name)
+
+
+def directory(handle):
+    """
+    Returns the directory that a plugin built for a handle.
+
+    :param handle: The handle the plugin was started with.
+    :type handle: int
+    :return: The items, sort methods, content, resolved item and end of directory state.
+    :rtype: dict
+    """
+    return directories.setdefault(handle, {'content': None, 'ended': False, 'items': [], 'resolved': None, 'sortMethods': []})
+
+
+def record(name):
+    """
+    Returns a decorator that records the calls of a Kodi API function and delays them by the injected latency.
+
+    :param name: The qualified name of the function.
+    :type name: str
+    :return: A decorator to the function.
+    :rtype: typing.Callable
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if recording:
+                calls.append(Call(name, args, kwargs))
+
+            delay = latency.get(name, latency.get('*', 0))
+
+            if delay:
+                time.sleep(delay)
+
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def recorded(prefix):
+    """
+    Returns a class decorator that records the calls of every public method of a Kodi API class.
+
+    :param prefix: The class name used to qualify the method names.
+    :type prefix: str
+    :return: A decorator to the class.
+    :rtype: typing.Callable
+    """
+
+    def decorator(cls):
+        for name, value in list(vars(cls).items()):
+            if not name.startswith('_') and callable(value):
+                setattr(cls, name, record('{}.{}'.format(prefix, name))(value))
+
+        return cls
+
+    return decorator
+
+
+def reset(addonId='plugin.video.example', addonPath=None):
+    """
+    Clears the recorded calls, the scripted events, the injected latency and all Kodi state, including the files below
+    special://profile and special://temp.
+
+    :param addonId: The id of the add-on returned by xbmcaddon.Addon().
+    :type addonId: str
+    :param addonPath: The directory of the add-on.
+    :type addonPath: str | None
+    """
+    global jsonrpc, language, recording
+    del calls[:]
+    directories.clear()
+    events.clear()
+    latency.clear()
+    properties.clear()
+    responses.clear()
+    settings.clear()
+    strings.clear()
+    abort.clear()
+    jsonrpc = None
+    language = 'en'
+    recording = True
+    shutil.rmtree(os.path.join(root, 'temp'), ignore_errors=True)
+    shutil.rmtree(os.path.join(root, 'userdata'), ignore_errors=True)
+    addon.clear()
+    addon.update({
+        'id': addonId,
+        'name': addonId,
+        'path': os.path.join(root, 'addons', addonId) if addonPath is None else addonPath,
+        'profile': 'special://profile/addon_data/{}/'.format(addonId),
+        'version': '1.0.0'
+    })
+
+
+def respond(*values):
+    """
+    Queues the values that the next xbmcgui.Dialog calls return, in order. Dialogs without a queued value return their
+    cancelled value.
+
+    :param values: The return values.
+    :type values: Any
+    """
+    responses.extend(values)
+
+
+def script(*scriptedEvents):
+    """
+    Queues events for the next WindowXMLDialog.doModal() to replay after onInit(). Events are tuples:
+
+    - ('action', actionId) calls onAction with the action.
+    - ('click', controlId) calls onClick.
+    - ('focus', controlId) moves the focus and calls onFocus.
+    - ('select', controlId, position) selects a list item without a callback.
+    - ('text', controlId, text) sets the text of an edit control without a callback.
+    - A callable is called with the window.
+
+    doModal() returns when the window closes or when the events run out.
+
+    :param scriptedEvents: The events.
+    :type scriptedEvents: tuple | typing.Callable
+    """
+    events.extend(scriptedEvents)
+
+
+def setLatency(name, seconds):
+    """
+    Delays every call of a Kodi API function.
+
+    :param name: The qualified name of the function, or * for every function without its own latency.
+    :type name: str
+    :param seconds: The delay in seconds.
+    :type seconds: float
+    """
+    latency[name] = seconds
+
+
+def translatePath(path):
+    """
+    Resolves a special path below root. xbmc.translatePath and xbmcvfs.translatePath both resolve through this
+    function, so that neither depends on the other.
+
+    :param path: The path, such as special://profile/addon_data/plugin.video.example/.
+    :type path: str
+    :return: The path on disk, or the path itself when it is not a special path.
+    :rtype: str
+    """
+    for prefix, directory in special:
+        if path.startswith(prefix):
+            return os.path.join(root, directory, path[len(prefix):])
+
+    return path
+
+
+reset()
+atexit.register(shutil.rmtree, root, True)
@@ -0,0 +1,103 @@
+"""
+Headless stand-in for the Kodi xbmcplugin module. Directories are kept in xbmcheadless.directories by handle.
+"""
+
+import xbmcheadless
+
+SORT_METHOD_ALBUM = 14
+SORT_METHOD_ALBUM_IGNORE_THE = 15
+SORT_METHOD_ARTIST = 11
+SORT_METHOD_ARTIST_IGNORE_THE = 13
+SORT_METHOD_BITRATE = 43
+SORT_METHOD_CHANNEL = 41
+SORT_METHOD_COUNTRY = 17
+SORT_METHOD_DATE = 3
+SORT_METHOD_DATEADDED = 21
+SORT_METHOD_DATE_TAKEN = 44
+SORT_METHOD_DRIVE_TYPE = 6
+SORT_METHOD_DURATION = 8
+SORT_METHOD_EPISODE = 24
+SORT_METHOD_FILE = 5
+SORT_METHOD_FULLPATH = 35
+SORT_METHOD_GENRE = 16
+SORT_METHOD_LABEL = 1
+SORT_METHOD_LABEL_IGNORE_FOLDERS = 36
+SORT_METHOD_LABEL_IGNORE_THE = 2
+SORT_METHOD_LASTPLAYED = 37
+SORT_METHOD_LISTENERS = 39
+SORT_METHOD_MPAA_RATING = 31
+SORT_METHOD_NONE = 0
+SORT_METHOD_PLAYCOUNT = 38
+SORT_METHOD_PLAYLIST_ORDER = 23
+SORT_METHOD_PRODUCTIONCODE = 28
+SORT_METHOD_PROGRAM_COUNT = 22
+SORT_METHOD_SIZE = 4
+SORT_METHOD_SONG_RATING = 29
+SORT_METHOD_SONG_USER_RATING = 30
+SORT_METHOD_STUDIO = 33
+SORT_METHOD_STUDIO_IGNORE_THE = 34
+SORT_METHOD_TITLE = 9
+SORT_METHOD_TITLE_IGNORE_THE = 10
+SORT_METHOD_TRACKNUM = 7
+SORT_METHOD_UNSORTED = 40
+SORT_METHOD_VIDEO_ORIGINAL_TITLE = 49
+SORT_METHOD_VIDEO_ORIGINAL_TITLE_IGNORE_THE = 50
+SORT_METHOD_VIDEO_RATING = 19
+SORT_METHOD_VIDEO_RUNTIME = 32
+SORT_METHOD_VIDEO_SORT_TITLE = 26
+SORT_METHOD_VIDEO_SORT_TITLE_IGNORE_THE = 27
+SORT_METHOD_VIDEO_TITLE = 25
+SORT_METHOD_VIDEO_USER_RATING = 20
+SORT_METHOD_VIDEO_YEAR = 18
+
+
+@xbmcheadless.record('xbmcplugin.addDirectoryItem')
+def addDirectoryItem(handle, url, listitem, isFolder=False, totalItems=0):
+    xbmcheadless.directory(handle)['items'].append((url, listitem, isFolder))
+    return True
+
+
+@xbmcheadless.record('xbmcplugin.addDirectoryItems')
+def addDirectoryItems(handle, items, totalItems=0):
+    xbmcheadless.directory(handle)['items'].extend(tuple(item) for item in items)
+    return True
+
+
+@xbmcheadless.record('xbmcplugin.addSortMethod')
+def addSortMethod(handle, sortMethod, labelMask='', label2Mask=''):
+    xbmcheadless.directory(handle)['sortMethods'].append(sortMethod)
+
+
+@xbmcheadless.record('xbmcplugin.endOfDirectory')
+def endOfDirectory(handle, succeeded=True, updateListing=False, cacheToDisc=True):
+    xbmcheadless.directory(handle)['ended'] = succeeded
+
+
+@xbmcheadless.record('xbmcplugin.getSetting')
+def getSetting(handle, id):
+    return xbmcheadless.settings.get(id, '')
+
+
+@xbmcheadless.record('xbmcplugin.setContent')
+def setContent(handle, content):
+    xbmcheadless.directory(handle)['content'] = content
+
+
+@xbmcheadless.record('xbmcplugin.setPluginCategory')
+def setPluginCategory(handle, category):
+    xbmcheadless.directory(handle)['category'] = category
+
+
+@xbmcheadless.record('xbmcplugin.setProperty')
+def setProperty(handle, key, value):
+    xbmcheadless.directory(handle).setdefault('properties', {})[key] = value
+
+
+@xbmcheadless.record('xbmcplugin.setResolvedUrl')
+def setResolvedUrl(handle, succeeded, listitem):
+    xbmcheadless.directory(handle)['resolved'] = listitem if succeeded else None
+
+
+@xbmcheadless.record('xbmcplugin.setSetting')
+def setSetting(handle, id, value):
+    xbmcheadless.settings[id] = value
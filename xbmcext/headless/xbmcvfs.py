@@ -0,0 +1,67 @@
+"""
+Headless stand-in for the Kodi xbmcvfs module. Special paths resolve below xbmcheadless.root.
+"""
+
+import os
+import shutil
+
+import xbmcheadless
+
+
+@xbmcheadless.record('xbmcvfs.copy')
+def copy(strSource, strDestination):
+    shutil.copyfile(translatePath(strSource), translatePath(strDestination))
+    return True
+
+
+@xbmcheadless.record('xbmcvfs.delete')
+def delete(file):
+    try:
+        os.remove(translatePath(file))
+        return True
+    except OSError:
+        return False
+
+
+@xbmcheadless.record('xbmcvfs.exists')
+def exists(path):
+    return os.path.exists(translatePath(path))
+
+
+@xbmcheadless.record('xbmcvfs.listdir')
+def listdir(path):
+    path = translatePath(path)
+    names = os.listdir(path)
+    return [name for name in names if os.path.isdir(os.path.join(path, name))], [name for name in names if os.path.isfile(os.path.join(path, name))]
+
+
+@xbmcheadless.record('xbmcvfs.mkdir')
+def mkdir(path):
+    try:
+        os.mkdir(translatePath(path))
+        return True
+    except OSError:
+        return False
+
+
+@xbmcheadless.record('xbmcvfs.mkdirs')
+def mkdirs(path):
+    try:
+        os.makedirs(translatePath(path))
+        return True
+    except OSError:
+        return False
+
+
+@xbmcheadless.record('xbmcvfs.rmdir')
+def rmdir(path, force=False):
+    try:
+        shutil.rmtree(translatePath(path)) if force else os.rmdir(translatePath(path))
+        return True
+    except OSError:
+        return False
+
+
+@xbmcheadless.record('xbmcvfs.translatePath')
+def translatePath(path):
+    return xbmcheadless.translatePath(path)
@@ -0,0 +1,528 @@
+"""
+An HTTP session with pooled keep-alive connections and an on-disk response cache that outlives the interpreter Kodi
+starts for every navigation.
+
+    session = Session(staleWhileRevalidate=60)
+    response = session.get('https://api.example.com/titles/tt5180504')
+    title = response.json()
+
+GET responses are cached in the add-on profile, or in any cache with the API of xbmcext.DiskCache, and honour
+Cache-Control (max-age, no-cache, no-store, stale-while-revalidate), Expires, Age, ETag, Last-Modified and Vary. A
+response is only stored when it has a freshness lifetime or a validator. A stale response is revalidated with If-None-Match or If-Modified-Since, so an unchanged
+resource costs a 304 instead of a full download.
+
+fanOut runs a batch of fetches on a bounded pool of threads, with a cap per host and a deadline that also ends when Kodi
+asks the add-on to abort:
+
+    responses = session.getAll([getSeasonUrl(number) for number in range(1, 11)], workers=8, perHost=4, timeout=10)
+"""
+
+import collections
+import email.utils
+import json
+import os
+import socket
+import threading
+import time
+import zlib
+
+import six
+import xbmc
+
+from xbmcext import DiskCache, Log, getAddonProfilePath
+
+http_client = six.moves.http_client
+urljoin = six.moves.urllib_parse.urljoin
+urlsplit = six.moves.urllib_parse.urlsplit
+
+
+class DeadlineException(Exception):
+    """
+    Throws an exception when a job could not finish before the deadline or before Kodi asked the add-on to abort.
+    """
+
+
+def fanOut(jobs, workers=8, perHost=4, timeout=None):
+    """
+    Runs jobs on a bounded pool of threads, with at most perHost jobs running for the same host at a time.
+
+    :param jobs: The (url, function) tuples. The function is called without arguments and the host of the URL counts
+        against perHost.
+    :type jobs: list[tuple[str, typing.Callable]]
+    :param workers: The number of threads.
+    :type workers: int
+    :param perHost: The number of jobs that run for the same host at a time.
+    :type perHost: int
+    :param timeout: The number of seconds after which the jobs that have not finished are given up.
+    :type timeout: float | None
+    :return: The return value of every function, or the exception it raised, in the order of the jobs. Jobs that were
+        given up on because of the deadline or an abort request result in a DeadlineException.
+    :rtype: list
+    :raises ValueError: When workers or perHost is less than 1.
+    """
+    if workers < 1 or perHost < 1:
+        raise ValueError('fanOut needs at least one worker and one job per host, not {} and {}.'.format(workers, perHost))
+
+    jobs = list(jobs)
+    hosts = [urlsplit(url).netloc for url, function in jobs]
+    pending = collections.deque(range(len(jobs)))
+    running = collections.defaultdict(int)
+    results = [DeadlineException] * len(jobs)
+    state = {'remaining': len(jobs), 'stopped': False}
+    condition = threading.Condition()
+
+    def work():
+        while True:
+            with condition:
+                index = None
+
+                while index is None:
+                    if state['stopped'] or not pending:
+                        return
+
+                    index = next((index for index in pending if running[hosts[index]] < perHost), None)
+
+                    if index is None:
+                        condition.wait()
+
+                pending.remove(index)
+                running[hosts[index]] += 1
+
+            try:
+                result = jobs[index][1]()
+            except Exception as e:
+                result = e
+
+            with condition:
+                running[hosts[index]] -= 1
+
+                if not state['stopped']:
+                    results[index] = result
+                    state['remaining'] -= 1
+
+                condition.notify_all()
+
+    for count in range(min(workers, len(jobs))):
+        thread = threading.Thread(target=work)
+        thread.daemon = True
+        thread.start()
+
+    deadline = None if timeout is None else time.time() + timeout
+    monitor = xbmc.Monitor()
+
+    with condition:
+        while state['remaining']:
+            if monitor.abortRequested() or deadline is not None and time.time() >= deadline:
+                state['stopped'] = True
+                condition.notify_all()
+                break
+
+            condition.wait(0.1 if deadline is None else max(min(deadline - time.time(), 0.1), 0))
+
+        for index, result in enumerate(results):
+            if result is DeadlineException:
+                results[index] = DeadlineException('"{}" did not finish before the deadline.'.format(jobs[index][0]))
+
+    return results
+
+
+def parseCacheControl(value):
+    """
+    Parses a Cache-Control header.
+
+    :param value: The value of the header.
+    :type value: str | None
+    :return: The directives, mapped to their value or True.
+    :rtype: dict[str, str | bool]
+    """
+    directives = {}
+
+    for directive in (value or '').split(','):
+        name, _, argument = directive.strip().partition('=')
+
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else True
+
+    return directives
+
+
+def parseDate(value):
+    """
+    Parses an HTTP date.
+
+    :param value: The date, as in the Date, Expires and Last-Modified headers.
+    :type value: str | None
+    :return: The date as a timestamp, or None if it is missing or invalid.
+    :rtype: float | None
+    """
+    date = email.utils.parsedate_tz(value) if value else None
+    return email.utils.mktime_tz(date) if date else None
+
+
+class Response(object):
+    def __init__(self, url, status, reason, headers, content, stored=None, cached=False, stale=False):
+        """
+        The response to an HTTP request.
+
+        :param url: The URL that was requested.
+        :type url: str
+        :param status: The status code.
+        :type status: int
+        :param reason: The reason phrase.
+        :type reason: str
+        :param headers: The headers, by lower-case name.
+        :type headers: dict[str, str]
+        :param content: The decoded body.
+        :type content: bytes
+        :param stored: When the response was received or last revalidated.
+        :type stored: float | None
+        :param cached: Whether the response was served from the cache without a request.
+        :type cached: bool
+        :param stale: Whether the response was served stale while it is revalidated in the background.
+        :type stale: bool
+        """
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.stored = time.time() if stored is None else stored
+        self.cached = cached
+        self.stale = stale
+
+    def getAge(self):
+        """
+        Returns the age of the response.
+
+        :return: The number of seconds since the origin server generated the response.
+        :rtype: float
+        """
+        age = self.headers.get('age', '0')
+        return max(time.time() - self.stored, 0) + (int(age) if age.isdigit() else 0)
+
+    def getFreshness(self):
+        """
+        Returns the freshness lifetime of the response. Without max-age or Expires, a response with Last-Modified stays
+        fresh for a tenth of its age when it was received, up to a day.
+
+        :return: The number of seconds the response stays fresh.
+        :rtype: float
+        """
+        directives = parseCacheControl(self.headers.get('cache-control'))
+
+        if 'no-cache' in directives:
+            return 0
+        elif 'max-age' in directives:
+            return int(directives['max-age']) if str(directives['max-age']).isdigit() else 0
+
+        date = parseDate(self.headers.get('date')) or self.stored
+
+        if 'expires' in self.headers:
+            expires = parseDate(self.headers['expires'])
+            return max(expires - date, 0) if expires else 0
+
+        lastModified = parseDate(self.headers.get('last-modified'))
+        return min(max(date - lastModified, 0) / 10.0, 86400) if lastModified and self.status == 200 else 0
+
+    def json(self):
+        """
+        Decodes the body as JSON.
+
+        :return: The decoded value.
+        :rtype: Any
+        """
+        return json.loads(self.text())
+
+    def text(self, encoding=None):
+        """
+        Decodes the body.
+
+        :param encoding: The encoding. Defaults to the charset of the Content-Type header, or UTF-8.
+        :type encoding: str | None
+        :return: The body.
+        :rtype: str
+        """
+        if encoding is None:
+            encoding = 'utf-8'
+
+            for parameter in self.headers.get('content-type', '').split(';')[1:]:
+                name, _, value = parameter.strip().partition('=')
+
+                if name.lower() == 'charset' and value:
+                    encoding = value.strip('"')
+
+        return self.content.decode(encoding, 'replace')
+
+
+class Session(object):
+    CACHEABLE = (200, 203, 301, 308, 404, 410)
+    RETRYABLE = ('GET', 'HEAD', 'OPTIONS')
+    MAX_REDIRECTS = 5
+    REDIRECTS = (301, 302, 303, 307, 308)
+
+    def __init__(self, headers=None, timeout=10, cache=True, staleWhileRevalidate=0, path=None):
+        """
+        An HTTP session that keeps its connections alive and caches GET responses on disk.
+
+        :param headers: The headers sent with every request.
+        :type headers: dict[str, str] | None
+        :param timeout: The number of seconds to wait for a connection or a response.
+        :type timeout: float
+        :param cache: Whether GET responses are cached, or the cache to keep them in, such as a WindowCache that falls
+            back to a DiskCache. Defaults to a DiskCache.
+        :type cache: bool | xbmcext.DiskCache | xbmcext.WindowCache
+        :param staleWhileRevalidate: The number of seconds after it turns stale that a cached response is still served
+            while it is revalidated in the background, unless the response sets its own stale-while-revalidate.
+        :type staleWhileRevalidate: float
+        :param path: The directory of the default cache. Defaults to the http directory of the add-on profile.
+        :type path: str | None
+        """
+        self.headers = {'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'}
+        self.headers.update(headers or {})
+        self.timeout = timeout
+        self.staleWhileRevalidate = staleWhileRevalidate
+
+        if cache is True:
+            self.cache = DiskCache(os.path.join(getAddonProfilePath(), 'http') if path is None else path)
+        else:
+            self.cache = cache or None
+
+        self.connections = {}
+        self.lock = threading.Lock()
+        self.revalidations = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _acquire(self, scheme, netloc):
+        with self.lock:
+            idle = self.connections.get((scheme, netloc))
+
+            if idle:
+                return idle.pop(), True
+
+        if scheme == 'https':
+            return http_client.HTTPSConnection(netloc, timeout=self.timeout), False
+        else:
+            return http_client.HTTPConnection(netloc, timeout=self.timeout), False
+
+    def _fetch(self, url, headers, cached):
+        if cached is not None:
+            headers = dict(headers or {})
+
+            if 'etag' in cached.headers:
+                headers['If-None-Match'] = cached.headers['etag']
+
+            if 'last-modified' in cached.headers:
+                headers['If-Modified-Since'] = cached.headers['last-modified']
+
+        response = self.request('GET', url, headers=headers)
+
+        if response.status == 304 and cached is not None:
+            cached.headers.update((name, value) for name, value in response.headers.items() if name not in ('content-encoding', 'content-length', 'transfer-encoding'))
+            cached.stored = response.stored
+            self._store(cached, headers)
+            return Response(cached.url, cached.status, cached.reason, cached.headers, cached.content, cached.stored)
+
+        if self._isCacheable(response):
+            self._store(response, headers)
+        elif cached is not None:
+            self._remove(url, headers)
+
+        return response
+
+    def _getKey(self, url, headers, names):
+        merged = dict((name.lower(), value) for name, value in self.headers.items())
+        merged.update((name.lower(), value) for name, value in (headers or {}).items())
+        return json.dumps([url] + [merged.get(name) for name in names])
+
+    def _isCacheable(self, response):
+        if response.status not in self.CACHEABLE or 'no-store' in parseCacheControl(response.headers.get('cache-control')):
+            return False
+
+        if '*' in [name.strip() for name in response.headers.get('vary', '').split(',')]:
+            return False
+
+        return response.getFreshness() > 0 or 'etag' in response.headers or 'last-modified' in response.headers
+
+    def _load(self, url, headers):
+        fields = self.cache.get(url)
+
+        if fields is not None and 'vary' in fields:
+            fields = self.cache.get(self._getKey(url, headers, fields['vary']))
+
+        return None if fields is None else Response(**fields)
+
+    def _release(self, scheme, netloc, connection):
+        with self.lock:
+            self.connections.setdefault((scheme, netloc), []).append(connection)
+
+    def _remove(self, url, headers):
+        fields = self.cache.get(url)
+
+        if fields is not None and 'vary' in fields:
+            self.cache.delete(self._getKey(url, headers, fields['vary']))
+        else:
+            self.cache.delete(url)
+
+    def _revalidate(self, key, url, headers, cached):
+        try:
+            self._fetch(url, headers, cached)
+        except Exception as e:
+            Log.debug('[script.module.xbmcext] Revalidating "{}" failed: {}'.format(url, e))
+        finally:
+            with self.lock:
+                del self.revalidations[key]
+
+    def _store(self, response, headers):
+        fields = {'url': response.url, 'status': response.status, 'reason': response.reason, 'headers': response.headers,
+                  'content': response.content, 'stored': response.stored}
+        names = sorted(set(name.strip().lower() for name in response.headers.get('vary', '').split(',') if name.strip()))
+
+        if names:
+            self.cache.set(response.url, {'vary': names})
+            self.cache.set(self._getKey(response.url, headers, names), fields)
+        else:
+            self.cache.set(response.url, fields)
+
+    def close(self):
+        """
+        Closes the idle connections and waits for the background revalidations.
+        """
+        with self.lock:
+            revalidations = list(self.revalidations.values())
+
+        for thread in revalidations:
+            thread.join()
+
+        with self.lock:
+            for connections in self.connections.values():
+                for connection in connections:
+                    connection.close()
+
+            self.connections.clear()
+
+    def get(self, url, headers=None):
+        """
+        Sends a GET request, or serves it from the cache. Redirects are followed.
+
+        :param url: The URL.
+        :type url: str
+        :param headers: The headers of the request.
+        :type headers: dict[str, str] | None
+        :return: The response.
+        :rtype: Response
+        """
+        for redirect in range(self.MAX_REDIRECTS + 1):
+            cached = None if self.cache is None else self._load(url, headers)
+
+            if cached is None:
+                response = self.request('GET', url, headers=headers) if self.cache is None else self._fetch(url, headers, None)
+            else:
+                age = cached.getAge()
+                freshness = cached.getFreshness()
+                window = parseCacheControl(cached.headers.get('cache-control')).get('stale-while-revalidate')
+                window = int(window) if str(window).isdigit() else self.staleWhileRevalidate
+
+                if age < freshness:
+                    cached.cached = True
+                    response = cached
+                elif age < freshness + window:
+                    key = (url, tuple(sorted((headers or {}).items())))
+
+                    with self.lock:
+                        if key not in self.revalidations:
+                            self.revalidations[key] = threading.Thread(target=self._revalidate, args=(key, url, headers, cached))
+                            self.revalidations[key].start()
+
+                    cached.cached = cached.stale = True
+                    response = cached
+                else:
+                    response = self._fetch(url, headers, cached)
+
+            if response.status not in self.REDIRECTS or 'location' not in response.headers:
+                return response
+
+            url = urljoin(url, response.headers['location'])
+
+        raise http_client.HTTPException('Exceeded {} redirects at "{}".'.format(self.MAX_REDIRECTS, url))
+
+    def getAll(self, urls, headers=None, workers=8, perHost=4, timeout=None):
+        """
+        Sends GET requests in parallel, or serves them from the cache. See fanOut.
+
+        :param urls: The URLs.
+        :type urls: list[str]
+        :param headers: The headers of the requests.
+        :type headers: dict[str, str] | None
+        :param workers: The number of threads.
+        :type workers: int
+        :param perHost: The number of requests that run for the same host at a time.
+        :type perHost: int
+        :param timeout: The number of seconds after which the requests that have not finished are given up.
+        :type timeout: float | None
+        :return: The response to every URL, or the exception its request raised, in the order of the URLs.
+        :rtype: list[Response | Exception]
+        """
+        return fanOut([(url, lambda url=url: self.get(url, headers)) for url in urls], workers, perHost, timeout)
+
+    def request(self, method, url, body=None, headers=None):
+        """
+        Sends a request over a pooled connection, without the cache. A GET, HEAD or OPTIONS request that fails on a
+        connection the server closed while it was idle is sent again on a new connection.
+
+        :param method: The method, e.g. GET or POST.
+        :type method: str
+        :param url: The URL.
+        :type url: str
+        :param body: The body of the request.
+        :type body: bytes | str | None
+        :param headers: The headers of the request.
+        :type headers: dict[str, str] | None
+        :return: The response.
+        :rtype: Response
+        """
+        scheme, netloc, path, query, fragment = urlsplit(url)
+        target = (path or '/') + ('?' + query if query else '')
+        merged = dict(self.headers)
+        merged.update(headers or {})
+
+        while True:
+            connection, reused = self._acquire(scheme, netloc)
+
+            try:
+                connection.request(method, target, body, merged)
+                response = connection.getresponse()
+                content = response.read()
+                break
+            except (http_client.HTTPException, socket.error):
+                connection.close()
+
+                if not reused or method.upper() not in self.RETRYABLE:
+                    raise
+
+        headers = {}
+
+        for name, value in response.getheaders():
+            name = name.lower()
+            headers[name] = headers[name] + ', ' + value if name in headers else value
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(scheme, netloc, connection)
+
+        encoding = headers.pop('content-encoding', None)
+
+        if encoding == 'gzip':
+            content = zlib.decompress(content, 16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            try:
+                content = zlib.decompress(content)
+            except zlib.error:
+                content = zlib.decompress(content, -zlib.MAX_WBITS)
+
+        return Response(url, response.status, response.reason, headers, content)
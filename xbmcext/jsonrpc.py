@@ -0,0 +1,110 @@
+"""
+A JSON-RPC client that sends many requests to Kodi as a single batch, instead of one xbmc.executeJSONRPC call each.
+
+    client = Client()
+    playcounts = client.batch(('VideoLibrary.GetMovieDetails', {'movieid': movieId, 'properties': ['playcount']})
+                              for movieId in movieIds)
+
+The results come back in the order of the requests, with a JSONRPCException in place of every request that failed.
+Results of requests made with cache=True, such as the library id of a title, are kept by the client for the rest of
+the invocation and identical requests within a batch are sent once.
+"""
+
+import json
+
+import xbmc
+
+
+class Client(object):
+    def __init__(self):
+        """
+        A JSON-RPC client that batches requests and caches the results of immutable requests.
+        """
+        self.cache = {}
+
+    @staticmethod
+    def _getResult(response):
+        if 'result' in response:
+            return response['result']
+
+        return JSONRPCException(response.get('error') or {'code': None, 'message': 'Invalid response'})
+
+    def _send(self, requests):
+        responses = json.loads(xbmc.executeJSONRPC(json.dumps([dict(request, jsonrpc='2.0', id=index) for index, request in enumerate(requests)])))
+
+        if isinstance(responses, dict):
+            return [self._getResult(responses)] * len(requests)
+
+        if len(responses) == len(requests) and all(response.get('id') == index for index, response in enumerate(responses)):
+            return [self._getResult(response) for response in responses]
+
+        responses = dict((response.get('id'), response) for response in responses)
+        return [self._getResult(responses.get(index, {})) for index in range(len(requests))]
+
+    def batch(self, requests, cache=False):
+        """
+        Sends requests to Kodi in a single JSON-RPC batch.
+
+        :param requests: The (method, params) tuples. params may be None.
+        :type requests: typing.Iterable[tuple[str, dict | list | None]]
+        :param cache: Whether the results are kept for the lifetime of the client, for requests whose result does not
+            change during an invocation.
+        :type cache: bool
+        :return: The result of every request, or a JSONRPCException, in the order of the requests.
+        :rtype: list
+        """
+        keys = []
+        pending = {}
+        results = {}
+
+        for method, params in requests:
+            key = json.dumps([method, params], sort_keys=True)
+            keys.append(key)
+
+            if cache and key in self.cache:
+                results[key] = self.cache[key]
+            elif key not in pending:
+                pending[key] = {'method': method} if params is None else {'method': method, 'params': params}
+
+        if pending:
+            for key, result in zip(pending, self._send(list(pending.values()))):
+                results[key] = result
+
+                if cache and not isinstance(result, JSONRPCException):
+                    self.cache[key] = result
+
+        return [results[key] for key in keys]
+
+    def call(self, method, params=None, cache=False):
+        """
+        Sends a JSON-RPC request to Kodi.
+
+        :param method: The method, such as VideoLibrary.GetMovies.
+        :type method: str
+        :param params: The parameters of the method.
+        :type params: dict | list | None
+        :param cache: Whether the result is kept for the lifetime of the client.
+        :type cache: bool
+        :return: The result.
+        :rtype: Any
+        :raises JSONRPCException: When Kodi answers with an error.
+        """
+        result = self.batch([(method, params)], cache)[0]
+
+        if isinstance(result, JSONRPCException):
+            raise result
+
+        return result
+
+
+class JSONRPCException(Exception):
+    def __init__(self, error):
+        """
+        Throws an exception when Kodi answers a JSON-RPC request with an error.
+
+        :param error: The error object of the response.
+        :type error: dict
+        """
+        super(JSONRPCException, self).__init__('{} ({})'.format(error.get('message'), error.get('code')))
+        self.code = error.get('code')
+        self.data = error.get('data')
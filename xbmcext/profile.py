@@ -0,0 +1,243 @@
+"""
+Profiles the cold start of a plugin invocation against the headless Kodi stand-in.
+
+    python -m xbmcext.profile plugin://plugin.video.example/title/tt5180504?page=2 --addon path/to/plugin.video.example
+
+Every run starts a fresh interpreter, as Kodi does for every navigation, that imports and runs the add-on's entry point
+with the sys.argv that Kodi would pass. The report breaks down the import time (with -X importtime), the time spent
+routing in Plugin.__call__ and the time spent in the endpoint. The output directory receives a cProfile dump
+(profile.prof) and a collapsed stack file (profile.collapsed) for flame graph tools.
+"""
+
+import argparse
+import collections
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree
+
+BOOTSTRAP = 'import runpy, sys; runpy.run_path(sys.argv[1], run_name="__profile__")'
+HEADLESS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'headless')
+IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+MARKER = 'xbmcext.profile: running the entry point'
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+timer = getattr(time, 'perf_counter', time.time)
+
+
+class StackCollector(object):
+    """
+    Collects the self time of every call stack with sys.setprofile, in the collapsed format of flame graph tools.
+    """
+
+    def __init__(self):
+        self.stack = []
+        self.stacks = collections.defaultdict(float)
+
+    def __call__(self, frame, event, arg):
+        now = timer()
+
+        if event in ('call', 'c_call'):
+            if event == 'call':
+                code = frame.f_code
+                name = '{} ({}:{})'.format(code.co_name, os.path.basename(code.co_filename), code.co_firstlineno)
+            else:
+                name = getattr(arg, '__qualname__', getattr(arg, '__name__', repr(arg)))
+
+            self.stack.append([name, now, 0.0])
+        elif self.stack and event in ('return', 'c_return', 'c_exception'):
+            names = ';'.join(entry[0] for entry in self.stack)
+            name, start, children = self.stack.pop()
+            elapsed = now - start
+            self.stacks[names] += elapsed - children
+
+            if self.stack:
+                self.stack[-1][2] += elapsed
+
+    def write(self, path):
+        with open(path, 'w') as io:
+            for names, seconds in sorted(self.stacks.items()):
+                if seconds > 0:
+                    io.write('{} {}\n'.format(names, int(seconds * 1e6)))
+
+
+def getEntryPoint(addonPath):
+    """
+    Returns the path of the script of the add-on's plugin source extension.
+
+    :param addonPath: The directory of the add-on.
+    :type addonPath: str
+    :return: The path of the entry point.
+    :rtype: str
+    """
+    path = os.path.join(addonPath, 'addon.xml')
+
+    if os.path.exists(path):
+        for extension in xml.etree.ElementTree.parse(path).iter('extension'):
+            if extension.get('point') == 'xbmc.python.pluginsource':
+                return os.path.join(addonPath, extension.get('library', 'default.py'))
+
+    return os.path.join(addonPath, 'default.py')
+
+
+def child(options):
+    """
+    Runs the add-on's entry point in this interpreter, either under cProfile or under the stack collector.
+
+    :param options: The plugin URL, the add-on directory, the handle, the output directory and the mode.
+    :type options: list[str]
+    """
+    url, addonPath, handle, output, mode = options
+    scheme, rest = url.split('://', 1)
+    netloc, _, path = rest.partition('/')
+    path, _, query = path.partition('?')
+    sys.path[:0] = [addonPath, HEADLESS_PATH, ROOT_PATH]
+    sys.argv = ['{}://{}/{}'.format(scheme, netloc, path), str(handle), '?' + query if query else '', 'resume:false']
+
+    import cProfile
+    import pstats
+    import xbmcheadless
+    xbmcheadless.reset(netloc, addonPath)
+    entryPoint = getEntryPoint(addonPath)
+    sys.stderr.write(MARKER + '\n')
+    sys.stderr.flush()
+
+    if mode == 'stacks':
+        collector = StackCollector()
+        sys.setprofile(collector)
+
+        try:
+            runEntryPoint(entryPoint)
+        finally:
+            sys.setprofile(None)
+
+        collector.write(os.path.join(output, 'profile.collapsed'))
+    else:
+        profiler = cProfile.Profile()
+        start = timer()
+        profiler.enable()
+
+        try:
+            runEntryPoint(entryPoint)
+        finally:
+            profiler.disable()
+
+        total = timer() - start
+        profiler.dump_stats(os.path.join(output, 'profile.prof'))
+        stats = pstats.Stats(os.path.join(output, 'profile.prof')).stats
+        dispatch = handler = 0.0
+
+        for (filename, line, name), (cc, nc, tt, ct, callers) in stats.items():
+            if os.path.normcase(filename) == os.path.normcase(os.path.join(ROOT_PATH, 'xbmcext', '__init__.py')):
+                if name == '__call__':
+                    dispatch += ct
+                elif name == '_call':
+                    handler += ct
+
+        with open(os.path.join(output, 'child.json'), 'w') as io:
+            json.dump({'calls': len(xbmcheadless.calls), 'dispatch': dispatch - handler, 'handler': handler, 'total': total}, io)
+
+
+def runEntryPoint(path):
+    """
+    Runs a script as __main__ without replacing sys.argv[0], which holds the plugin URL as it does in Kodi.
+
+    :param path: The path of the script.
+    :type path: str
+    """
+    with open(path, 'rb') as io:
+        code = compile(io.read(), path, 'exec')
+
+    exec(code, {'__builtins__': __builtins__, '__file__': path, '__name__': '__main__', '__package__': None})
+
+
+def parseImportTimes(stderr):
+    """
+    Parses the output of -X importtime that follows the marker, which leaves out the imports of the profiler itself.
+
+    :param stderr: The standard error of the profiled interpreter.
+    :type stderr: str
+    :return: The (module, depth, self microseconds, cumulative microseconds) of every import, and the remaining lines.
+    :rtype: tuple[list[tuple[str, int, int, int]], list[str]]
+    """
+    imports = []
+    lines = []
+    running = False
+
+    for line in stderr.splitlines():
+        if line == MARKER:
+            running = True
+            continue
+
+        match = IMPORT_TIME.match(line)
+
+        if match:
+            if running:
+                imports.append((match.group(4), len(match.group(3)) // 2, int(match.group(1)), int(match.group(2))))
+        elif not line.startswith('import time:'):
+            lines.append(line)
+
+    return imports, lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m xbmcext.profile', description='Profiles the cold start of a plugin invocation.')
+    parser.add_argument('url', help='the plugin URL, e.g. plugin://plugin.video.example/path?query')
+    parser.add_argument('--addon', default=os.getcwd(), help='the directory of the add-on (default: the working directory)')
+    parser.add_argument('--handle', type=int, default=1, help='the handle passed to the add-on (default: 1)')
+    parser.add_argument('--output', default='profile', help='the directory to write the profile files to (default: profile)')
+    parser.add_argument('--top', type=int, default=15, help='the number of imports to report (default: 15)')
+    args = parser.parse_args(argv)
+    addonPath = os.path.abspath(args.addon)
+    output = os.path.abspath(args.output)
+
+    if not os.path.isdir(output):
+        os.makedirs(output)
+
+    results = {}
+
+    for mode in ('cprofile', 'stacks'):
+        command = [sys.executable] + (['-X', 'importtime'] if mode == 'cprofile' and sys.version_info >= (3, 7) else [])
+        command += ['-c', BOOTSTRAP, os.path.abspath(__file__), args.url, addonPath, str(args.handle), output, mode]
+        process = subprocess.Popen(command, cwd=addonPath, stderr=subprocess.PIPE, universal_newlines=True)
+        stderr = process.communicate()[1]
+
+        if process.returncode:
+            sys.stderr.write(stderr)
+            return process.returncode
+
+        if mode == 'cprofile':
+            results['imports'], lines = parseImportTimes(stderr)
+
+            if lines:
+                sys.stderr.write('\n'.join(lines) + '\n')
+
+    with open(os.path.join(output, 'child.json')) as io:
+        results.update(json.load(io))
+
+    os.remove(os.path.join(output, 'child.json'))
+
+    if results['imports']:
+        print('Imports (self, cumulative)')
+
+        for name, depth, selfTime, cumulative in sorted(results['imports'], key=lambda item: -item[2])[:args.top]:
+            print('  {:>10.1f} ms {:>10.1f} ms  {}'.format(selfTime / 1000.0, cumulative / 1000.0, name))
+
+        print('  {:>10.1f} ms {:>10}     total'.format(sum(item[3] for item in results['imports'] if not item[1]) / 1000.0, ''))
+
+    print('Run          {:>10.1f} ms'.format(results['total'] * 1000))
+    print('Dispatch     {:>10.1f} ms'.format(results['dispatch'] * 1000))
+    print('Handler      {:>10.1f} ms'.format(results['handler'] * 1000))
+    print('Kodi calls   {:>10d}'.format(results['calls']))
+    print('Profile      {}'.format(os.path.join(output, 'profile.prof')))
+    print('Stacks       {}'.format(os.path.join(output, 'profile.collapsed')))
+    return 0
+
+
+if __name__ == '__profile__':
+    child(sys.argv[2:])
+elif __name__ == '__main__':
+    sys.exit(main())
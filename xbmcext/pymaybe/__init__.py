@@ -4,16 +4,28 @@ __author__ = 'Eran Kampf'
 __email__ = 'eran@ekampf.com'
 __version__ = '0.2.0'
 
+import functools
+import re
+from collections import OrderedDict
 from sys import getsizeof
 
+_PATH_STEP = re.compile(r'''\.?([^.\[\]]+)|\[(-?\d+)\]|\[(['"])(.*?)\3\]''')
+_PATHS_SIZE = 256
+
+
 class NothingValueError(ValueError):
     pass
 
 class Maybe(object):
-    pass
+    __slots__ = ()
 
 
 class Nothing(Maybe):
+    __slots__ = ()
+
+    def __new__(cls):
+        return _nothing
+
     def is_some(self):
         return False
 
@@ -35,8 +47,11 @@ class Nothing(Maybe):
     def or_empty_list(self):
         return self.or_else([])
 
+    def path(self, path):
+        return self
+
     def __call__(self, *args, **kwargs):
-        return Nothing()
+        return self
 
     # region Comparison
 
@@ -85,14 +100,14 @@ class Nothing(Maybe):
     # endregion
 
     def __getattr__(self, name):
-        return Nothing()
+        return self
 
     # region Dict
     def __len__(self):
         return 0
 
     def __getitem__(self, key):
-        return Nothing()
+        return self
 
     def __setitem__(self, key, value):
         pass
@@ -118,7 +133,86 @@ class Nothing(Maybe):
     # endregion
 
 
+_nothing = object.__new__(Nothing)
+
+
+class Path(object):
+    __slots__ = ('steps',)
+
+    def __init__(self, path):
+        """Compiles a path such as 'a.b[0].c' or "a['b.c']" into the steps of a lookup.
+
+        Names look up the keys of dicts and the attributes of other objects, brackets look up indexes and quoted keys.
+        """
+        steps = []
+        position = 0
+
+        while position < len(path):
+            match = _PATH_STEP.match(path, position)
+
+            if match is None or match.group(1) is not None and (path[position] == '.') != (position > 0):
+                raise ValueError('Invalid path: %r' % path)
+
+            name, index, quote, key = match.groups()
+
+            if name is not None:
+                steps.append((True, name))
+            else:
+                steps.append((False, int(index) if index is not None else key))
+
+            position = match.end()
+
+        self.steps = tuple(steps)
+
+    def get(self, value):
+        """Returns the value at the end of the path, or None if a step is missing."""
+        try:
+            for attribute, key in self.steps:
+                if attribute and not isinstance(value, dict):
+                    value = getattr(value, key)
+                else:
+                    value = value[key]
+        except (AttributeError, KeyError, TypeError, IndexError):
+            return None
+
+        return value
+
+
+def _lru_cache(maxsize):
+    """Stands in for functools.lru_cache on Python 2, keeping the results of the maxsize most recent arguments."""
+    def decorator(function):
+        results = OrderedDict()
+
+        @functools.wraps(function)
+        def wrapper(argument):
+            try:
+                result = results.pop(argument)
+            except KeyError:
+                result = function(argument)
+
+                if len(results) >= maxsize:
+                    results.popitem(last=False)
+
+            results[argument] = result
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+_cache = getattr(functools, 'lru_cache', _lru_cache)
+
+
+@_cache(maxsize=_PATHS_SIZE)
+def compile_path(path):
+    """Returns the compiled Path of a path string, keeping the _PATHS_SIZE most recently used ones compiled."""
+    return Path(path)
+
+
 class Something(Maybe):
+    __slots__ = ('__value',)
+
     def __init__(self, value):
         self.__value = value
 
@@ -193,6 +287,19 @@ class Something(Maybe):
     def get(self):
         return self.__value
 
+    def path(self, path):
+        """Looks up a path such as 'a.b[0].c' without wrapping the intermediate values.
+
+          >>> nested_dict.path('store.departments.sales.head_count').get()
+          '10'
+          >>> nested_dict.path("store['departments'].marketing.head_count").or_else('0')
+          '0'
+        """
+        if not isinstance(path, Path):
+            path = compile_path(path)
+
+        return maybe(path.get(self.__value))
+
     # pylint: disable=W0613
     def or_else(self, els=None):
         return self.__value
@@ -207,7 +314,7 @@ class Something(Maybe):
         try:
             return maybe(getattr(self.__value, name))
         except Exception:
-            return Nothing()
+            return _nothing
 
     def __setattr__(self, name, v):
         if name == "_Something__value":
@@ -224,7 +331,7 @@ class Something(Maybe):
         try:
             return maybe(self.__value[key])
         except (KeyError, TypeError, IndexError):
-            return Nothing()
+            return _nothing
 
     def __setitem__(self, key, value):
         self.__value[key] = value
@@ -249,7 +356,7 @@ class Something(Maybe):
                 callable(getattr(klass, '__missing__')):
             return maybe(self.__value.__missing__(key))
 
-        return Nothing()
+        return _nothing
 
     # endregion
 
@@ -566,13 +673,63 @@ def maybe(value):
         '0'
 
     """
+    if value is None:
+        return _nothing
+
     if isinstance(value, Maybe):
         return value
 
-    if value is not None:
-        return Something(value)
+    return Something(value)
+
+
+def maybe_extract(records, fields, default=None, columns=False):
+    """Extracts fields from every record in a single pass, without wrapping any value in a Maybe.
+
+    Every path is compiled once for the whole collection. A field whose path is missing from a record, or leads to
+    None, takes the default.
+
+      >>> records = [{'info': {'year': 2016, 'plot': 'A boy vanishes.'}}, {'info': {'year': 2017}}, None]
+      >>> maybe_extract(records, {'year': 'info.year'}, default=0)
+      [{'year': 2016}, {'year': 2017}, {'year': 0}]
+      >>> maybe_extract(records, {'year': 'info.year', 'plot': 'info.plot'}, columns=True)['plot']
+      ['A boy vanishes.', None, None]
+
+    :param records: The records, which may be wrapped in a Maybe.
+    :param fields: The path of every field by name, such as {'year': 'info.year'}.
+    :param default: The value of the fields that are missing.
+    :param columns: Whether to return a list of values by field instead of a dict of fields by record.
+    """
+    getters = [(name, (path if isinstance(path, Path) else compile_path(path)).get) for name, path in fields.items()]
+
+    if columns:
+        result = dict((name, []) for name, get in getters)
+        appenders = [(result[name].append, get) for name, get in getters]
+
+        for record in records:
+            if isinstance(record, Maybe):
+                record = record.or_none()
+
+            for append, get in appenders:
+                value = get(record)
+                append(default if value is None else value)
+
+        return result
+
+    rows = []
+
+    for record in records:
+        if isinstance(record, Maybe):
+            record = record.or_none()
+
+        row = {}
+
+        for name, get in getters:
+            value = get(record)
+            row[name] = default if value is None else value
+
+        rows.append(row)
 
-    return Nothing()
+    return rows
 
 
 def get_doctest_globs():
@@ -593,6 +750,7 @@ def get_doctest_globs():
         }),
         'eran': maybe(eran),
         'maybe': maybe,
+        'maybe_extract': maybe_extract,
     }
 
     return globals_dict